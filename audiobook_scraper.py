@@ -2,19 +2,20 @@ import sys
 import json
 import os
 import time
-import subprocess
 import re
 from pathlib import Path
 from datetime import datetime
 from pytube import YouTube, Playlist, Channel
 import ffmpeg
 from rich.console import Console
-from rich.progress import Progress, TextColumn, BarColumn, SpinnerColumn, TimeElapsedColumn, TaskProgressColumn
 from rich.panel import Panel
 from rich.table import Table
-import yt_dlp
+from rich.markup import escape
 import concurrent.futures
-import random
+import asyncio
+import threading
+import queue
+import atexit
 import filelock  # Add this import
 from urllib.parse import urlparse, parse_qs
 
@@ -22,51 +23,82 @@ try:
     import ffmpeg
     import yt_dlp
     import filelock
+    import requests
 except ImportError as e:
     print(f"Error: Missing required dependency - {e}")
-    print("Please install required packages: pip install ffmpeg-python yt-dlp filelock")
+    print("Please install required packages: pip install ffmpeg-python yt-dlp filelock requests")
     sys.exit(1)
 
+import catalog
+import channel_cursor
+from content_filter import is_valid_audiobook  # channel/ID/title rules: content_filter.json
+from crawl_progress import CrawlProgress
+import description_chapters
+import mp3info
+import ratelimit
+import waveform
+import ydl_pool
+
 console = Console()
 
 # Configuration settings
 CONFIG = {
     'output_dir': os.environ.get('AUDIOBOOKS_OUTPUT_DIR', 'audiobooks'),
-    'metadata_file': 'audiobooks.json',
+    'metadata_file': catalog.SOURCE_FILE,
     'audio_format': 'mp3',
     'bitrate': '64k',
     'checkpoint_file': 'checkpoint.json',
+    'checkpoint_compact_every': 1000,  # Fold checkpoint.log into checkpoint.json every N processed URLs
     'max_retries': 3,
     'recursive_depth': 2,  # How deep to go when traversing channels/playlists
     'max_workers': int(os.environ.get('MAX_WORKERS', '4')),      # Number of parallel workers for downloading
+    'transcode_workers': int(os.environ.get('TRANSCODE_WORKERS', os.cpu_count() or 2)),  # --download: concurrent ffmpeg transcodes
+    'download': False,     # Download and transcode the audio too (--download), not just the metadata
+    'stream_transcode': False,  # --download: pipe the stream into ffmpeg, no intermediate file (--stream)
+    'stream_chunk': 10 * 1024 * 1024,  # Bytes per HTTP Range request in streaming mode
+    'waveform': os.environ.get('WAVEFORM', '1') != '0',  # --download: peaks + silence markers per file (waveform.py)
     'min_duration': 0,     # Minimum duration in seconds (0 = no filter)
     'max_duration': 0,     # Maximum duration in seconds (0 = no filter)
-    'rate_limit': float(os.environ.get('RATE_LIMIT', '1')),       # Minimum seconds between requests
+    'rate_limit': float(os.environ['RATE_LIMIT']) if os.environ.get('RATE_LIMIT') else None,  # Minimum seconds between requests (None: ratelimit.py budget)
+    'rate_burst': int(os.environ['RATE_BURST']) if os.environ.get('RATE_BURST') else None,    # Requests allowed back to back after an idle spell
     'extract_description': True,  # Extract transcript from video description
+    'pipeline': False,     # Use the asyncio pipeline (--pipeline) instead of one thread-pool task per URL
+    'incremental': False,  # Walk channels only down to the last crawl / known videos (--incremental)
+    'stop_after': channel_cursor.DEFAULT_STOP_AFTER,  # Incremental mode: consecutive known videos before stopping
+    'flush_every': int(os.environ.get('FLUSH_EVERY', '25')),          # Write new records to disk every N videos...
+    'flush_interval': float(os.environ.get('FLUSH_INTERVAL', '30')),  # ...or every N seconds, whichever comes first
+    'jsonl': os.environ.get('LOG_FORMAT', '') == 'jsonl',  # JSON-lines events on stdout instead of the live display (--jsonl)
+    'log_rate': float(os.environ.get('LOG_RATE', '5')),     # Max log lines per second per level (0 = unlimited)
     'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
 }
 
-# Rate limiter class
-class RateLimiter:
-    def __init__(self, rate_limit):
-        self.rate_limit = rate_limit
-        self.last_request = 0
-        
-    def wait(self):
-        if self.rate_limit <= 0:
-            return
-            
-        now = time.time()
-        elapsed = now - self.last_request
-        if elapsed < self.rate_limit:
-            time.sleep(self.rate_limit - elapsed)
-        self.last_request = time.time()
+# All YouTube requests from every worker share one token bucket (see ratelimit.py).
+# Its budget comes from ratelimit.py / RATE_LIMITS unless RATE_LIMIT,
+# RATE_BURST or --rate-limit set it explicitly.
+def configure_rate_limit():
+    if CONFIG['rate_limit'] is None and CONFIG['rate_burst'] is None:
+        return
+    current = ratelimit.limiter.bucket('youtube.com')
+    interval, burst = (current.interval, current.burst) if current else (1.0, 3)
+    ratelimit.configure('youtube.com',
+                        interval=CONFIG['rate_limit'] if CONFIG['rate_limit'] is not None else interval,
+                        burst=CONFIG['rate_burst'] if CONFIG['rate_burst'] is not None else burst)
 
-rate_limiter = RateLimiter(CONFIG['rate_limit'])
+configure_rate_limit()
 
 def extract_audio_metadata(audio_file):
-    """Extract metadata from audio file using ffprobe"""
+    """Extract metadata from audio file: MP3 headers (mp3info.py), ffprobe for other formats"""
     try:
+        if str(audio_file).lower().endswith('.mp3'):
+            info = mp3info.probe_file(audio_file)
+            if info and info['duration'] is not None:
+                return {
+                    'codec': info['codec'],
+                    'channels': info['channels'],
+                    'sample_rate': str(info['sample_rate']),
+                    'bit_rate': str(info['bitrate']),
+                    'duration': f"{info['duration']:.6f}"
+                }
         probe = ffmpeg.probe(audio_file)
         audio_stream = next((stream for stream in probe['streams'] if stream['codec_type'] == 'audio'), None)
         if audio_stream:
@@ -96,9 +128,8 @@ def load_existing_metadata():
     try:
         with METADATA_LOCK:
             try:
-                with open(CONFIG['metadata_file'], 'r') as f:
-                    return json.load(f)
-            except (FileNotFoundError, json.JSONDecodeError):
+                return catalog.read_json(CONFIG['metadata_file'])
+            except json.JSONDecodeError:
                 return {}
     except filelock.Timeout:
         console.log("[bold yellow]Warning:[/bold yellow] Could not acquire metadata file lock. Using empty metadata.")
@@ -107,48 +138,218 @@ def load_existing_metadata():
 def save_metadata(metadata):
     try:
         with METADATA_LOCK:
-            # Create a backup first
-            if os.path.exists(CONFIG['metadata_file']):
-                backup_file = f"{CONFIG['metadata_file']}.bak"
+            # Create a (compressed) backup first
+            if catalog.exists(CONFIG['metadata_file']):
                 try:
-                    import shutil
-                    shutil.copy2(CONFIG['metadata_file'], backup_file)
+                    catalog.snapshot(CONFIG['metadata_file'], 'bak')
                 except Exception as e:
                     console.log(f"[bold yellow]Warning:[/bold yellow] Failed to create metadata backup: {e}")
                     
-            # Write the new metadata
-            with open(CONFIG['metadata_file'], 'w') as f:
-                json.dump(metadata, f, indent=2)
+            # Write the new metadata (atomically; .gz/.zst if stored compressed)
+            catalog.write_json(CONFIG['metadata_file'], metadata)
     except filelock.Timeout:
         console.log("[bold red]Error:[/bold red] Could not acquire metadata file lock for writing. Changes may be lost.")
         
+class MetadataStore:
+    """Process-wide view of the metadata file shared by all worker threads.
+
+    Workers used to parse the whole catalogue to check one video id and then
+    rewrite it to add one record, both under METADATA_LOCK, so every video
+    cost two full-catalogue round-trips and the file lock serialized all
+    workers. Here the known ids are loaded once into a set, new records are
+    queued in memory, and a writer thread merges them into the file in
+    batches (every `flush_every` records or `flush_interval` seconds).
+    Each flush re-reads the file under the lock, so records written by
+    another scraper process in the meantime are kept. The URL of a record
+    is checkpointed by the flush that wrote it, never before: a run killed
+    with records still queued fetches those URLs again next time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._write_lock = threading.Lock()
+        self._known = None
+        self._pending = {}
+        self._thread = None
+        self._closed = False
+
+    def _ensure_loaded(self):
+        # Called with self._lock held
+        if self._known is None:
+            self._known = set(load_existing_metadata())
+
+    def __contains__(self, video_id):
+        with self._lock:
+            self._ensure_loaded()
+            return video_id in self._known
+
+    def add(self, video_id, record, url=None):
+        """Queue a new record, and `url` to checkpoint once it is written;
+        returns False if the id is already known."""
+        with self._lock:
+            self._ensure_loaded()
+            if video_id in self._known:
+                return False
+            self._known.add(video_id)
+            self._pending[video_id] = (record, url)
+            if self._thread is None:
+                self._closed = False
+                self._thread = threading.Thread(target=self._run, name='metadata-writer', daemon=True)
+                self._thread.start()
+            if len(self._pending) >= CONFIG['flush_every']:
+                self._wake.notify()
+            return True
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._closed and len(self._pending) < CONFIG['flush_every']:
+                    self._wake.wait(CONFIG['flush_interval'])
+                if self._closed:
+                    return  # close() does the final flush
+            self.flush()
+
+    def flush(self):
+        """Merge the queued records into the metadata file; returns how many were written."""
+        with self._write_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+            try:
+                with METADATA_LOCK:
+                    try:
+                        metadata = catalog.read_json(CONFIG['metadata_file'])
+                    except json.JSONDecodeError:
+                        metadata = {}
+                    for video_id, (record, _) in batch.items():
+                        metadata.setdefault(video_id, record)
+                    save_metadata(metadata)
+            except filelock.Timeout:
+                # Not written, so not checkpointed either
+                console.log(f"[bold yellow]Warning:[/bold yellow] Could not acquire metadata file lock. "
+                            f"{len(batch)} records kept in memory for the next flush.")
+                with self._lock:
+                    batch.update(self._pending)
+                    self._pending = batch
+                return 0
+            with self._lock:
+                self._known.update(metadata)
+            for _, url in batch.values():
+                if url:
+                    save_checkpoint(url)
+            return len(batch)
+
+    def close(self):
+        """Stop the writer thread and flush whatever is still queued."""
+        with self._lock:
+            self._closed = True
+            self._wake.notify()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+        self.flush()
+
+metadata_store = MetadataStore()
+atexit.register(metadata_store.close)
+
 # Add a file lock for checkpoint operations
 CHECKPOINT_LOCK = filelock.FileLock(f"{CONFIG['checkpoint_file']}.lock", timeout=30)
 
-def load_checkpoint():
+# The checkpoint is checkpoint.json (compacted state) plus checkpoint.log, an
+# append-only log with one processed URL per line. Marking a URL done appends
+# one line instead of reloading and rewriting the whole JSON file (quadratic
+# over a long crawl); the log is folded back into checkpoint.json every
+# `checkpoint_compact_every` entries and at exit. Processed URLs live in an
+# insertion-ordered dict used as a set.
+CHECKPOINT_STATE_LOCK = threading.Lock()
+_checkpoint = None
+_checkpoint_appends = 0
+
+def _checkpoint_log():
+    return f"{os.path.splitext(CONFIG['checkpoint_file'])[0]}.log"
+
+def _read_checkpoint_files():
+    """Read checkpoint.json and replay checkpoint.log (call with CHECKPOINT_LOCK held)."""
     try:
-        with CHECKPOINT_LOCK:
+        with open(CONFIG['checkpoint_file'], 'r') as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        data = {}
+    processed = dict.fromkeys(data.get('processed_urls', []))
+    last_url = data.get('last_url')
+    try:
+        with open(_checkpoint_log(), 'r', encoding='utf-8') as f:
+            for line in f:
+                url = line.rstrip('\n')
+                if url:  # a torn last line from a crash is just an unknown URL
+                    processed[url] = None
+                    last_url = url
+    except FileNotFoundError:
+        pass
+    return {'last_url': last_url, 'processed_urls': processed}
+
+def load_checkpoint():
+    """Return {'last_url', 'processed_urls'}; loaded from disk once per process."""
+    global _checkpoint
+    with CHECKPOINT_STATE_LOCK:
+        if _checkpoint is None:
             try:
-                with open(CONFIG['checkpoint_file'], 'r') as f:
-                    return json.load(f)
-            except (FileNotFoundError, json.JSONDecodeError):
-                return {'last_url': None, 'processed_urls': []}
-    except filelock.Timeout:
-        console.log("[bold yellow]Warning:[/bold yellow] Could not acquire checkpoint file lock. Using empty checkpoint.")
-        return {'last_url': None, 'processed_urls': []}
+                with CHECKPOINT_LOCK:
+                    _checkpoint = _read_checkpoint_files()
+            except filelock.Timeout:
+                console.log("[bold yellow]Warning:[/bold yellow] Could not acquire checkpoint file lock. Using empty checkpoint.")
+                return {'last_url': None, 'processed_urls': {}}
+        return _checkpoint
 
 def save_checkpoint(url):
-    try:
-        with CHECKPOINT_LOCK:
-            checkpoint = load_checkpoint()
-            checkpoint['last_url'] = url
-            if url not in checkpoint['processed_urls']:
-                checkpoint['processed_urls'].append(url)
-            with open(CONFIG['checkpoint_file'], 'w') as f:
-                json.dump(checkpoint, f, indent=2)
-    except filelock.Timeout:
-        console.log("[bold red]Error:[/bold red] Could not acquire checkpoint file lock for writing. Changes may be lost.")
-        
+    """Mark a URL as processed (one appended log line if it is new)."""
+    global _checkpoint_appends
+    checkpoint = load_checkpoint()
+    with CHECKPOINT_STATE_LOCK:
+        checkpoint['last_url'] = url
+        if url in checkpoint['processed_urls']:
+            return
+        try:
+            with CHECKPOINT_LOCK:
+                with open(_checkpoint_log(), 'a', encoding='utf-8') as f:
+                    f.write(url + '\n')
+        except filelock.Timeout:
+            console.log("[bold red]Error:[/bold red] Could not acquire checkpoint file lock for writing. Changes may be lost.")
+            return
+        checkpoint['processed_urls'][url] = None
+        _checkpoint_appends += 1
+        if _checkpoint_appends < CONFIG['checkpoint_compact_every']:
+            return
+    compact_checkpoint()
+
+def compact_checkpoint():
+    """Fold checkpoint.log into checkpoint.json and truncate the log."""
+    global _checkpoint_appends
+    if _checkpoint is None:
+        return
+    with CHECKPOINT_STATE_LOCK:
+        try:
+            with CHECKPOINT_LOCK:
+                # Re-read so entries appended by another scraper process are kept
+                on_disk = _read_checkpoint_files()
+                _checkpoint['processed_urls'].update(on_disk['processed_urls'])
+                tmp = f"{CONFIG['checkpoint_file']}.tmp"
+                with open(tmp, 'w') as f:
+                    json.dump({'last_url': _checkpoint['last_url'],
+                               'processed_urls': list(_checkpoint['processed_urls'])}, f, indent=2)
+                os.replace(tmp, CONFIG['checkpoint_file'])
+                # Replaying the log over checkpoint.json is idempotent, so a crash
+                # between the two steps loses nothing.
+                open(_checkpoint_log(), 'w').close()
+        except filelock.Timeout:
+            console.log("[bold yellow]Warning:[/bold yellow] Could not acquire checkpoint file lock. Compaction postponed.")
+            return
+        _checkpoint_appends = 0
+
+atexit.register(compact_checkpoint)
+
 def extract_transcript_from_description(description):
     """Extract transcript-like content from video description"""
     if not description:
@@ -158,7 +359,7 @@ def extract_transcript_from_description(description):
     transcript = ""
     
     # Common patterns in timestamps: HH:MM:SS, MM:SS, or MM.SS format
-    timestamp_pattern = r'(\d{1,2}:)?\d{1,2}:\d{2}|\d{1,2}:\d{2}|\d{1,2}\.\d{2}'
+    timestamp_pattern = description_chapters.TIMESTAMP_PATTERN
     
     # Split by lines and look for timestamp patterns
     lines = description.split('\n')
@@ -175,186 +376,117 @@ def extract_transcript_from_description(description):
     
     return transcript
 
-# List of channels that host non-audiobook material (comedy, movies, English-only content)
-BLACKLIST_CHANNELS = {
-    'iaraculonna',
-    'LaraBellyDance',
-    'giuliomania',
-    'I film di Mondo TV',
-    'Jason Stephenson - Sleep Meditation Music',
-    'Nigel John Stanford',
-    'Jason Headley',
-    'TheVideoCellar',
-    'Warner Bros. Italia',
-    'Veronicartoon',
-    'Film&Clips',
-    'Audio Books',
-    'Incredible Librivox Audiobooks',
-    'Bardic Knowledge',
-    'Fab Audio Books',
-    'English Audio Books',
-    'AudioLibros: MaginBooks',
-    'AMA Audiolibros',
-    'EducaBabyTV',
-    'Enrico Brignano Ufficiale',
-    'Greatest AudioBooks',
-    'Art and Design',
-    'giuseppe pugliese'
-}
+def fetch_video_info(youtube_url):
+    """Fetch full video metadata with yt-dlp (blocking, rate limited)"""
+    ydl_opts = {
+        'format': 'bestaudio',
+        'quiet': True,
+        'extract_flat': False,  # Extract full info
+        'skip_download': True,  # Don't download the video
+        'no_warnings': True,
+        'user_agent': CONFIG['user_agent'],
+        'socket_timeout': 30,
+    }
+    
+    # Apply rate limiting
+    ratelimit.wait(youtube_url)
+    
+    # This worker's long-lived YoutubeDL for the full-extraction profile
+    return ydl_pool.get(ydl_opts).extract_info(youtube_url, download=False)
 
-# Specific video IDs representing non-audiobooks
-BLACKLIST_IDS = {
-    'IsvALeok750', # playlist promo video
-    'CrEtgLpoWgE', # Astronave Sensor Help
-    'GE8Dj701Q0M', # Sergio Bonelli interview
-    'xyx-RMoPyZo', # Vir in Live livestream replay
-    'FTkXdSKljOI', # Fiorello & Baldini - Mike Bongiorno e Pinocchio
-    'pKSVywHXd8Y', # Fiorello & Baldini - Mike Bongiorno e Polifemo
-    'f199fI0jG6Q', # Fiorello e Baldini Mike Bongiorno O Sole Mio
-    'Mv8EFsjKMow', # Fiorello - Mike Bongiorno - Agenzia viaggi
-    'nWRYL_XuJtE', # viva radio 2 mike bongiorno bambino cinese
-    'xFUkkzAQyXU', # Viva Radio 2-Genius-Bambino Anti-Juventino
-    'JCLzc7S5xSY', # Fiorello & Baldini - Mike e i trenta denari
-    'fUbl5wiRtR8', # Fiorello & Baldini - Mike e il bambino tedesco
-    'es36GaQeAKk'  # 50 SFUMATURE DI NERO -IL FILM- Versione di Giulia Segreti
-}
+def check_video(youtube_url, info_dict):
+    """Apply validation, duration filters and the already-known check.
+    Returns (video_id, skip reason); the reason is empty if the video should be saved."""
+    # Extract video ID for consistent identification
+    video_id = info_dict.get('id', youtube_url.split('v=')[-1])
+    title = info_dict.get('title', 'Unknown')
+    channel = info_dict.get('channel', info_dict.get('uploader', 'Unknown'))
+    
+    # Apply data validation check
+    is_valid, reason = is_valid_audiobook(video_id, title, channel)
+    if not is_valid:
+        return video_id, reason
 
-def is_valid_audiobook(video_id, title, channel):
-    """Determine if a video is a valid Italian audiobook based on metadata heuristics."""
-    # 1. Check specific video ID blacklist
-    if video_id in BLACKLIST_IDS:
-        return False, "Blacklisted video ID"
-        
-    # 2. Check channel blacklist
-    if channel.strip().lower() in [c.lower() for c in BLACKLIST_CHANNELS]:
-        return False, f"Blacklisted channel: {channel}"
-        
-    title_lower = title.lower()
-    
-    # 3. Check for Fiorello/Bongiorno/Viva Radio parody content
-    if ('fiorello' in title_lower and 'baldini' in title_lower) or \
-       ('fiorello' in title_lower and 'bongiorno' in title_lower) or \
-       ('fiorello imita' in title_lower) or \
-       ('viva radio' in title_lower):
-        return False, "Fiorello / Viva Radio comedy parody pattern"
+    # Apply duration filtering if configured
+    if CONFIG['min_duration'] > 0 and float(info_dict.get('duration', 0)) < CONFIG['min_duration']:
+        return video_id, "duration too short"
+    if CONFIG['max_duration'] > 0 and float(info_dict.get('duration', 0)) > CONFIG['max_duration']:
+        return video_id, "duration too long"
         
-    # 4. Check for English-only audiobooks
-    if any(w in title_lower for w in ['audiobook', 'full audiobook', 'unabridged', 'translated by', 'read by']) and \
-       not any(w in title_lower for w in ['italiano', 'ita', 'tradotto']):
-        return False, "English audiobook title pattern"
+    if video_id in metadata_store:
+        return video_id, "already exists"
+    return video_id, ""
+
+def build_record(youtube_url, info_dict):
+    """Create a comprehensive metadata entry from yt-dlp's info dict"""
+    # Extract transcript from description if enabled
+    transcript = ""
+    chapters = []
+    if CONFIG['extract_description']:
+        transcript = extract_transcript_from_description(info_dict.get('description', ''))
+        chapters = description_chapters.from_info(info_dict)
         
-    return True, ""
+    return {
+        'title': info_dict.get('title', 'Unknown'),
+        'channel': info_dict.get('channel', info_dict.get('uploader', 'Unknown')),
+        'channel_url': info_dict.get('channel_url', info_dict.get('uploader_url', '')),
+        'duration': float(info_dict.get('duration', 0)),
+        'upload_date': info_dict.get('upload_date', 'Unknown'),
+        'description': info_dict.get('description', ''),
+        'transcript': transcript,
+        'chapters': chapters,
+        'view_count': info_dict.get('view_count', 0),
+        'like_count': info_dict.get('like_count', 0),
+        'download_date': datetime.now().isoformat(),
+        'url': youtube_url,
+        'audio_file': '',
+        'processed': False,
+        'summary': '',
+        'thumbnail': info_dict.get('thumbnail', ''),
+        'tags': info_dict.get('tags', []),
+        'categories': info_dict.get('categories', [])
+    }
 
 def extract_metadata(youtube_url, progress):
-    # Create a task for this metadata extraction
-    task_id = progress.add_task(f"[cyan]Extracting metadata...", total=100)
+    # Show this URL among the in-flight rows while it is processed
+    task_id = progress.start(youtube_url, "Validating URL")
     
     # Validate YouTube URL
     if not validate_youtube_url(youtube_url):
-        progress.update(task_id, description=f"[red]Invalid YouTube URL: {youtube_url[:40]}...", completed=100)
-        console.log(f"[bold red]Error:[/bold red] Invalid YouTube URL: {youtube_url}")
+        progress.finish(task_id, 'failed', f"[bold red]Error:[/bold red] Invalid YouTube URL: {youtube_url}")
         return False
     
     try:
         # Use yt-dlp to download comprehensive video metadata
-        progress.update(task_id, description=f"[cyan]Fetching metadata with yt-dlp...", completed=30)
-        
-        ydl_opts = {
-            'format': 'bestaudio',
-            'quiet': True,
-            'extract_flat': False,  # Extract full info
-            'skip_download': True,  # Don't download the video
-            'no_warnings': True,
-            'user_agent': CONFIG['user_agent'],
-            'socket_timeout': 30,
-        }
+        progress.update(task_id, "Fetching metadata with yt-dlp")
+        info_dict = fetch_video_info(youtube_url)
         
-        # Apply rate limiting
-        rate_limiter.wait()
-        
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info_dict = ydl.extract_info(youtube_url, download=False)
-            
-        # Extract video ID for consistent identification
-        video_id = info_dict.get('id', youtube_url.split('v=')[-1])
-        title = info_dict.get('title', 'Unknown')
-        channel = info_dict.get('channel', info_dict.get('uploader', 'Unknown'))
-        
-        # Apply data validation check
-        is_valid, reason = is_valid_audiobook(video_id, title, channel)
-        if not is_valid:
-            progress.update(task_id, description=f"[yellow]Skipped: {reason[:30]}...", completed=100)
-            console.log(f"Skipping {video_id} - {reason}")
-            return True
-
-        # Apply duration filtering if configured
-        if CONFIG['min_duration'] > 0 and float(info_dict.get('duration', 0)) < CONFIG['min_duration']:
-            progress.update(task_id, description=f"[yellow]Skipped: Duration too short", completed=100)
-            console.log(f"Skipping {info_dict.get('id')} - duration too short")
+        video_id, reason = check_video(youtube_url, info_dict)
+        if reason:
+            save_checkpoint(youtube_url)  # skipped: nothing to retry
+            progress.finish(task_id, 'skipped', f"Skipping {video_id} - {reason}")
             return True
             
-        if CONFIG['max_duration'] > 0 and float(info_dict.get('duration', 0)) > CONFIG['max_duration']:
-            progress.update(task_id, description=f"[yellow]Skipped: Duration too long", completed=100)
-            console.log(f"Skipping {info_dict.get('id')} - duration too long")
-            return True
-            
-        existing_metadata = load_existing_metadata()
-
-        if video_id in existing_metadata:
-            progress.update(task_id, description=f"[yellow]Skipped: {video_id[:40]}...", completed=100)
-            console.log(f"Skipping {video_id} - already exists")
-            return True
-            
-        # Extract transcript from description if enabled
-        transcript = ""
-        if CONFIG['extract_description']:
-            transcript = extract_transcript_from_description(info_dict.get('description', ''))
-            
         # Save comprehensive metadata
-        progress.update(task_id, description=f"[cyan]Saving metadata: {info_dict.get('title', video_id)[:40]}...", completed=90)
+        progress.update(task_id, f"Saving metadata: {info_dict.get('title', video_id)[:40]}")
         
-        # Create a comprehensive metadata entry
-        existing_metadata[video_id] = {
-            'title': info_dict.get('title', 'Unknown'),
-            'channel': info_dict.get('channel', info_dict.get('uploader', 'Unknown')),
-            'channel_url': info_dict.get('channel_url', info_dict.get('uploader_url', '')),
-            'duration': float(info_dict.get('duration', 0)),
-            'upload_date': info_dict.get('upload_date', 'Unknown'),
-            'description': info_dict.get('description', ''),
-            'transcript': transcript,
-            'view_count': info_dict.get('view_count', 0),
-            'like_count': info_dict.get('like_count', 0),
-            'download_date': datetime.now().isoformat(),
-            'url': youtube_url,
-            'audio_file': '',
-            'processed': False,
-            'summary': '',
-            'thumbnail': info_dict.get('thumbnail', ''),
-            'tags': info_dict.get('tags', []),
-            'categories': info_dict.get('categories', [])
-        }
-
-        save_metadata(existing_metadata)
-        save_checkpoint(youtube_url)
+        # Queue the entry: the metadata writer thread writes it, then checkpoints the URL
+        metadata_store.add(video_id, build_record(youtube_url, info_dict), youtube_url)
         
-        progress.update(task_id, description=f"[green]Completed: {info_dict.get('title', video_id)[:40]}...", completed=100)
-        console.log(f"Successfully extracted metadata for {video_id}: {info_dict.get('title', 'Unknown')}")
+        progress.finish(task_id, 'saved', f"Successfully extracted metadata for {video_id}: {info_dict.get('title', 'Unknown')}")
         return True
         
     except Exception as e:
-        progress.update(task_id, description=f"[red]Error: {str(e)[:40]}...", completed=100)
-        console.log(f"[bold red]Error:[/bold red] {str(e)}")
-        console.log(f"[bold red]URL causing error:[/bold red] {youtube_url}")
+        progress.finish(task_id, 'failed', f"[bold red]Error:[/bold red] {str(e)} [dim]({youtube_url})[/dim]")
         return False
 
-def download_audio(youtube_url, progress):
-    # Create a task for this download
-    task_id = progress.add_task(f"[cyan]Downloading...", total=100)
-    
+def fetch_audio(youtube_url, progress, task_id):
+    """Download stage (network bound): resolve the video, check it and download
+    its best audio stream. Returns a job for transcode_audio/store_audio, or
+    True (skipped) / False (failed) once the task has been finished here."""
     # Validate YouTube URL
     if not validate_youtube_url(youtube_url):
-        progress.update(task_id, description=f"[red]Invalid YouTube URL: {youtube_url[:40]}...", completed=100)
-        console.log(f"[bold red]Error:[/bold red] Invalid YouTube URL: {youtube_url}")
+        progress.finish(task_id, 'failed', f"[bold red]Error:[/bold red] Invalid YouTube URL: {youtube_url}")
         return False
     
     # Implement retry logic with exponential backoff
@@ -364,100 +496,75 @@ def download_audio(youtube_url, progress):
     
     while retry_count <= max_retries:
         try:
-            # If this is a retry, update the progress bar
+            # If this is a retry, show it on the in-flight row
             if retry_count > 0:
-                progress.update(task_id, description=f"[yellow]Retry {retry_count}/{max_retries}...", completed=5)
-                console.log(f"Retry attempt {retry_count}/{max_retries} for {youtube_url}")
+                progress.update(task_id, f"Retry {retry_count}/{max_retries}")
+                progress.log(f"Retry attempt {retry_count}/{max_retries} for {youtube_url}", level='warning')
             
             # Apply rate limiting
-            rate_limiter.wait()
+            ratelimit.wait(youtube_url)
             
             # Use a timeout for the YouTube API request
             yt = YouTube(youtube_url, use_oauth=False, allow_oauth_cache=False)
-            progress.update(task_id, description=f"[cyan]Analyzing: {yt.title[:40]}...", completed=10)
+            progress.update(task_id, f"Analyzing: {yt.title[:40]}")
             
             video_id = yt.video_id
-            existing_metadata = load_existing_metadata()  # Changed variable name for clarity
 
             # Apply data validation check
             is_valid, reason = is_valid_audiobook(video_id, yt.title or 'Unknown', yt.author or 'Unknown')
             if not is_valid:
-                progress.update(task_id, description=f"[yellow]Skipped: {reason[:30]}...", completed=100)
-                console.log(f"Skipping {video_id} - {reason}")
+                progress.finish(task_id, 'skipped', f"Skipping {video_id} - {reason}")
                 return True
 
-            if video_id in existing_metadata:
-                progress.update(task_id, description=f"[yellow]Skipped: {yt.title[:40]}...", completed=100)
-                console.log(f"Skipping {video_id} - already exists")
+            if video_id in metadata_store:
+                progress.finish(task_id, 'skipped', f"Skipping {video_id} - already exists")
                 return True
 
             # Get the best audio stream
-            progress.update(task_id, description=f"[cyan]Finding best audio: {yt.title[:40]}...", completed=20)
+            progress.update(task_id, f"Finding best audio: {yt.title[:40]}")
             audio_stream = yt.streams.filter(only_audio=True).order_by('abr').desc().first()
             if not audio_stream:
-                progress.update(task_id, description=f"[red]No audio stream: {yt.title[:40]}", completed=100)
-                console.log(f"[bold red]Error:[/bold red] No audio stream found for {video_id}")
+                progress.finish(task_id, 'failed', f"[bold red]Error:[/bold red] No audio stream found for {video_id}")
                 return False
                 
             output_path = Path(CONFIG['output_dir'])
             output_path.mkdir(exist_ok=True)
 
-            # Download audio
-            progress.update(task_id, description=f"[cyan]Downloading: {yt.title[:40]}...", completed=30)
-            audio_file = audio_stream.download(output_path=output_path)
-            progress.update(task_id, description=f"[cyan]Converting: {yt.title[:40]}...", completed=70)
-            
-            output_file = output_path / f'{video_id}.{CONFIG["audio_format"]}'
-            
-            # Convert to desired format
-            (
-                ffmpeg
-                .input(audio_file)
-                .output(str(output_file), ac=1, audio_bitrate=CONFIG['bitrate'])
-                .run(overwrite_output=True, quiet=True)
-            )
-            
-            # Remove the original file after conversion
-            if os.path.exists(audio_file) and os.path.exists(output_file):
-                os.remove(audio_file)
-
-            # Extract audio metadata using ffmpeg
-            progress.update(task_id, description=f"[cyan]Extracting audio metadata: {yt.title[:40]}...", completed=85)
-            audio_metadata = extract_audio_metadata(str(output_file))
-            
-            # Save metadata
-            progress.update(task_id, description=f"[cyan]Saving metadata: {yt.title[:40]}...", completed=90)
-            
-            # Load the latest metadata to avoid overwriting other entries
-            existing_metadata = load_existing_metadata()
+            output_file = str(output_path / f'{video_id}.{CONFIG["audio_format"]}')
+            job = {}
+            if CONFIG['stream_transcode']:
+                # Download and transcode in one go: ffmpeg reads the bytes as they arrive
+                progress.update(task_id, f"Streaming to ffmpeg: {yt.title[:40]}")
+                audio_file = None
+                job['audio_metadata'], job['bytes'] = stream_transcode(audio_stream.url, output_file, audio_stream.filesize)
+            else:
+                # Download audio
+                progress.update(task_id, f"Downloading: {yt.title[:40]}")
+                audio_file = audio_stream.download(output_path=output_path)
             
-            # Update the specific video entry in the existing metadata
-            existing_metadata[video_id] = {
-                'title': yt.title or 'Unknown',
-                'channel': yt.author or 'Unknown',
-                'channel_url': yt.channel_url or '',
-                'duration': yt.length or 0,
-                'upload_date': str(yt.publish_date) if yt.publish_date else 'Unknown',
-                'download_date': datetime.now().isoformat(),
-                'url': youtube_url,
-                'audio_file': str(output_file),
-                'audio_metadata': audio_metadata or {},
-                'processed': False,
-                'summary': '',
-                'transcript': extract_transcript_from_description(yt.description or '') if CONFIG['extract_description'] else ''
+            return {
+                **job,
+                'task_id': task_id,
+                'video_id': video_id,
+                'audio_file': audio_file,
+                'output_file': output_file,
+                'record': {
+                    'title': yt.title or 'Unknown',
+                    'channel': yt.author or 'Unknown',
+                    'channel_url': yt.channel_url or '',
+                    'duration': yt.length or 0,
+                    'upload_date': str(yt.publish_date) if yt.publish_date else 'Unknown',
+                    'download_date': datetime.now().isoformat(),
+                    'url': youtube_url,
+                    'processed': False,
+                    'summary': '',
+                    'transcript': extract_transcript_from_description(yt.description or '') if CONFIG['extract_description'] else '',
+                    'chapters': description_chapters.from_description(yt.description or '', yt.length) if CONFIG['extract_description'] else [],
+                },
             }
-
-            save_metadata(existing_metadata)
-            save_checkpoint(youtube_url)
-            
-            progress.update(task_id, description=f"[green]Completed: {yt.title[:40]}...", completed=100)
-            console.log(f"Successfully downloaded {video_id}: {yt.title}")
-            return True
             
         except Exception as e:
-            progress.update(task_id, description=f"[red]Error: {str(e)[:40]}...", completed=100)
-            console.log(f"[bold red]Error:[/bold red] {str(e)}")
-            console.log(f"[bold red]URL causing error:[/bold red] {youtube_url}")
+            error = f"[bold red]Error:[/bold red] {str(e)} [dim]({youtube_url})[/dim]"
             
             # Check for various network-related errors
             retry_errors = [
@@ -479,15 +586,247 @@ def download_audio(youtube_url, progress):
                 if retry_count <= max_retries:
                     # Exponential backoff
                     wait_time = base_wait_time * (2 ** (retry_count - 1))
-                    console.log(f"Waiting {wait_time} seconds before retry...")
+                    progress.log(f"{error} - retrying in {wait_time} seconds", level='warning')
                     time.sleep(wait_time)
                     continue
             
+            progress.finish(task_id, 'failed', error)
             return False
     
     # If we've exhausted all retries
+    progress.finish(task_id, 'failed')
     return False
 
+def parse_ffmpeg_output(log, output_file):
+    """The extract_audio_metadata() fields, read from ffmpeg's own log of the
+    transcode (output stream line and final time=) instead of an ffprobe pass"""
+    output = log.split('Output #0', 1)[-1]
+    stream = re.search(r'Stream #\d+:\d+.*?: Audio: (\w+)[^,\n]*, (\d+) Hz, ([^,\n]+)(?:, \w+)?(?:, (\d+) kb/s)?', output)
+    if not stream:
+        return {}
+    codec, sample_rate, layout, kbps = stream.groups()
+    layout = layout.strip()
+    channels = {'mono': 1, 'stereo': 2}.get(layout)
+    if channels is None:
+        match = re.match(r'(\d+) channels', layout)
+        channels = int(match.group(1)) if match else 0
+    bit_rate = int(kbps) * 1000 if kbps else None
+    times = re.findall(r'time=(\d+):(\d+):(\d+(?:\.\d+)?)', log)
+    if times:
+        hours, minutes, seconds = times[-1]
+        duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    elif bit_rate and os.path.exists(output_file):
+        duration = os.path.getsize(output_file) * 8 / bit_rate  # CBR estimate
+    else:
+        duration = 0
+    return {
+        'codec': codec,
+        'channels': channels,
+        'sample_rate': sample_rate,
+        'bit_rate': str(bit_rate) if bit_rate else 'unknown',
+        'duration': f"{duration:.6f}"
+    }
+
+def stream_transcode(stream_url, output_file, filesize=None):
+    """Streaming mode (--stream): pipe the audio stream into ffmpeg's stdin as it
+    downloads, so the mp3 is written while the bytes arrive and the original
+    never touches the disk.
+
+    The stream is fetched in HTTP Range requests of CONFIG['stream_chunk']
+    bytes; a dropped connection resumes at the last byte received (the ffmpeg
+    process keeps running, so the output is unaffected). The output goes to
+    `<file>.part` and is renamed once ffmpeg exits cleanly. Returns
+    (audio metadata parsed from ffmpeg's log, bytes received)."""
+    part_file = f"{output_file}.part"
+    process = (
+        ffmpeg
+        .input('pipe:0')
+        .output(part_file, ac=1, audio_bitrate=CONFIG['bitrate'], format=CONFIG['audio_format'])
+        .global_args('-hide_banner', '-nostats')
+        .overwrite_output()
+        .run_async(pipe_stdin=True, pipe_stderr=True)
+    )
+    # Drain stderr concurrently so a chatty ffmpeg never blocks on a full pipe
+    log = []
+    drain = threading.Thread(target=lambda: log.append(process.stderr.read().decode('utf-8', 'replace')), daemon=True)
+    drain.start()
+    received = 0
+    failures = 0
+    try:
+        while filesize is None or received < filesize:
+            end = received + CONFIG['stream_chunk'] - 1
+            if filesize:
+                end = min(end, filesize - 1)
+            start = received
+            try:
+                with requests.get(stream_url, headers={'Range': f'bytes={start}-{end}', 'User-Agent': CONFIG['user_agent']},
+                                  stream=True, timeout=30) as response:
+                    if response.status_code == 416:  # Range past the end: all bytes received
+                        break
+                    response.raise_for_status()
+                    if response.status_code == 200 and start:
+                        raise RuntimeError("server ignored the Range header, cannot resume")
+                    for chunk in response.iter_content(256 * 1024):
+                        process.stdin.write(chunk)
+                        received += len(chunk)
+                    whole_body = response.status_code == 200
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+                failures += 1
+                if failures > CONFIG['max_retries']:
+                    raise
+                console.log(f"[yellow]Stream interrupted at byte {received}, resuming:[/yellow] {str(e)}")
+                time.sleep(2 ** failures)
+                continue
+            failures = 0
+            # Unknown size: a whole (unranged) body or a short range is the end
+            if filesize is None and (whole_body or received - start < end - start + 1):
+                break
+        process.stdin.close()
+        process.wait()
+        drain.join()
+        if process.returncode != 0:
+            last_line = (''.join(log).strip().splitlines() or ['no output'])[-1]
+            raise RuntimeError(f"ffmpeg exited with {process.returncode}: {last_line}")
+        os.replace(part_file, output_file)
+    except BaseException:
+        process.kill()
+        process.wait()
+        if os.path.exists(part_file):
+            os.remove(part_file)
+        raise
+    return parse_ffmpeg_output(''.join(log), output_file), received
+
+def transcode_audio(audio_file, output_file):
+    """Transcode stage (CPU bound): convert to the configured format, drop the
+    original and probe the result. Returns the audio metadata."""
+    # Convert to desired format
+    (
+        ffmpeg
+        .input(audio_file)
+        .output(output_file, ac=1, audio_bitrate=CONFIG['bitrate'])
+        .run(overwrite_output=True, quiet=True)
+    )
+    
+    # Remove the original file after conversion
+    if os.path.exists(audio_file) and os.path.exists(output_file):
+        os.remove(audio_file)
+
+    # Extract audio metadata using ffmpeg
+    return extract_audio_metadata(output_file)
+
+def store_audio(job, audio_metadata, progress):
+    """Analyse the transcoded file (waveform.py) and queue the record (the
+    metadata writer thread merges it into the file)"""
+    record = {**job['record'], 'audio_file': job['output_file'], 'audio_metadata': audio_metadata or {}}
+    if CONFIG['waveform']:
+        progress.update(job['task_id'], f"Waveform: {record['title'][:40]}")
+        try:
+            record['waveform_file'], _, _ = waveform.process(job['video_id'], job['output_file'])
+        except Exception as e:
+            # The audio is fine without it: `python3 waveform.py` retries later
+            progress.log(f"[yellow]Waveform failed[/yellow] {job['video_id']}: {e}", level='warning')
+    metadata_store.add(job['video_id'], record, record['url'])  # checkpointed once written
+    progress.finish(job['task_id'], 'saved', f"Successfully downloaded {job['video_id']}: {record['title']}")
+
+def download_audio(youtube_url, progress):
+    """Download, transcode and store one video in the calling thread"""
+    # Show this URL among the in-flight rows while it is processed
+    task_id = progress.start(youtube_url, "Validating URL")
+    job = fetch_audio(youtube_url, progress, task_id)
+    if not isinstance(job, dict):
+        return job
+    if 'audio_metadata' in job:  # already transcoded while streaming
+        store_audio(job, job['audio_metadata'], progress)
+        return True
+    try:
+        progress.update(task_id, f"Converting: {job['record']['title'][:40]}")
+        store_audio(job, transcode_audio(job['audio_file'], job['output_file']), progress)
+        return True
+    except Exception as e:
+        progress.finish(task_id, 'failed', f"[bold red]Error:[/bold red] {str(e)} [dim]({youtube_url})[/dim]")
+        return False
+
+def download_urls(urls, progress):
+    """Archive mode (--download): download and transcode as two pipelined stages.
+
+    download_audio() does the network download, the ffmpeg transcode and the
+    probe one after the other, so a worker slot sized for the network sits on
+    a CPU-bound transcode and a busy network leaves cores idle. Here
+    `max_workers` threads only download; finished downloads go through a
+    bounded queue to `transcode_workers` threads (one per core by default),
+    each driving one ffmpeg process, so the transcodes run in parallel
+    outside the GIL. A full queue blocks the downloaders: at most that many
+    untranscoded originals wait on disk. Both stages report their throughput.
+    
+    With --stream the two stages are one: each download worker pipes its
+    stream into its own ffmpeg process (see stream_transcode) and the
+    transcode pool stays idle.
+    """
+    io_workers = CONFIG['max_workers']
+    cpu_workers = CONFIG['transcode_workers']
+    pending = queue.Queue(maxsize=cpu_workers * 2)
+    progress.set_total(len(urls), "Downloading audio")
+    if CONFIG['stream_transcode']:
+        cpu_workers = 0
+        stages = [progress.stage("stream+transcode", io_workers)]
+    else:
+        stages = [progress.stage("download", io_workers), progress.stage("transcode", cpu_workers, pending)]
+    download_stage = stages[0]
+    transcode_stage = stages[-1]
+    
+    def download(url):
+        task_id = progress.start(url, "Validating URL")
+        started = time.monotonic()
+        job = fetch_audio(url, progress, task_id)
+        if not isinstance(job, dict):
+            if job:
+                save_checkpoint(url)  # skipped: nothing to retry
+            return
+        if 'audio_metadata' in job:  # streamed: already transcoded
+            download_stage.record(time.monotonic() - started, job['bytes'])
+            store_audio(job, job['audio_metadata'], progress)
+            return
+        size = os.path.getsize(job['audio_file']) if os.path.exists(job['audio_file']) else 0
+        download_stage.record(time.monotonic() - started, size)
+        progress.update(task_id, f"Queued for transcode: {job['record']['title'][:40]}")
+        pending.put(job)
+    
+    def transcode():
+        # Nothing may end this loop but the sentinel: with every transcoder
+        # gone the downloaders would block on the full queue for good
+        while (job := pending.get()) is not None:
+            try:
+                progress.update(job['task_id'], f"Converting: {job['record']['title'][:40]}")
+                started = time.monotonic()
+                try:
+                    audio_metadata = transcode_audio(job['audio_file'], job['output_file'])
+                except Exception:
+                    # Not checkpointed, so the next run downloads it again: drop the original
+                    if os.path.exists(job['audio_file']):
+                        os.remove(job['audio_file'])
+                    raise
+                size = os.path.getsize(job['output_file']) if os.path.exists(job['output_file']) else 0
+                transcode_stage.record(time.monotonic() - started, size)
+                store_audio(job, audio_metadata, progress)
+            except Exception as e:
+                progress.finish(job['task_id'], 'failed', f"[bold red]Error:[/bold red] transcode failed for {job['video_id']}: {escape(str(e))}")
+    
+    transcoders = [threading.Thread(target=transcode, name=f'transcode-{i}', daemon=True) for i in range(cpu_workers)]
+    for t in transcoders:
+        t.start()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix='download') as executor:
+        for future in concurrent.futures.as_completed([executor.submit(download, url) for url in urls]):
+            try:
+                future.result()
+            except Exception as e:
+                progress.log(f"[bold red]Error:[/bold red] {str(e)}", level='error')
+    for _ in transcoders:
+        pending.put(None)
+    for t in transcoders:
+        t.join()
+    for stage in stages:
+        console.log(stage.summary())
+
 def parse_youtube_url(url):
     """Parse and normalize YouTube URL to extract ID and type"""
     parsed_url = urlparse(url)
@@ -524,6 +863,53 @@ def parse_youtube_url(url):
     # Default return if we can't identify the URL type
     return {'type': 'unknown', 'id': None}
 
+def flat_listing(url):
+    """One flat yt-dlp listing request (entries only, no per-video extraction)"""
+    ydl_opts = {
+        'quiet': True,
+        'extract_flat': True,
+        'skip_download': True,
+        'no_warnings': True,
+        'user_agent': CONFIG['user_agent']
+    }
+    
+    # Apply rate limiting
+    ratelimit.wait(url)
+    return ydl_pool.get(ydl_opts).extract_info(url, download=False)
+
+# Per-channel cursors for --incremental, loaded on first use; the cursors the
+# walks propose ({channel_url: (cursor, entries)}) are stored by process_url
+# once every new upload is checkpointed or in the metadata file
+channel_state = None
+proposed_cursors = {}
+
+def is_known_video(video_id):
+    """Already in the metadata file or already processed according to the checkpoint"""
+    return (video_id in metadata_store
+            or f"https://www.youtube.com/watch?v={video_id}" in load_checkpoint()['processed_urls'])
+
+def get_new_urls_from_channel(channel_url):
+    """Incremental channel listing: only uploads newer than the channel's cursor
+    or the last `stop_after` consecutive known videos (see channel_cursor.py)"""
+    global channel_state
+    if channel_state is None:
+        channel_state = channel_cursor.load_state()
+    ydl_opts = {
+        'quiet': True,
+        'extract_flat': True,
+        'skip_download': True,
+        'no_warnings': True,
+        'user_agent': CONFIG['user_agent']
+    }
+    ratelimit.wait(channel_url)
+    entries, cursor = channel_cursor.crawl(ydl_pool.get(ydl_opts), channel_url, is_known_video,
+                                           channel_state, CONFIG['stop_after'])
+    proposed_cursors[channel_url] = (cursor, entries)
+    urls = [f"https://www.youtube.com/watch?v={entry['id']}" for entry in entries]
+    read = cursor['read'] if cursor else len(urls)
+    console.log(f"Processing channel incrementally: {channel_url} ({read} uploads read, {len(urls)} new)")
+    return urls
+
 def get_urls_from_channel(channel_url, depth=0):
     """Extract all video URLs from a channel"""
     if depth > CONFIG['recursive_depth']:
@@ -531,32 +917,27 @@ def get_urls_from_channel(channel_url, depth=0):
     
     urls = []
     try:
-        # Apply rate limiting
-        rate_limiter.wait()
-        
-        channel = Channel(channel_url)
-        console.log(f"Processing channel: {channel.channel_name}")
-        
-        # Use yt-dlp for better channel scraping
-        ydl_opts = {
-            'quiet': True,
-            'extract_flat': True,
-            'skip_download': True,
-            'no_warnings': True,
-            'user_agent': CONFIG['user_agent']
-        }
+        if CONFIG['incremental']:
+            try:
+                return get_new_urls_from_channel(channel_url)
+            except Exception as ydl_err:
+                console.log(f"[yellow]Incremental listing failed, listing the whole channel: {str(ydl_err)}")
         
+        # Use yt-dlp for better channel scraping; pytube only as a fallback
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                channel_info = ydl.extract_info(channel_url, download=False)
-                if 'entries' in channel_info:
-                    for entry in channel_info['entries']:
-                        if entry.get('url'):
-                            video_url = f"https://www.youtube.com/watch?v={entry['id']}"
-                            urls.append(video_url)
+            channel_info = flat_listing(channel_url)
+            console.log(f"Processing channel: {channel_info.get('channel') or channel_info.get('title', channel_url)}")
+            if 'entries' in channel_info:
+                for entry in channel_info['entries']:
+                    if entry.get('url'):
+                        video_url = f"https://www.youtube.com/watch?v={entry['id']}"
+                        urls.append(video_url)
         except Exception as ydl_err:
             console.log(f"[yellow]yt-dlp error, falling back to pytube: {str(ydl_err)}")
-            # Fallback to pytube
+            # Fallback to pytube, created only now (constructing it costs its own page fetch)
+            ratelimit.wait(channel_url)
+            channel = Channel(channel_url)
+            console.log(f"Processing channel: {channel.channel_name}")
             urls = list(channel.video_urls)
             
         return urls
@@ -571,31 +952,20 @@ def get_urls_from_playlist(playlist_url, depth=0):
     
     urls = []
     try:
-        # Apply rate limiting
-        rate_limiter.wait()
-        
         # Try yt-dlp first for better playlist extraction
-        ydl_opts = {
-            'quiet': True,
-            'extract_flat': True,
-            'skip_download': True,
-            'no_warnings': True,
-            'user_agent': CONFIG['user_agent']
-        }
-        
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                playlist_info = ydl.extract_info(playlist_url, download=False)
-                console.log(f"Processing playlist: {playlist_info.get('title', 'Unknown')}")
-                
-                if 'entries' in playlist_info:
-                    for entry in playlist_info['entries']:
-                        if entry and entry.get('id'):
-                            video_url = f"https://www.youtube.com/watch?v={entry['id']}"
-                            urls.append(video_url)
+            playlist_info = flat_listing(playlist_url)
+            console.log(f"Processing playlist: {playlist_info.get('title', 'Unknown')}")
+            
+            if 'entries' in playlist_info:
+                for entry in playlist_info['entries']:
+                    if entry and entry.get('id'):
+                        video_url = f"https://www.youtube.com/watch?v={entry['id']}"
+                        urls.append(video_url)
         except Exception as ydl_err:
             console.log(f"[yellow]yt-dlp error, falling back to pytube: {str(ydl_err)}")
             # Fallback to pytube
+            ratelimit.wait(playlist_url)
             playlist = Playlist(playlist_url)
             console.log(f"Processing playlist: {playlist.title}")
             urls = list(playlist.video_urls)
@@ -605,58 +975,75 @@ def get_urls_from_playlist(playlist_url, depth=0):
         console.log(f"[bold red]Error processing playlist:[/bold red] {str(e)}")
         return []
 
-def discover_urls(url, depth=0):
-    """Recursively discover URLs from channels, playlists, and videos"""
-    discovered = set()
-    
+def get_channel_playlists(channel_url):
+    """List the playlist URLs of a channel (its /playlists tab)"""
+    try:
+        info = flat_listing(channel_url.rstrip('/') + '/playlists')
+    except Exception as e:
+        console.log(f"[yellow]Error discovering channel playlists: {str(e)}")
+        return []
+    return [entry['url'] for entry in info.get('entries') or [] if entry and entry.get('url')]
+
+def discover_one(url, depth):
+    """Discover a single URL: returns (video URLs, [(child URL, depth)])"""
     # Parse the URL to identify its type
     parsed = parse_youtube_url(url)
+    kind = parsed['type']
+    if kind == 'unknown':
+        # Try to handle as a regular URL
+        if 'youtube.com/channel/' in url or 'youtube.com/c/' in url or 'youtube.com/@' in url:
+            kind = 'channel'
+        elif 'playlist?list=' in url:
+            kind = 'playlist'
+    
+    if kind in ('channel', 'channel_name'):
+        videos = get_urls_from_channel(url, depth)
+        # If recursive, also process playlists in the channel
+        children = []
+        if depth < CONFIG['recursive_depth']:
+            children = [(playlist_url, depth + 1) for playlist_url in get_channel_playlists(url)]
+        return videos, children
+    if kind == 'playlist':
+        return get_urls_from_playlist(url, depth), []
+    # Single video URL (or anything else)
+    return [url], []
+
+def discover_urls(url, depth=0):
+    """Discover URLs from channels, playlists, and videos, level by level.
+
+    Each depth level is crawled concurrently (`max_workers` listings at a
+    time, paced by the shared youtube.com budget), and a playlist or channel
+    reached twice, at the same or a different depth, is only listed once.
+    """
+    discovered = set()
     
     # Base case for recursion
     if depth > CONFIG['recursive_depth']:
         return discovered
     
-    # Handle different URL types based on parsed info
-    if parsed['type'] == 'channel' or parsed['type'] == 'channel_name':
-        # Channel URL
-        videos = get_urls_from_channel(url, depth)
-        discovered.update(videos)
-        
-        # If recursive, also process playlists in the channel
-        if depth < CONFIG['recursive_depth']:
-            try:
-                channel = Channel(url)
-                for playlist_url in channel.playlist_urls:
-                    # Add a small random delay to avoid rate limiting
-                    time.sleep(random.uniform(0.5, 1.5))
-                    discovered.update(discover_urls(playlist_url, depth + 1))
-            except Exception as e:
-                console.log(f"[yellow]Error discovering channel playlists: {str(e)}")
-                
-    elif parsed['type'] == 'playlist':
-        # Playlist URL
-        videos = get_urls_from_playlist(url, depth)
-        discovered.update(videos)
-    elif parsed['type'] == 'video':
-        # Single video URL
-        discovered.add(url)
-    else:
-        # Try to handle as a regular URL
-        if 'youtube.com/channel/' in url or 'youtube.com/c/' in url or 'youtube.com/@' in url:
-            videos = get_urls_from_channel(url, depth)
-            discovered.update(videos)
-        elif 'playlist?list=' in url:
-            videos = get_urls_from_playlist(url, depth)
-            discovered.update(videos)
-        else:
-            discovered.add(url)
+    def crawl_key(u):
+        parsed = parse_youtube_url(u)
+        return (parsed['type'], parsed['id']) if parsed['id'] else u
+    
+    seen = {crawl_key(url)}
+    frontier = [(url, depth)]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, CONFIG['max_workers'])) as executor:
+        while frontier:
+            next_frontier = []
+            for videos, children in executor.map(lambda item: discover_one(*item), frontier):
+                discovered.update(videos)
+                for child_url, child_depth in children:
+                    key = crawl_key(child_url)
+                    if key not in seen:
+                        seen.add(key)
+                        next_frontier.append((child_url, child_depth))
+            frontier = next_frontier
         
     return discovered
 
 def process_urls(urls, progress):
-    """Process multiple URLs in parallel with managed progress displays"""
-    # Add a task for overall progress
-    overall_task = progress.add_task("[bold blue]Overall Progress", total=len(urls))
+    """Process multiple URLs in parallel; each worker's URL shows as an in-flight row"""
+    progress.set_total(len(urls), "Extracting metadata")
     
     with concurrent.futures.ThreadPoolExecutor(max_workers=CONFIG['max_workers']) as executor:
         futures = []
@@ -670,70 +1057,158 @@ def process_urls(urls, progress):
         for i, future in enumerate(concurrent.futures.as_completed(futures)):
             url = future.url
             try:
-                success = future.result()
-                if success:
-                    save_checkpoint(url)
+                future.result()  # extract_metadata checkpoints the URL (at the flush, if saved)
             except Exception as e:
-                console.log(f"[bold red]Error processing {url}: {str(e)}")
-            finally:
-                # Update overall progress
-                progress.update(overall_task, advance=1)
+                progress.log(f"[bold red]Error processing {url}: {str(e)}", level='error')
+
+async def run_pipeline(urls, progress):
+    """Pipeline mode (--pipeline): discovery -> extract -> validate -> persist.
+
+    process_urls() submits every URL to the thread pool up front and gives each
+    one its own progress bar. Here the stages are coroutines connected by
+    bounded queues: `max_workers` extractors run the blocking yt-dlp calls in
+    an executor (paced by the shared youtube.com budget), validation and
+    persistence run on the event loop, and a full queue blocks the stage
+    feeding it. Only a few info dicts are ever in flight however many URLs
+    there are.
+    """
+    loop = asyncio.get_running_loop()
+    workers = CONFIG['max_workers']
+    url_queue = asyncio.Queue(maxsize=workers * 2)
+    info_queue = asyncio.Queue(maxsize=workers * 2)
+    record_queue = asyncio.Queue(maxsize=workers * 2)
+    progress.set_total(len(urls), "Pipeline")
+    
+    async def discover():
+        for url in urls:
+            await url_queue.put(url)
+        for _ in range(workers):
+            await url_queue.put(None)
+    
+    async def extract(executor):
+        while (url := await url_queue.get()) is not None:
+            task_id = progress.start(url, "Fetching metadata with yt-dlp")
+            if not validate_youtube_url(url):
+                progress.finish(task_id, 'failed', f"[bold red]Error:[/bold red] Invalid YouTube URL: {url}")
+                continue
+            try:
+                info_dict = await loop.run_in_executor(executor, fetch_video_info, url)
+            except Exception as e:
+                # Not checkpointed, so the next run retries it
+                progress.finish(task_id, 'failed', f"[bold red]Error:[/bold red] {str(e)} [dim]({url})[/dim]")
+                continue
+            progress.update(task_id, "Waiting for validation")
+            await info_queue.put((task_id, url, info_dict))
+    
+    async def validate():
+        while (item := await info_queue.get()) is not None:
+            task_id, url, info_dict = item
+            try:
+                video_id, reason = check_video(url, info_dict)
+                record = None if reason else build_record(url, info_dict)
+            except Exception as e:
+                progress.finish(task_id, 'failed', f"[bold red]Error:[/bold red] {str(e)} [dim]({url})[/dim]")
+                continue
+            if reason:
+                save_checkpoint(url)
+                progress.finish(task_id, 'skipped', f"Skipping {video_id} - {reason}")
+            else:
+                progress.update(task_id, "Waiting to be saved")
+                await record_queue.put((task_id, url, video_id, record))
+        await record_queue.put(None)
+    
+    async def persist():
+        while (item := await record_queue.get()) is not None:
+            task_id, url, video_id, record = item
+            metadata_store.add(video_id, record, url)  # checkpointed once written
+            progress.finish(task_id, 'saved', f"Saved {video_id}: {record['title']}")
+    
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix='yt-dlp') as executor:
+        extractors = [asyncio.create_task(extract(executor)) for _ in range(workers)]
+        downstream = [asyncio.create_task(validate()), asyncio.create_task(persist())]
+        await discover()
+        await asyncio.gather(*extractors)
+        await info_queue.put(None)
+        await asyncio.gather(*downstream)
+    return progress.snapshot()
 
 def process_url(url):
     # Load checkpoint data
     checkpoint = load_checkpoint()
     resume_from = checkpoint.get('last_url')
-    processed_urls = set(checkpoint.get('processed_urls', []))
-    
-    # Create a rich progress display
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        BarColumn(),
-        TaskProgressColumn(),
-        TimeElapsedColumn(),
-    ) as progress:
+    processed_urls = checkpoint['processed_urls']
+    
+    # Aggregate counters plus one row per in-flight URL, however many URLs there are
+    with CrawlProgress(console, rows=CONFIG['max_workers'], jsonl=CONFIG['jsonl'],
+                       log_rate=CONFIG['log_rate']) as progress:
         # Display resume information if applicable
         if resume_from:
             console.log(f"[bold green]Resuming from checkpoint:[/bold green] {resume_from}")
 
         # Discover all URLs to process
-        discovery_task = progress.add_task("[yellow]Discovering content...", total=100)
+        progress.set_total(None, "Discovering content...")
         all_urls = discover_urls(url)
-        progress.update(discovery_task, completed=100, description="[green]Discovery complete")
         
+        # Filter URLs before they reach the executor: already checkpointed, or
+        # already in the metadata file under another URL form
+        urls_to_process = []
+        known_videos = 0
+        for u in all_urls:
+            if u in processed_urls:
+                continue
+            parsed = parse_youtube_url(u)
+            if parsed['type'] == 'video' and parsed['id'] in metadata_store:
+                known_videos += 1
+                save_checkpoint(u)
+                continue
+            urls_to_process.append(u)
+
         # Create a summary table
         table = Table(title="Content Summary")
         table.add_column("Type", style="cyan")
         table.add_column("Count", style="magenta")
         table.add_row("Videos to download", str(len(all_urls)))
-        table.add_row("Already processed", str(len(processed_urls & all_urls)))
-        table.add_row("New to process", str(len(all_urls - processed_urls)))
-        console.print(Panel(table))
-        
-        # Filter URLs - remove already processed and get ones to process
-        urls_to_process = [u for u in all_urls if u not in processed_urls or u == resume_from]
-        
-        # Reset resume point after finding it
-        if resume_from in urls_to_process:
-            resume_index = urls_to_process.index(resume_from)
-            urls_to_process = urls_to_process[resume_index:]
-        
+        table.add_row("Already processed", str(len(all_urls) - len(urls_to_process)))
+        table.add_row("New to process", str(len(urls_to_process)))
+        if CONFIG['jsonl']:
+            progress.log("Content summary", found=len(all_urls), new=len(urls_to_process))
+        else:
+            console.print(Panel(table))
+        if known_videos:
+            console.log(f"{known_videos} videos already in {CONFIG['metadata_file']} marked as processed")
+
         # Process all discovered URLs in parallel if there's more than one
         if urls_to_process:
-            if len(urls_to_process) > 1 and CONFIG['max_workers'] > 1:
+            if CONFIG['download']:
+                download_urls(urls_to_process, progress)
+            elif CONFIG['pipeline']:
+                counts = asyncio.run(run_pipeline(urls_to_process, progress))
+                console.log(f"Pipeline finished: {counts['saved']} saved, {counts['skipped']} skipped, {counts['failed']} failed")
+            elif len(urls_to_process) > 1 and CONFIG['max_workers'] > 1:
                 process_urls(urls_to_process, progress)
             else:
                 # Process sequentially for single URLs or if parallel disabled
+                progress.set_total(len(urls_to_process), "Extracting metadata")
                 for video_url in urls_to_process:
-                    success = extract_metadata(video_url, progress)
-                    if success:
-                        save_checkpoint(video_url)
+                    extract_metadata(video_url, progress)
         else:
             console.print("[yellow]No new content to process[/yellow]")
 
+    written = metadata_store.flush()
+    if written:
+        console.log(f"Saved {written} new records to {CONFIG['metadata_file']}")
+    compact_checkpoint()
+    # Move a channel's cursor only now that its new uploads are all recorded:
+    # one that failed keeps the walk going back down to it next time
+    for channel_url, (cursor, entries) in proposed_cursors.items():
+        if not channel_cursor.advance(channel_state, channel_url, cursor, entries, is_known_video) and cursor:
+            console.log(f"[yellow]Cursor of {channel_url} not moved:[/yellow] some new uploads were not processed")
+    proposed_cursors.clear()
+    ratelimit.print_stats(console.log)
+
 def display_stats():
     """Display statistics about downloaded audiobooks"""
+    metadata_store.flush()
     metadata = load_existing_metadata()
     
     if not metadata:
@@ -770,10 +1245,26 @@ if __name__ == '__main__':
                       help=f'Minimum video duration in seconds (default: {CONFIG["min_duration"]} - no limit)')
     parser.add_argument('--max-duration', type=int, default=CONFIG['max_duration'],
                       help=f'Maximum video duration in seconds (default: {CONFIG["max_duration"]} - no limit)')
-    parser.add_argument('--rate-limit', type=float, default=CONFIG['rate_limit'],
-                      help=f'Rate limit in seconds between requests (default: {CONFIG["rate_limit"]})')
+    parser.add_argument('--rate-limit', type=float, default=None,
+                      help='Rate limit in seconds between requests (default: the youtube.com budget in ratelimit.py, or RATE_LIMIT)')
     parser.add_argument('--no-transcript', action='store_true', 
                       help='Disable transcript extraction from descriptions')
+    parser.add_argument('--incremental', action='store_true',
+                      help=f'Walk channels newest-first only down to the last crawl or known videos (cursors in {channel_cursor.STATE_FILE})')
+    parser.add_argument('--stop-after', type=int, default=CONFIG['stop_after'],
+                      help=f'Incremental mode: stop after this many consecutive known videos (default: {CONFIG["stop_after"]})')
+    parser.add_argument('--download', action='store_true',
+                      help='Also download the audio and transcode it to mp3 (download and transcode run as separate pipelined stages)')
+    parser.add_argument('--transcode-workers', type=int, default=CONFIG['transcode_workers'],
+                      help=f'--download: concurrent ffmpeg transcodes (default: {CONFIG["transcode_workers"]}, one per core)')
+    parser.add_argument('--stream', action='store_true',
+                      help='--download: pipe the audio stream straight into ffmpeg (no intermediate file, resumable ranged requests)')
+    parser.add_argument('--no-waveform', action='store_true',
+                      help='--download: skip the waveform peaks / chapter markers pass (waveform.py) after each transcode')
+    parser.add_argument('--jsonl', action='store_true',
+                      help='Write one JSON object per processed URL, log line and heartbeat to stdout instead of the live display')
+    parser.add_argument('--pipeline', action='store_true',
+                      help='Stream URLs through a bounded asyncio pipeline (extract -> validate -> persist) with one aggregate progress bar')
     
     args = parser.parse_args()
     
@@ -788,9 +1279,26 @@ if __name__ == '__main__':
         CONFIG['max_duration'] = args.max_duration
     if args.rate_limit is not None:
         CONFIG['rate_limit'] = args.rate_limit
-        rate_limiter = RateLimiter(CONFIG['rate_limit'])
+        configure_rate_limit()
     if args.no_transcript:
         CONFIG['extract_description'] = False
+    if args.pipeline:
+        CONFIG['pipeline'] = True
+    if args.jsonl:
+        CONFIG['jsonl'] = True
+    if args.download:
+        CONFIG['download'] = True
+    if args.stream:
+        CONFIG['download'] = CONFIG['stream_transcode'] = True
+    CONFIG['transcode_workers'] = max(1, args.transcode_workers)
+    if args.no_waveform:
+        CONFIG['waveform'] = False
+    if CONFIG['jsonl']:
+        # stdout carries the JSON lines; everything else goes to stderr
+        console.file = sys.stderr
+    if args.incremental:
+        CONFIG['incremental'] = True
+    CONFIG['stop_after'] = args.stop_after
         
     if args.stats:
         display_stats()
@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 import json
 import os
-import time
 import argparse
 import requests
 from rich.console import Console
@@ -10,12 +9,15 @@ from rich.panel import Panel
 from rich.table import Table
 import filelock
 
+import catalog
+import ratelimit
+
 console = Console()
 
 # Configuration
 CONFIG = {
-    'input_file': 'audiobooks.json',
-    'output_file': 'augmented.json',
+    'input_file': catalog.SOURCE_FILE,
+    'output_file': catalog.OVERLAY_FILE,  # enrichment overlay, see catalog.py
     'checkpoint_file': 'augment_checkpoint.json',
     'api_url': os.environ.get('LLM_API_URL', 'http://localhost:1234/v1/chat/completions'),
     'batch_size': 10,  # Process this many items before saving checkpoint
@@ -32,8 +34,9 @@ def load_audiobooks():
     try:
         with INPUT_LOCK:
             try:
-                with open(CONFIG['input_file'], 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                if not catalog.exists(CONFIG['input_file']):
+                    raise FileNotFoundError(f"No such file: '{CONFIG['input_file']}'")
+                return catalog.read_json(CONFIG['input_file'])
             except (FileNotFoundError, json.JSONDecodeError) as e:
                 console.print(f"[bold red]Error:[/bold red] {str(e)}")
                 return {}
@@ -64,42 +67,36 @@ def save_checkpoint(processed_ids):
     except filelock.Timeout:
         console.log("[bold yellow]Warning:[/bold yellow] Could not acquire checkpoint file lock. Checkpoint not saved.")
 
-def save_augmented_data(audiobooks):
-    """Save the augmented audiobooks to the output file."""
+def load_overlay(audiobooks):
+    """Load the existing enrichment overlay (derived from a legacy augmented.json on first run)."""
     try:
         with OUTPUT_LOCK:
-            # Create a backup if the output file already exists
-            if os.path.exists(CONFIG['output_file']):
-                backup_file = f"{CONFIG['output_file']}.bak"
+            if catalog.exists(CONFIG['output_file']):
+                return catalog.read_json(CONFIG['output_file'])
+            return catalog.split(catalog.read_json(catalog.VIEW_FILE), audiobooks)
+    except (filelock.Timeout, json.JSONDecodeError) as e:
+        console.log(f"[bold yellow]Warning:[/bold yellow] Could not load enrichment overlay ({e}). Starting empty.")
+        return {}
+
+def save_augmented_data(overlay):
+    """Save the enrichment overlay to the output file."""
+    try:
+        with OUTPUT_LOCK:
+            # Create a (compressed) backup if the output file already exists
+            if catalog.exists(CONFIG['output_file']):
                 try:
-                    import shutil
-                    shutil.copy2(CONFIG['output_file'], backup_file)
+                    catalog.snapshot(CONFIG['output_file'], 'bak')
                 except Exception as e:
                     console.log(f"[bold yellow]Warning:[/bold yellow] Failed to create backup: {e}")
             
-            # Write the new metadata
-            with open(CONFIG['output_file'], 'w', encoding='utf-8') as f:
-                json.dump(audiobooks, f, indent=2, ensure_ascii=False)
+            # Write only the enrichment fields; the merged view is built on demand
+            catalog.write_json(CONFIG['output_file'], overlay)
     except filelock.Timeout:
         console.log("[bold red]Error:[/bold red] Could not acquire output file lock. Changes not saved.")
 
-# Rate limiter class to match the one in audiobook_scraper.py
-class RateLimiter:
-    def __init__(self, rate_limit):
-        self.rate_limit = rate_limit
-        self.last_request = 0
-        
-    def wait(self):
-        if self.rate_limit <= 0:
-            return
-            
-        now = time.time()
-        elapsed = now - self.last_request
-        if elapsed < self.rate_limit:
-            time.sleep(self.rate_limit - elapsed)
-        self.last_request = time.time()
-
-rate_limiter = RateLimiter(CONFIG['rate_limit'])
+# The LLM endpoint gets its own token bucket in the shared limiter (see ratelimit.py);
+# main() reconfigures it from --rate-limit.
+ratelimit.configure(CONFIG['api_url'], interval=CONFIG['rate_limit'])
 
 def get_augmented_info(book_id, book_data):
     """Query the local LLM to get augmented information about the book."""
@@ -138,7 +135,7 @@ Non includere altro testo nella tua risposta.
     }
     
     # Apply rate limiting before making request
-    rate_limiter.wait()
+    ratelimit.wait(CONFIG['api_url'])
     
     try:
         response = requests.post(CONFIG['api_url'], headers=headers, json=data)
@@ -223,7 +220,7 @@ def display_stats(audiobooks):
 def main():
     parser = argparse.ArgumentParser(description='Augment audiobook metadata with LLM-generated information')
     parser.add_argument('--input', default=CONFIG['input_file'], help=f'Path to input JSON file (default: {CONFIG["input_file"]})')
-    parser.add_argument('--output', default=CONFIG['output_file'], help=f'Path to output JSON file (default: {CONFIG["output_file"]})')
+    parser.add_argument('--output', default=CONFIG['output_file'], help=f'Path to the enrichment overlay JSON file (default: {CONFIG["output_file"]})')
     parser.add_argument('--resume', action='store_true', help='Resume from last checkpoint')
     parser.add_argument('--batch', type=int, default=CONFIG['batch_size'], help=f'Batch size for checkpointing (default: {CONFIG["batch_size"]})')
     parser.add_argument('--rate-limit', type=float, default=CONFIG['rate_limit'], help=f'Seconds between API calls (default: {CONFIG["rate_limit"]})')
@@ -237,8 +234,8 @@ def main():
     CONFIG['batch_size'] = args.batch
     CONFIG['rate_limit'] = args.rate_limit
     
-    # Update rate limiter
-    rate_limiter = RateLimiter(CONFIG['rate_limit'])
+    # Update the shared limiter (a local RateLimiter here was never seen by get_augmented_info)
+    ratelimit.configure(CONFIG['api_url'], interval=CONFIG['rate_limit'])
     
     # Load audiobooks
     console.print(f"[bold]Loading audiobook data from[/bold] {CONFIG['input_file']}...")
@@ -250,10 +247,11 @@ def main():
     
     total_books = len(audiobooks)
     console.print(f"[bold green]Loaded {total_books} audiobooks.[/bold green]")
+    overlay = load_overlay(audiobooks)
     
     # Just show stats if requested
     if args.stats:
-        display_stats(audiobooks)
+        display_stats(catalog.merge(audiobooks, overlay))
         return
     
     # Load checkpoint if resuming
@@ -297,8 +295,8 @@ def main():
             # Get augmented information
             augmented_info = get_augmented_info(book_id, book_data)
             
-            # Update the book data
-            book_data.update(augmented_info)
+            # Record the enrichment in the overlay (the source record stays untouched)
+            overlay.setdefault(book_id, {}).update(augmented_info)
             
             # Mark as processed
             processed_ids.append(book_id)
@@ -307,7 +305,7 @@ def main():
             # Save checkpoint and data periodically
             if batch_count >= CONFIG['batch_size']:
                 save_checkpoint(processed_ids)
-                save_augmented_data(audiobooks)
+                save_augmented_data(overlay)
                 console.log(f"[bold green]Checkpoint saved after {batch_count} books.[/bold green]")
                 batch_count = 0
             
@@ -316,14 +314,15 @@ def main():
     
     # Final save
     save_checkpoint(processed_ids)
-    save_augmented_data(audiobooks)
+    save_augmented_data(overlay)
     
     # Display final stats
     console.print(f"[bold green]Augmentation complete! Processed {len(processed_ids)} audiobooks.[/bold green]")
     console.print(f"[bold]Augmented data saved to[/bold] {CONFIG['output_file']}")
+    ratelimit.print_stats(console.log)
     
     # Show final stats
-    display_stats(audiobooks)
+    display_stats(catalog.merge(audiobooks, overlay))
 
 if __name__ == "__main__":
     try:
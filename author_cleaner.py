@@ -8,12 +8,12 @@ This script fixes common issues in author names:
 - Standardizes author name formats
 """
 
-import json
-import shutil
 from datetime import datetime
 from collections import Counter
 import re
 
+import catalog
+
 def main():
     print("👤 Author Data Cleaner")
     print("=" * 50)
@@ -22,17 +22,16 @@ def main():
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
     try:
-        shutil.copy('augmented.json', f'augmented.json.backup_authors_{timestamp}')
-        print(f"✅ Created backup: augmented.json.backup_authors_{timestamp}")
+        backup_file = catalog.backup(f'backup_authors_{timestamp}')
+        print(f"✅ Created backup: {backup_file}")
     except Exception as e:
         print(f"❌ Failed to create backup: {e}")
         return
     
     # Load data
     try:
-        with open('augmented.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        print(f"✅ Loaded {len(data)} books from augmented.json")
+        data = catalog.load_view()
+        print(f"✅ Loaded {len(data)} books from the catalogue")
     except Exception as e:
         print(f"❌ Failed to load data: {e}")
         return
@@ -125,9 +124,8 @@ def main():
     if total_changes > 0:
         # Save changes
         try:
-            with open('augmented.json', 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            print(f"✅ Saved changes to augmented.json")
+            catalog.save_view(data)
+            print(f"✅ Saved changes to {catalog.OVERLAY_FILE}")
             
             # Show new author distribution
             print(f"\n📈 Updated author statistics:")
@@ -10,16 +10,16 @@ This script standardizes author names to achieve consistent formatting:
 """
 
 import json
-import shutil
 import re
 from datetime import datetime
 from collections import Counter
 
-def create_backup(filename):
-    """Create a backup of the original file"""
+import catalog
+
+def create_backup():
+    """Create a backup of the catalogue's editable layer"""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_filename = f"{filename}.backup_authors_{timestamp}"
-    shutil.copy2(filename, backup_filename)
+    backup_filename = catalog.backup(f"backup_authors_{timestamp}")
     print(f"📁 Backup created: {backup_filename}")
     return backup_filename
 
@@ -201,18 +201,17 @@ def analyze_changes_needed(data):
     return changes_preview, authors
 
 def main():
-    filename = 'augmented.json'
+    filename = catalog.OVERLAY_FILE
     
     print("🔧 Author Name Standardizer")
     print("=" * 50)
     
     # Load data
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        print(f"📚 Loaded {len(data)} books from {filename}")
-    except FileNotFoundError:
-        print(f"❌ File {filename} not found!")
+        data = catalog.load_view()
+        print(f"📚 Loaded {len(data)} books from the catalogue")
+    except FileNotFoundError as e:
+        print(f"❌ File {e.filename} not found!")
         return
     except json.JSONDecodeError as e:
         print(f"❌ Error reading JSON: {e}")
@@ -285,7 +284,7 @@ def main():
         return
     
     # Create backup
-    backup_file = create_backup(filename)
+    backup_file = create_backup()
     
     # Apply changes
     total_changes = 0
@@ -313,13 +312,11 @@ def main():
     
     # Save the updated data
     try:
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        catalog.save_view(data)
         print(f"\n✅ Successfully updated {filename}")
     except Exception as e:
+        # save_view writes atomically, so the previous file is still intact
         print(f"❌ Error saving file: {e}")
-        print(f"🔄 Restoring from backup...")
-        shutil.copy2(backup_file, filename)
         return
     
     # Final summary
@@ -13,15 +13,19 @@ changes. Dead weight dropped: full `description` (kept only as a 320-char
 `real_synopsis` fallback), `transcript`, `summary`, `raw_response`, and other
 build-time fields never read by the client.
 
+The source is the merged catalogue view (audiobooks.json + enrichment.json,
+or a legacy augmented.json) as materialized by catalog.load_view().
+
 Run at build time (before/with generate_pages.py):  python3 build_index.py
 Output: index.min.json  (app.js fetches this instead of augmented.json)
 """
-import json
-import gzip
 import os
 import sys
+import zlib
+
+import catalog
+import jsoncodec
 
-SRC_CANDIDATES = ["augmented.json", "audiobooks.json"]
 OUT = "index.min.json"
 
 # Max synopsis length kept in the index. displayBook() already trims to 320,
@@ -44,10 +48,11 @@ KEEP = {
 
 
 def pick_source():
-    for name in SRC_CANDIDATES:
-        if os.path.exists(name):
-            return name
-    sys.exit(f"No source dataset found (looked for {SRC_CANDIDATES}).")
+    sources = catalog.view_sources()
+    if not sources:
+        sys.exit(f"No source dataset found (looked for {catalog.OVERLAY_FILE}, "
+                 f"{catalog.VIEW_FILE}, {catalog.SOURCE_FILE}).")
+    return sources
 
 
 def reduce_record(book):
@@ -69,21 +74,32 @@ def reduce_record(book):
 
 def main():
     src = pick_source()
-    with open(src, encoding="utf-8") as f:
-        data = json.load(f)
-
-    index = {vid: reduce_record(book) for vid, book in data.items()}
 
-    payload = json.dumps(index, ensure_ascii=False, separators=(",", ":"))
+    # Stream record by record (catalog.iter_view) and write as we go: neither the
+    # full catalogue nor the full index is ever held in memory. The output is
+    # byte-identical to json.dumps(index, separators=(",", ":")).
+    raw = count = 0
+    gz = zlib.compressobj(9, zlib.DEFLATED, 31)  # gzip container, level 9
+    gz_size = 0
     with open(OUT, "w", encoding="utf-8") as f:
-        f.write(payload)
-
-    raw = len(payload.encode("utf-8"))
-    gz = len(gzip.compress(payload.encode("utf-8"), 9))
-    src_raw = os.path.getsize(src)
-    print(f"source      : {src} ({src_raw/1e6:.2f} MB)")
-    print(f"{OUT} : {raw/1e6:.2f} MB raw / {gz/1024:.0f} KB gzip  ({len(index)} records)")
-    print(f"reduction   : {100*(1-raw/src_raw):.0f}% raw vs source")
+        for vid, book in catalog.iter_view():
+            part = (("{" if count == 0 else ",") + jsoncodec.dumps(vid) + ":"
+                    + jsoncodec.dumps(reduce_record(book)))
+            f.write(part)
+            data = part.encode("utf-8")
+            raw += len(data)
+            gz_size += len(gz.compress(data))
+            count += 1
+        tail = "}" if count else "{}"
+        f.write(tail)
+    raw += len(tail)
+    gz_size += len(gz.compress(tail.encode("utf-8"))) + len(gz.flush())
+
+    src_raw = sum(os.path.getsize(p) for p in src)
+    print(f"source      : {' + '.join(str(p) for p in src)} ({src_raw/1e6:.2f} MB)")
+    print(f"{OUT} : {raw/1e6:.2f} MB raw / {gz_size/1024:.0f} KB gzip  ({count} records)")
+    if not any(p.suffix in catalog.COMPRESSED for p in src):
+        print(f"reduction   : {100*(1-raw/src_raw):.0f}% raw vs source")
 
 
 if __name__ == "__main__":
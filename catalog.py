@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""Layered catalogue store shared by the scrapers, the enrichment tools and the build.
+
+Every scraper used to build a record for `audiobooks.json` plus a near-duplicate
+`{**main_entry, ...}` copy for `augmented.json`, then rewrite both files in
+full. The two files carried the same description/tags/chapters twice and could
+drift apart whenever one tool touched only one of them.
+
+The catalogue is now stored in two layers:
+
+    audiobooks.json   source layer  — raw fields as scraped, stored once
+    enrichment.json   overlay layer — only the fields added or changed on top
+                      of the source record (real_title, real_author, embed_*,
+                      audio_chapters, cleaner fixes, ...)
+
+`augmented.json` is no longer written by the scrapers: it is a materialized
+view (source record updated with its overlay), produced on demand by
+`load_view()` for the build or by `python3 catalog.py materialize` for tools
+that still want the merged file on disk.
+
+Migration is automatic: while `enrichment.json` does not exist yet, the overlay
+is derived from a legacy `augmented.json` (diffed against the source layer),
+and the first save writes it out.
+
+Every catalogue file may also be stored compressed as `<name>.gz` or
+`<name>.zst` (the latter needs the optional `zstandard` package). All reads go
+through resolve(), which picks whichever variant exists, and decompress as a
+stream; writes keep the variant already on disk and use compact separators.
+Backups are always compressed snapshots (see snapshot()).
+
+Usage:
+    python3 catalog.py materialize       # write augmented.json from the two layers
+    python3 catalog.py split             # (re)build enrichment.json from augmented.json
+    python3 catalog.py compress gz|zst|none   # convert the stored layers
+"""
+import gzip
+import json
+import os
+import re
+import shutil
+import sys
+from pathlib import Path
+
+import jsoncodec
+
+SOURCE_FILE = "audiobooks.json"
+OVERLAY_FILE = "enrichment.json"
+VIEW_FILE = "augmented.json"
+
+COMPRESSED = (".gz", ".zst")
+
+_MISSING = object()
+
+
+def resolve(path):
+    """The file actually holding `path`: itself, or a compressed `.gz`/`.zst`
+    sibling. Falls back to `path` itself when none exists (new plain file)."""
+    path = Path(path)
+    if path.exists() or path.suffix in COMPRESSED:
+        return path
+    for suffix in COMPRESSED:
+        packed = path.with_name(path.name + suffix)
+        if packed.exists():
+            return packed
+    return path
+
+
+def exists(path):
+    return resolve(path).exists()
+
+
+def _path(root, name):
+    return resolve(Path(root or ".") / name)
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError(".zst catalogue files need the zstandard package: "
+                          "pip install zstandard") from None
+    return zstandard
+
+
+def open_text(path, mode="r"):
+    """Open a (possibly compressed, by suffix) catalogue file as UTF-8 text.
+    Compressed files are decoded as a stream, never inflated in one piece."""
+    path = str(path)
+    if path.endswith(".gz") or path.endswith(".gz.tmp"):
+        return gzip.open(path, mode + "t", encoding="utf-8", compresslevel=6)
+    if path.endswith(".zst") or path.endswith(".zst.tmp"):
+        return _zstd().open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _read_bytes(path):
+    path = str(path)
+    if path.endswith(".gz"):
+        opener = gzip.open
+    elif path.endswith(".zst"):
+        opener = _zstd().open
+    else:
+        opener = open
+    with opener(path, "rb") as f:
+        return f.read()
+
+
+def read_json(path, default=None):
+    """Load a catalogue file (a JSON object), or return `default` ({} if
+    omitted) when the file is absent. With orjson (see jsoncodec) the file is
+    decoded in one go, which is fastest but briefly holds the raw bytes;
+    otherwise member by member (iter_items), which is faster than json.load
+    and never holds the whole text."""
+    path = resolve(path)
+    if not path.exists():
+        return {} if default is None else default
+    if jsoncodec.orjson:
+        data = jsoncodec.loads(_read_bytes(path))
+        if not isinstance(data, dict):
+            raise ValueError(f"{path}: top-level JSON value is not an object")
+        return data
+    return dict(iter_items(path))
+
+
+def write_json(path, data):
+    """Write a catalogue file atomically (temp file + rename), so a crash never
+    leaves a half-written catalogue behind. Compact separators; compressed if
+    the file on disk already is."""
+    path = resolve(path)
+    tmp = f"{path}.tmp"
+    with open_text(tmp, "w") as f:
+        f.write(jsoncodec.dumps(data))
+    os.replace(tmp, path)
+
+
+def snapshot(path, tag):
+    """Compressed copy of a catalogue file next to it (`<name>.<tag>.gz`, or
+    the original suffix if it is already compressed); returns the copy's path."""
+    src = resolve(path)
+    name, suffix = (src.name[:-len(src.suffix)], src.suffix) if src.suffix in COMPRESSED else (src.name, ".gz")
+    dst = src.with_name(f"{name}.{tag}{suffix}")
+    if suffix == src.suffix:
+        shutil.copy2(src, dst)
+    else:
+        with open(src, "rb") as fin, gzip.open(dst, "wb", compresslevel=6) as fout:
+            shutil.copyfileobj(fin, fout, 1 << 20)
+    return dst
+
+
+def split(view, source):
+    """Return the overlay that turns `source` into `view`: per id, only the fields
+    whose value differs from (or is missing in) the source record."""
+    overlay = {}
+    for key, record in view.items():
+        base = source.get(key) or {}
+        delta = {f: v for f, v in record.items() if base.get(f, _MISSING) != v}
+        if delta:
+            overlay[key] = delta
+    return overlay
+
+
+def merge(source, overlay, in_place=False):
+    """Materialize the merged view: each source record updated with its overlay.
+    Ids that only exist in the overlay are kept as-is. With `in_place=True` the
+    source dicts are updated directly (no copies) — use it when the source layer
+    is thrown away afterwards, as in the build."""
+    view = source if in_place else {k: dict(v) for k, v in source.items()}
+    for key, delta in overlay.items():
+        record = view.get(key)
+        if record is None:
+            view[key] = dict(delta)
+        else:
+            record.update(delta)
+    return view
+
+
+def load_layers(root=None):
+    """Return (source, overlay). Falls back to deriving the overlay from a legacy
+    augmented.json while enrichment.json has not been written yet."""
+    source = read_json(_path(root, SOURCE_FILE))
+    overlay_path = _path(root, OVERLAY_FILE)
+    if overlay_path.exists():
+        return source, read_json(overlay_path)
+    legacy = read_json(_path(root, VIEW_FILE))
+    return source, split(legacy, source)
+
+
+def save_layers(source=None, overlay=None, root=None):
+    """Write whichever layers are given (None = leave that file untouched)."""
+    if source is not None:
+        write_json(_path(root, SOURCE_FILE), source)
+    if overlay is not None:
+        write_json(_path(root, OVERLAY_FILE), overlay)
+
+
+def upsert(source, overlay, key, record, enrichment):
+    """Add or replace one title: raw fields go to the source layer, enrichment
+    fields (minus any that merely repeat the raw value) to the overlay."""
+    source[key] = record
+    delta = {f: v for f, v in enrichment.items() if record.get(f, _MISSING) != v}
+    if delta:
+        overlay[key] = delta
+    else:
+        overlay.pop(key, None)
+
+
+def load_view(root=None):
+    """Load the merged catalogue (what augmented.json used to contain).
+
+    Prefers the two layers; a legacy single-file augmented.json (or, failing
+    that, a bare audiobooks.json) is read as-is so older checkouts still build.
+    """
+    if _path(root, OVERLAY_FILE).exists():
+        source = read_json(_path(root, SOURCE_FILE))
+        return merge(source, read_json(_path(root, OVERLAY_FILE)), in_place=True)
+    for name in (VIEW_FILE, SOURCE_FILE):
+        if _path(root, name).exists():
+            return read_json(_path(root, name))
+    return {}
+
+
+def iter_items(path, chunk_size=1 << 20):
+    """Yield the (key, value) pairs of a top-level JSON object one at a time.
+
+    json.load() decodes the whole file into one str and then every record at
+    once; for a catalogue of hundreds of thousands of titles that is several
+    GB. This reads `chunk_size` characters at a time and decodes one member
+    with JSONDecoder.raw_decode(), so only the current record (plus one chunk)
+    is ever held.
+    """
+    decode = json.JSONDecoder().raw_decode
+    ws = re.compile(r"[ \t\n\r]*")
+    with open_text(resolve(path)) as f:
+        buf, pos, eof, opened = "", 0, False, False
+        while True:
+            try:
+                p = ws.match(buf, pos).end()
+                if not opened:
+                    if buf[p] != "{":
+                        raise ValueError(f"{path}: top-level JSON value is not an object")
+                    pos, opened = p + 1, True
+                    continue
+                if buf[p] == "}":
+                    return
+                if buf[p] == ",":
+                    p = ws.match(buf, p + 1).end()
+                key, p = decode(buf, p)
+                p = ws.match(buf, p).end()
+                if buf[p] != ":":
+                    raise json.JSONDecodeError("Expecting ':' delimiter", buf, p)
+                value, p = decode(buf, ws.match(buf, p + 1).end())
+                # Only accept the value once its delimiter is in the buffer: a
+                # number cut at the chunk boundary ("-25" of "-2500.0") decodes fine.
+                p = ws.match(buf, p).end()
+                if buf[p] not in ",}":
+                    raise json.JSONDecodeError("Expecting ',' delimiter", buf, p)
+            except (IndexError, json.JSONDecodeError):
+                if eof:
+                    raise json.JSONDecodeError("Truncated or malformed JSON object", buf, pos)
+                chunk = f.read(chunk_size)
+                buf, pos, eof = buf[pos:] + chunk, 0, not chunk
+                continue
+            yield key, value
+            pos = p
+
+
+def iter_view(root=None):
+    """Stream the merged view as (id, record) pairs, in the same order as
+    load_view(). Only the overlay layer (small: enrichment fields only) is held
+    in memory; source records are decoded one at a time."""
+    overlay_path = _path(root, OVERLAY_FILE)
+    if overlay_path.exists():
+        overlay = read_json(overlay_path)
+        source_path = _path(root, SOURCE_FILE)
+        if source_path.exists():
+            for key, record in iter_items(source_path):
+                delta = overlay.pop(key, None)
+                if delta:
+                    record.update(delta)
+                yield key, record
+        for key, delta in overlay.items():
+            yield key, dict(delta)
+        return
+    for name in (VIEW_FILE, SOURCE_FILE):
+        if _path(root, name).exists():
+            yield from iter_items(_path(root, name))
+            return
+
+
+def save_view(view, root=None):
+    """Persist edits made to the merged view (cleaners, genre fixers, ...) by
+    rewriting only the overlay layer against the current source layer."""
+    source = read_json(_path(root, SOURCE_FILE))
+    save_layers(overlay=split(view, source), root=root)
+
+
+def backup(tag, root=None):
+    """Snapshot the editable layer before a bulk edit and return the backup path.
+
+    Only the overlay changes when a cleaner rewrites the view, so that is what
+    gets copied (`enrichment.json.<tag>.gz`); a legacy augmented.json is copied
+    instead until the overlay exists.
+    """
+    src = _path(root, OVERLAY_FILE)
+    if not src.exists():
+        src = _path(root, VIEW_FILE)
+    return snapshot(src, tag)
+
+
+def compress(fmt, root=None):
+    """Rewrite every stored catalogue file as `fmt` (gz, zst or none) and
+    remove the old variant. Returns [(old, old_bytes, new, new_bytes), ...]."""
+    suffix = {"gz": ".gz", "zst": ".zst", "none": ""}[fmt]
+    done = []
+    for name in (SOURCE_FILE, OVERLAY_FILE, VIEW_FILE):
+        old = _path(root, name)
+        if not old.exists():
+            continue
+        new = Path(root or ".") / (name + suffix)
+        size = os.path.getsize(old)
+        if new != old:
+            tmp = f"{new}.tmp"
+            with open_text(tmp, "w") as f:
+                f.write(jsoncodec.dumps(read_json(old)))
+            os.replace(tmp, new)
+            os.remove(old)
+        done.append((old, size, new, os.path.getsize(new)))
+    return done
+
+
+def view_sources(root=None):
+    """Files the merged view is read from, for logging/size reports."""
+    if _path(root, OVERLAY_FILE).exists():
+        return [p for p in (_path(root, SOURCE_FILE), _path(root, OVERLAY_FILE)) if p.exists()]
+    for name in (VIEW_FILE, SOURCE_FILE):
+        if _path(root, name).exists():
+            return [_path(root, name)]
+    return []
+
+
+def main():
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "materialize"
+    if cmd == "materialize":
+        view = load_view()
+        write_json(VIEW_FILE, view)
+        print(f"wrote {VIEW_FILE} ({len(view)} records)")
+    elif cmd == "split":
+        source = read_json(SOURCE_FILE)
+        overlay = split(read_json(VIEW_FILE), source)
+        save_layers(overlay=overlay)
+        print(f"wrote {OVERLAY_FILE} ({len(overlay)} overlay records over {len(source)} source records)")
+    elif cmd == "compress":
+        fmt = sys.argv[2] if len(sys.argv) > 2 else "gz"
+        if fmt not in ("gz", "zst", "none"):
+            sys.exit(f"unknown format {fmt!r} (expected: gz, zst, none)")
+        for old, old_size, new, new_size in compress(fmt):
+            print(f"{old} ({old_size/1e6:.2f} MB) -> {new} ({new_size/1e6:.2f} MB)")
+    else:
+        sys.exit(f"unknown command {cmd!r} (expected: materialize, split, compress)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Incremental channel crawling: walk uploads newest-first, stop at known videos.
+
+Listing a vetted channel with thousands of uploads every run, only to filter
+out the ids already in the catalogue afterwards, re-fetches the whole channel
+history to find a handful of new videos. Here the listing is consumed lazily
+(yt-dlp fetches continuation pages only as far as the entries are read) and
+the walk stops at the first of:
+
+  - the id recorded by the previous crawl of that channel (its cursor),
+  - `stop_after` consecutive already-known ids,
+  - the end of the listing.
+
+The cursor (newest id and its upload date, when the channel was checked, how
+many entries were read) is kept per channel URL in channel_state.json. crawl()
+only proposes a new cursor when the walk ended on one of the conditions
+above, never when it was cut short by `limit`; the caller stores it with
+advance() once every entry returned is in the checkpoint or the catalogue,
+so an interrupted or failed run cannot skip the uploads it found.
+
+Used by audiobook_scraper.py (--incremental) and youtube_discovery.py
+(--incremental).
+"""
+import json
+import os
+from datetime import datetime
+
+STATE_FILE = 'channel_state.json'
+DEFAULT_STOP_AFTER = 20
+
+
+def load_state(path=STATE_FILE):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_state(state, path=STATE_FILE):
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def crawl(ydl, url, is_known, state, stop_after=DEFAULT_STOP_AFTER, limit=None):
+    """(entries of `url` not known yet, newest first; proposed cursor or None).
+
+    `ydl` is a YoutubeDL in flat mode, `is_known(video_id)` says whether a video
+    is already in the catalogue. `limit` caps the entries read when the channel
+    has no cursor yet (a first crawl); later walks are bounded by the cursor.
+    `state` is only read: the cursor is None when the walk was cut short.
+    """
+    cursor = state.get(url) or {}
+    if cursor:
+        limit = None
+    # process=False: entries stay a lazy generator over the listing pages
+    info = ydl.extract_info(url, download=False, process=False)
+    entries = []
+    newest = None
+    streak = read = 0
+    complete = True
+    for entry in info.get('entries') or ():
+        video_id = entry.get('id') if entry else None
+        if not video_id:
+            continue
+        if newest is None:
+            newest = entry
+        if video_id == cursor.get('last_id'):
+            break
+        read += 1
+        if is_known(video_id):
+            streak += 1
+            if streak >= stop_after:
+                break
+            continue
+        streak = 0
+        entries.append(entry)
+        if limit and read >= limit:
+            complete = False
+            break
+    if not complete or newest is None:
+        return entries, None
+    return entries, {
+        'last_id': newest['id'],
+        'last_date': newest.get('upload_date') or cursor.get('last_date'),
+        'checked': datetime.now().isoformat(timespec='seconds'),
+        'read': read,
+    }
+
+
+def advance(state, url, proposed, entries, is_settled, path=STATE_FILE):
+    """Store the cursor crawl() proposed for `url` if every one of its
+    `entries` is settled (`is_settled(video_id)`: checkpointed or in the
+    catalogue); returns whether it moved."""
+    if proposed is None or not all(is_settled(entry['id']) for entry in entries):
+        return False
+    state[url] = proposed
+    save_state(state, path)
+    return True
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""The blacklist/validity filter shared by the YouTube scrapers.
+
+Which channels, video ids and title patterns mark a video as "not an Italian
+audiobook" used to be written out twice: in audiobook_scraper.py and again,
+as a fallback copy that had already drifted, in youtube_discovery.py. The
+rules now live in content_filter.json and are compiled once at import:
+
+  - channel names and video ids become hash sets (one lookup each),
+  - every title term of every rule goes into a single regex, so a title is
+    scanned once and the rules are then decided on the set of terms found.
+
+Title terms are plain substrings of the lowercased title, exactly as before
+('ita' also matches "vita"): the regex looks ahead at every position, so
+overlapping terms are all seen, and a term that is a prefix of a longer one
+found at the same position ('fiorello' in 'fiorello imita') counts as found.
+
+    import content_filter
+    code, reason = content_filter.check(video_id, title, channel)  # code None: accepted
+    ok, reason = content_filter.is_valid_audiobook(video_id, title, channel)
+
+Reason codes: 'blacklisted_id', 'blacklisted_channel', then the `code` of
+each title rule in the data file ('parody', 'english'), checked in order.
+
+Usage:
+    python3 content_filter.py [catalogue.json]   # rejections by code over a catalogue
+"""
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+RULES_FILE = Path(__file__).with_name('content_filter.json')
+
+
+class ContentFilter:
+    """Compiled rules: see the module docstring and content_filter.json."""
+
+    def __init__(self, rules):
+        self.channels = frozenset(name.strip().lower() for name in rules['channels']['names'])
+        self.ids = frozenset(rules['ids'])
+        self.title_rules = [
+            (rule['code'], rule['reason'],
+             [frozenset(term.lower() for term in group) for group in rule['any']],
+             frozenset(term.lower() for term in rule.get('unless', ())))
+            for rule in rules['title_rules']
+        ]
+        terms = set()
+        for _, _, groups, unless in self.title_rules:
+            terms.update(*groups, unless)
+        # Longest first, so the alternation reports the longest term at each position
+        ordered = sorted(terms, key=len, reverse=True)
+        self._pattern = re.compile('(?=(' + '|'.join(map(re.escape, ordered)) + '))')
+        # A match also stands for every shorter term it starts with
+        self._implied = {t: frozenset(u for u in terms if t.startswith(u)) for t in terms}
+
+    @classmethod
+    def from_file(cls, path=RULES_FILE):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def title_terms(self, title):
+        """The set of rule terms contained in `title` (one regex pass)."""
+        found = set()
+        for match in self._pattern.finditer((title or '').lower()):
+            found |= self._implied[match.group(1)]
+        return found
+
+    def check(self, video_id, title, channel):
+        """(reason code, human-readable reason); the code is None if the video passes."""
+        if video_id in self.ids:
+            return 'blacklisted_id', "Blacklisted video ID"
+        if (channel or '').strip().lower() in self.channels:
+            return 'blacklisted_channel', f"Blacklisted channel: {channel}"
+        found = self.title_terms(title)
+        if found:
+            for code, reason, groups, unless in self.title_rules:
+                if any(group <= found for group in groups) and not (unless & found):
+                    return code, reason
+        return None, ""
+
+    def is_valid_audiobook(self, video_id, title, channel):
+        """(True, "") for an acceptable video, else (False, reason)."""
+        code, reason = self.check(video_id, title, channel)
+        return code is None, reason
+
+
+FILTER = ContentFilter.from_file()
+check = FILTER.check
+is_valid_audiobook = FILTER.is_valid_audiobook
+
+
+def main():
+    import catalog
+    path = sys.argv[1] if len(sys.argv) > 1 else None
+    data = catalog.read_json(path) if path else catalog.load_view()
+    records = list((data or {}).items())
+    if not records:
+        print("❌ No catalogue found.")
+        sys.exit(1)
+
+    counts = {}
+    start = time.perf_counter()
+    for key, record in records:
+        code, reason = check(key, record.get('title') or '',
+                             record.get('channel') or record.get('uploader') or '')
+        if code:
+            counts[code] = counts.get(code, 0) + 1
+            print(f"  {code:<20} {key}  {record.get('title', '')[:70]}")
+    elapsed = time.perf_counter() - start
+
+    print(f"\n📊 {len(records)} records checked in {elapsed * 1000:.1f} ms "
+          f"({elapsed / len(records) * 1e6:.1f} µs each)")
+    for code, n in sorted(counts.items(), key=lambda kv: -kv[1]):
+        print(f"  {code}: {n}")
+    if not counts:
+        print("✅ Nothing in the catalogue matches the blacklist.")
+
+
+if __name__ == '__main__':
+    main()
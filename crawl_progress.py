@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""Bounded progress display for long crawls: in-flight rows plus aggregate counters.
+
+A rich Progress with one task per URL keeps every finished task alive and
+re-renders all of them on each refresh, and a console.log line per success
+or skip adds one more line to scroll for every URL: on a 20k-URL crawl the
+display, not the crawl, ends up using the CPU. CrawlProgress renders a fixed
+amount per refresh whatever the crawl size:
+
+  - one header line: done/total, saved / skipped / failed, rate, ETA, elapsed,
+  - at most `rows` in-flight URLs (what each worker is doing right now),
+    and "… N more" for the rest.
+
+Pipelines with several stages (audiobook_scraper.py --download) register
+each stage with `stage(name, workers, queue)`; every stage gets one more line
+with its throughput (items/s, MB/s), how busy its workers are and how many
+items wait in its input queue.
+
+Log lines go through a per-level limiter (`log_rate` lines per second for
+info, the same again for warnings and errors); suppressed lines are counted
+and the count is shown with the next line that gets through and at the end.
+
+With jsonl=True (audiobook_scraper.py --jsonl, or LOG_FORMAT=jsonl) nothing
+is drawn: every finished URL, log line, a periodic heartbeat and the final
+summary are written to stdout as one JSON object per line, for unattended
+runs and log shippers. Per-URL results are never rate limited in that mode.
+
+    with CrawlProgress(console, rows=8, jsonl=False) as progress:
+        progress.set_total(len(urls), "Extracting metadata")
+        task = progress.start(url, "Fetching metadata")
+        progress.update(task, "Saving metadata")
+        progress.finish(task, 'saved', f"Saved {video_id}")  # or 'skipped' / 'failed'
+        progress.log("[yellow]Something worth telling[/yellow]", level='warning')
+        stage = progress.stage("download", workers=4)
+        stage.record(seconds, nbytes)                         # one item through this stage
+"""
+import json
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+from rich.console import Group
+from rich.live import Live
+from rich.progress_bar import ProgressBar
+from rich.table import Table
+from rich.text import Text
+
+OUTCOMES = ('saved', 'skipped', 'failed')
+LEVEL_STYLE = {'info': '', 'warning': 'yellow', 'error': 'bold red'}
+
+
+def _clock(seconds):
+    return str(timedelta(seconds=int(seconds)))
+
+
+class Stage:
+    """Throughput of one pipeline stage: items, bytes and worker busy time."""
+
+    def __init__(self, name, workers, queue=None):
+        self.name = name
+        self.workers = workers
+        self.queue = queue
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self.items = 0
+        self.bytes = 0
+        self.busy = 0.0
+
+    def record(self, seconds, nbytes=0):
+        """One item went through this stage in `seconds` of one worker's time."""
+        with self._lock:
+            self.items += 1
+            self.bytes += nbytes
+            self.busy += seconds
+
+    def snapshot(self):
+        with self._lock:
+            items, nbytes, busy = self.items, self.bytes, self.busy
+        elapsed = max(time.monotonic() - self._started, 1e-9)
+        return {'items': items, 'rate': round(items / elapsed, 3),
+                'mb_per_s': round(nbytes / elapsed / 1e6, 3),
+                'utilization': round(min(1.0, busy / (elapsed * self.workers)), 3),
+                'workers': self.workers,
+                'queued': self.queue.qsize() if self.queue is not None else None}
+
+    def summary(self):
+        s = self.snapshot()
+        return (f"{self.name}: {s['items']} items, {s['rate']:.2f}/s, {s['mb_per_s']:.2f} MB/s, "
+                f"{s['workers']} workers {s['utilization']:.0%} busy")
+
+
+class CrawlProgress:
+    """See the module docstring. All methods are thread-safe."""
+
+    def __init__(self, console, total=None, rows=8, jsonl=False, log_rate=5.0, heartbeat=30.0, out=None):
+        self.console = console
+        self.total = total
+        self.title = ''
+        self.rows = rows
+        self.jsonl = jsonl
+        self.log_rate = log_rate
+        self.heartbeat = heartbeat
+        self.out = out or sys.stdout
+        self.counts = dict.fromkeys(OUTCOMES, 0)
+        self._lock = threading.Lock()
+        self._inflight = {}  # task id -> [label, description, started]
+        self._stages = []
+        self._next_id = 0
+        self._started = time.monotonic()
+        self._last_beat = self._started
+        # Per-level token buckets for log lines: level -> [tokens, updated, suppressed]
+        self._log_buckets = {}
+        self._live = None
+
+    # -- lifecycle -----------------------------------------------------------
+
+    def __enter__(self):
+        self._started = self._last_beat = time.monotonic()
+        if not self.jsonl:
+            self._live = Live(self, console=self.console, refresh_per_second=4)
+            self._live.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self._live:
+            self._live.refresh()
+            self._live.stop()
+            self._live = None
+        suppressed = {level: b[2] for level, b in self._log_buckets.items() if b[2]}
+        if self.jsonl:
+            self._emit('summary', **self.snapshot())
+        elif suppressed:
+            self.console.log("Log lines suppressed by the rate limit: "
+                             + ", ".join(f"{n} {level}" for level, n in suppressed.items()))
+        return False
+
+    # -- tasks ---------------------------------------------------------------
+
+    def set_total(self, total, title=None):
+        with self._lock:
+            self.total = total
+            if title is not None:
+                self.title = title
+
+    def start(self, label, description=''):
+        """Register an in-flight item (a URL); returns its task id."""
+        with self._lock:
+            self._next_id += 1
+            self._inflight[self._next_id] = [label, description, time.monotonic()]
+            return self._next_id
+
+    def update(self, task_id, description):
+        with self._lock:
+            item = self._inflight.get(task_id)
+            if item:
+                item[1] = description
+
+    def finish(self, task_id, outcome, message=None, level=None):
+        """Drop the task from the in-flight rows and count its outcome.
+
+        `message` is logged (rate limited, except in JSON-lines mode where it is
+        part of the per-item record) at `level`, by default 'error' for a failure.
+        """
+        with self._lock:
+            item = self._inflight.pop(task_id, None)
+            self.counts[outcome] += 1
+        level = level or ('error' if outcome == 'failed' else 'info')
+        if self.jsonl:
+            self._emit('item', outcome=outcome, label=item[0] if item else None,
+                       seconds=round(time.monotonic() - item[2], 3) if item else None,
+                       level=level, message=Text.from_markup(message).plain if message else None)
+            self._maybe_heartbeat()
+        elif message:
+            self.log(message, level)
+
+    def stage(self, name, workers, queue=None):
+        """Register a pipeline stage (shown under the header); returns its Stage."""
+        stage = Stage(name, workers, queue)
+        with self._lock:
+            self._stages.append(stage)
+        return stage
+
+    # -- logging -------------------------------------------------------------
+
+    def log(self, message, level='info', **fields):
+        """Log a line unless this level is over its `log_rate` lines per second."""
+        if self.jsonl:
+            self._emit('log', level=level, message=Text.from_markup(message).plain, **fields)
+            return
+        suppressed = self._take_log_token(level)
+        if suppressed is None:
+            return
+        style = LEVEL_STYLE.get(level, '')
+        line = f"[{style}]{message}[/{style}]" if style and '[' not in message else message
+        if suppressed:
+            line += f" [dim](+{suppressed} {level} lines suppressed)[/dim]"
+        self.console.log(line)
+
+    def _take_log_token(self, level):
+        """None if the line must be dropped, else how many were dropped before it."""
+        if self.log_rate <= 0:
+            return 0
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._log_buckets.setdefault(level, [self.log_rate, now, 0])
+            bucket[0] = min(self.log_rate, bucket[0] + (now - bucket[1]) * self.log_rate)
+            bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                return None
+            bucket[0] -= 1
+            suppressed, bucket[2] = bucket[2], 0
+            return suppressed
+
+    # -- JSON lines ----------------------------------------------------------
+
+    def _emit(self, event, **fields):
+        line = json.dumps({'ts': datetime.now().isoformat(timespec='milliseconds'), 'event': event, **fields},
+                          ensure_ascii=False)
+        with self._lock:
+            self.out.write(line + '\n')
+            self.out.flush()
+
+    def _maybe_heartbeat(self):
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_beat < self.heartbeat:
+                return
+            self._last_beat = now
+        self._emit('progress', **self.snapshot())
+
+    # -- rendering -----------------------------------------------------------
+
+    def snapshot(self):
+        """Aggregate counters, rate (items/s) and ETA in seconds (None if unknown)."""
+        with self._lock:
+            counts = dict(self.counts)
+            inflight = len(self._inflight)
+            stages = list(self._stages)
+        done = sum(counts.values())
+        elapsed = time.monotonic() - self._started
+        rate = done / elapsed if elapsed > 0 else 0.0
+        eta = (self.total - done) / rate if self.total and rate else None
+        return {'total': self.total, 'done': done, **counts, 'in_flight': inflight,
+                'rate': round(rate, 2), 'eta': round(eta) if eta is not None else None,
+                'elapsed': round(elapsed, 1),
+                **({'stages': {stage.name: stage.snapshot() for stage in stages}} if stages else {})}
+
+    def __rich__(self):
+        s = self.snapshot()
+        header = Table.grid(padding=(0, 1))
+        total = s['total']
+        header.add_row(
+            Text(self.title or 'Progress', style='bold blue'),
+            ProgressBar(total=total or None, completed=s['done'], width=30),
+            Text(f"{s['done']}/{total}" if total else str(s['done'])),
+            Text.assemble(("saved ", 'dim'), (str(s['saved']), 'green'),
+                          (" · skipped ", 'dim'), (str(s['skipped']), 'yellow'),
+                          (" · failed ", 'dim'), (str(s['failed']), 'red')),
+            Text(f"{s['rate']:.1f}/s" + (f" · ETA {_clock(s['eta'])}" if s['eta'] is not None else '')
+                 + f" · {_clock(s['elapsed'])}", style='dim'),
+        )
+        for name, stage in s.get('stages', {}).items():
+            queued = f" · {stage['queued']} queued" if stage['queued'] is not None else ''
+            header.add_row(Text(f"  {name}", style='magenta'), Text(''),
+                           Text(f"{stage['items']} done"),
+                           Text(f"{stage['rate']:.2f}/s · {stage['mb_per_s']:.2f} MB/s"),
+                           Text(f"{stage['workers']} workers {stage['utilization']:.0%} busy{queued}", style='dim'))
+        now = time.monotonic()
+        with self._lock:
+            shown = list(self._inflight.values())[:self.rows]
+            hidden = len(self._inflight) - len(shown)
+        rows = Table.grid(padding=(0, 1))
+        for label, description, started in shown:
+            rows.add_row(Text(f"  {_clock(now - started)}", style='dim'),
+                         Text(description, style='cyan', overflow='ellipsis', no_wrap=True),
+                         Text(label, style='dim', overflow='ellipsis', no_wrap=True))
+        parts = [header, rows]
+        if hidden > 0:
+            parts.append(Text(f"  … {hidden} more in flight", style='dim'))
+        return Group(*parts)
+
+
+if __name__ == '__main__':
+    # Demo / overhead check: N fake items through 8 threads, e.g.
+    #   python3 crawl_progress.py 20000 [--jsonl]
+    import random
+    from concurrent.futures import ThreadPoolExecutor
+    from rich.console import Console
+
+    n = int(next((a for a in sys.argv[1:] if a.isdigit()), 2000))
+    jsonl = '--jsonl' in sys.argv
+    console = Console(stderr=jsonl)
+
+    def work(i, progress):
+        task = progress.start(f"https://www.youtube.com/watch?v={i:011d}", "Fetching metadata")
+        time.sleep(random.random() * 0.002)
+        progress.update(task, "Saving metadata")
+        outcome = random.choices(OUTCOMES, (8, 3, 1))[0]
+        progress.finish(task, outcome, f"{outcome} item {i}")
+
+    start = time.process_time()
+    with CrawlProgress(console, rows=8, jsonl=jsonl) as progress:
+        progress.set_total(n, "Demo")
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda i: work(i, progress), range(n)))
+    console.log(f"{n} items, {time.process_time() - start:.2f}s CPU")
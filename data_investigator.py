@@ -18,8 +18,10 @@ import statistics
 from urllib.parse import urlparse
 import argparse
 
+import catalog
+
 class DataInvestigator:
-    def __init__(self, audiobooks_file='audiobooks.json', augmented_file='augmented.json'):
+    def __init__(self, audiobooks_file=catalog.SOURCE_FILE, augmented_file=catalog.OVERLAY_FILE):
         self.audiobooks_file = audiobooks_file
         self.augmented_file = augmented_file
         self.data = {}
@@ -29,8 +31,9 @@ class DataInvestigator:
     def load_data(self):
         """Load audiobooks data from JSON files"""
         try:
-            with open(self.audiobooks_file, 'r', encoding='utf-8') as f:
-                self.data = json.load(f)
+            if not catalog.exists(self.audiobooks_file):
+                raise FileNotFoundError(self.audiobooks_file)
+            self.data = catalog.read_json(self.audiobooks_file)
             print(f"✅ Loaded {len(self.data)} books from {self.audiobooks_file}")
         except FileNotFoundError:
             print(f"❌ File {self.audiobooks_file} not found")
@@ -40,11 +43,17 @@ class DataInvestigator:
             return False
             
         try:
-            with open(self.augmented_file, 'r', encoding='utf-8') as f:
-                self.augmented_data = json.load(f)
-            print(f"✅ Loaded {len(self.augmented_data)} books from {self.augmented_file}")
-        except FileNotFoundError:
-            print(f"⚠️  File {self.augmented_file} not found, will only use main data")
+            # Merged view = source records + enrichment overlay (see catalog.py);
+            # a legacy augmented.json is diffed into an overlay on first run.
+            if catalog.exists(self.augmented_file):
+                overlay = catalog.read_json(self.augmented_file)
+            else:
+                overlay = catalog.split(catalog.read_json(catalog.VIEW_FILE), self.data)
+            if overlay:
+                self.augmented_data = catalog.merge(self.data, overlay)
+                print(f"✅ Loaded {len(self.augmented_data)} books from {self.augmented_file}")
+            else:
+                print(f"⚠️  File {self.augmented_file} not found, will only use main data")
         except json.JSONDecodeError as e:
             print(f"⚠️  Error reading {self.augmented_file}: {e}")
         
@@ -549,8 +558,8 @@ def main():
     parser = argparse.ArgumentParser(description='Investigate data quality issues in audiobook collection')
     parser.add_argument('--audiobooks', '-a', default='audiobooks.json', 
                        help='Path to audiobooks.json file')
-    parser.add_argument('--augmented', '-u', default='augmented.json',
-                       help='Path to augmented.json file')
+    parser.add_argument('--augmented', '-u', default=catalog.OVERLAY_FILE,
+                       help=f'Path to the enrichment overlay ({catalog.OVERLAY_FILE}, see catalog.py)')
     parser.add_argument('--field', '-f', 
                        choices=['coverage', 'titles', 'authors', 'durations', 'dates', 'urls', 'views', 'text', 'missing'],
                        help='Analyze specific field only')
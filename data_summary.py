@@ -5,24 +5,22 @@ Data Quality Summary Report Generator
 Shows a comprehensive summary of all data quality improvements made
 """
 
-import json
 from datetime import datetime
 from collections import Counter
 
+import catalog
+
 def main():
     print("📊 DATA QUALITY IMPROVEMENT SUMMARY")
     print("=" * 80)
     print(f"Report generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
     try:
-        with open('audiobooks.json', 'r', encoding='utf-8') as f:
-            original_data = json.load(f)
-        
-        with open('augmented.json', 'r', encoding='utf-8') as f:
-            current_data = json.load(f)
+        original_data = catalog.read_json(catalog.SOURCE_FILE)
+        current_data = catalog.load_view()
             
-        print(f"✅ Loaded {len(original_data)} books from audiobooks.json")
-        print(f"✅ Loaded {len(current_data)} books from augmented.json")
+        print(f"✅ Loaded {len(original_data)} books from {catalog.SOURCE_FILE}")
+        print(f"✅ Loaded {len(current_data)} books from the merged catalogue view")
         
     except Exception as e:
         print(f"❌ Error loading data: {e}")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Structured chapters from the timestamps in a YouTube description.
+
+Long readings usually list their chapters in the description, one per line:
+
+    00:00 Introduzione
+    Capitolo 1 - 12:41
+    1:02:03 Capitolo II. La partenza
+
+audiobook_scraper.py already picked those lines out with a regex, but only
+kept them as the free-text `transcript`. At ingest they are now also parsed
+into `chapters`, a list of {"start": seconds, "title": str}, which
+generate_pages.py renders as links that start the embedded player at each
+chapter (`?start=`).
+
+yt-dlp reports the chapters YouTube itself parsed from the description
+(`info['chapters']`) when the uploader followed its rules (first one at 0:00,
+at least three, ascending); those are used as they are. Otherwise each line
+with a timestamp gives one chapter, the rest of the line being its title,
+and only a strictly ascending run of starts within the video is kept (a
+price or a date in the text, or the same list pasted twice, is dropped). A
+single timestamp is not a chapter list.
+
+    import description_chapters
+    chapters = description_chapters.from_info(info_dict)              # yt-dlp info
+    chapters = description_chapters.from_description(text, duration)
+
+Usage:
+    python3 description_chapters.py            # add `chapters` to records ingested before
+    python3 description_chapters.py --dry-run
+"""
+import argparse
+import re
+import sys
+
+# Timestamps as HH:MM:SS, MM:SS or MM.SS (also used for the `transcript`)
+TIMESTAMP_PATTERN = r'(\d{1,2}:)?\d{1,2}:\d{2}|\d{1,2}:\d{2}|\d{1,2}\.\d{2}'
+# The same, not glued to other digits ("2023.10.05", "1:30:456")
+TIMESTAMP_RE = re.compile(rf'(?<![\d:.])(?:{TIMESTAMP_PATTERN})(?![\d:]|\.\d)')
+# Separators left around the title once the timestamp is cut out
+TITLE_STRIP = ' \t-–—:|•·*>)]([,;'
+
+
+def parse_timestamp(text):
+    """Seconds in "1:02:03", "12:41" or "12.41"; None if minutes/seconds are over 59."""
+    parts = [int(p) for p in re.split(r'[:.]', text)]
+    if any(p > 59 for p in parts[1:]):
+        return None
+    seconds = 0
+    for p in parts:
+        seconds = seconds * 60 + p
+    return seconds
+
+
+def from_description(description, duration=None):
+    """[{'start', 'title'}] from the timestamp lines of `description` ([] if fewer than two)."""
+    lines = [(line, TIMESTAMP_RE.search(line)) for line in (description or '').split('\n')]
+    lines = [(line, match) for line, match in lines if match]
+    # "12.41" only counts in descriptions that use no "12:41" at all
+    dotted = not any(':' in match.group(0) for _, match in lines)
+    chapters = []
+    for line, match in lines:
+        if ':' not in match.group(0) and not dotted:
+            continue
+        start = parse_timestamp(match.group(0))
+        if start is None or (chapters and start <= chapters[-1]['start']):
+            continue
+        if duration and start >= duration:
+            continue
+        title = ' '.join(f"{line[:match.start()]} {line[match.end():]}".split()).strip(TITLE_STRIP)
+        chapters.append({'start': start, 'title': title})
+    return chapters if len(chapters) >= 2 else []
+
+
+def from_info(info):
+    """Chapters of a yt-dlp info dict: YouTube's own when present, else from the description."""
+    listed = [{'start': int(c.get('start_time') or 0), 'title': (c.get('title') or '').strip()}
+              for c in info.get('chapters') or ()]
+    if len(listed) >= 2:
+        return listed
+    return from_description(info.get('description', ''), info.get('duration'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Add `chapters` parsed from the description to records that lack them')
+    parser.add_argument('--dry-run', action='store_true', help='Only count what would change')
+    args = parser.parse_args()
+
+    import catalog
+    source, overlay = catalog.load_layers()
+    if not source:
+        print("❌ No catalogue found.")
+        sys.exit(1)
+    updated = 0
+    for key, record in source.items():
+        if 'chapters' in record or not record.get('description'):
+            continue
+        chapters = from_description(record['description'], record.get('duration'))
+        if chapters:
+            record['chapters'] = chapters
+            updated += 1
+            print(f"  {key}: {len(chapters)} chapters  {record.get('title', '')[:60]}")
+    print(f"📊 {updated} of {len(source)} records have chapters in their description")
+    if updated and not args.dry_run:
+        if catalog.exists(catalog.SOURCE_FILE):
+            catalog.snapshot(catalog.SOURCE_FILE, 'bak')
+        catalog.save_layers(source, overlay)
+        print(f"💾 Saved chapters for {updated} records.")
+
+
+if __name__ == '__main__':
+    main()
@@ -7,6 +7,8 @@ import argparse
 from datetime import datetime
 import time
 
+import catalog
+
 def clean_html(text):
     if not text:
         return ""
@@ -64,20 +66,8 @@ def run_yt_dlp(url):
         return None
 
 def scrape_facebook(urls, min_duration=1200, ingest=False, overrides=None):
-    audiobooks_path = 'audiobooks.json'
-    augmented_path = 'augmented.json'
-    
-    if os.path.exists(audiobooks_path):
-        with open(audiobooks_path, 'r', encoding='utf-8') as f:
-            audiobooks = json.load(f)
-    else:
-        audiobooks = {}
-        
-    if os.path.exists(augmented_path):
-        with open(augmented_path, 'r', encoding='utf-8') as f:
-            augmented = json.load(f)
-    else:
-        augmented = {}
+    # Source records + enrichment overlay (see catalog.py)
+    audiobooks, overlay = catalog.load_layers()
         
     added_count = 0
     overrides = overrides or {}
@@ -149,7 +139,7 @@ def scrape_facebook(urls, min_duration=1200, ingest=False, overrides=None):
         print(f"     Duration: {duration/3600:.2f}h, Page: {uploader}, Genre: {genre}, Author: {author}")
         
         if ingest:
-            audiobooks[key] = {
+            record = {
                 'title': title,
                 'channel': uploader,
                 'channel_url': uploader_url,
@@ -169,8 +159,7 @@ def scrape_facebook(urls, min_duration=1200, ingest=False, overrides=None):
                 'categories': [genre]
             }
             
-            augmented[key] = {
-                **audiobooks[key],
+            catalog.upsert(audiobooks, overlay, key, record, {
                 'source': 'facebook',
                 'source_url': standard_url,
                 'embed_type': 'iframe',
@@ -185,16 +174,13 @@ def scrape_facebook(urls, min_duration=1200, ingest=False, overrides=None):
                 'content_type': 'audiobook',
                 'real_language': 'it',
                 'real_narrator': uploader
-            }
+            })
             
             added_count += 1
             print(f"     🎉 Ingested: {key}")
             
     if ingest and added_count > 0:
-        with open(audiobooks_path, 'w', encoding='utf-8') as f:
-            json.dump(audiobooks, f, indent=2, ensure_ascii=False)
-        with open(augmented_path, 'w', encoding='utf-8') as f:
-            json.dump(augmented, f, indent=2, ensure_ascii=False)
+        catalog.save_layers(audiobooks, overlay)
         print(f"\n🎉 Successfully saved {added_count} Facebook audiobooks to database!")
     elif ingest:
         print("\nℹ No new Facebook audiobooks were added.")
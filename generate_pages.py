@@ -15,19 +15,26 @@ the SPA (unified look); search submits to /?search= which the SPA executes.
     /sitemap.xml  /robots.txt
 
 Usage:
-    python3 generate_pages.py            # build everything
-    python3 generate_pages.py <VIDEO_ID> # build a single exemplar page
+    python3 generate_pages.py              # build everything
+    python3 generate_pages.py all --stream # same, streaming (catalogues that don't fit in RAM)
+    python3 generate_pages.py <VIDEO_ID>   # build a single exemplar page
 """
 import html
+import itertools
 import json
 import re
+import shutil
+import sqlite3
 import sys
+import tempfile
 import unicodedata
 from datetime import date
 from pathlib import Path
 
+import catalog
+import jsoncodec
+
 ROOT = Path(__file__).parent
-DATA = ROOT / "augmented.json"
 SITE = "https://audiolibri.org"
 EXEMPLAR_ID = "BInAElMNUBc"
 TODAY = date.today().isoformat()
@@ -83,6 +90,13 @@ def human_duration(seconds) -> str:
     return f"{m} min" if m else "—"
 
 
+def clock(seconds) -> str:
+    """Chapter start as a player shows it: 12:41, 1:02:03."""
+    s = int(seconds or 0)
+    h, m, s = s // 3600, (s % 3600) // 60, s % 60
+    return f"{h}:{m:02d}:{s:02d}" if h else f"{m}:{s:02d}"
+
+
 def compact_duration(seconds) -> str:
     s = int(seconds or 0)
     h, m = s // 3600, (s % 3600) // 60
@@ -95,6 +109,42 @@ def iso_date(yyyymmdd: str) -> str:
     return ""
 
 
+class Book:
+    """Slim read-only view of one catalogue record, for the build.
+
+    A full record also carries description, transcript, summary, raw_response,
+    tags, ... which the builders never read, yet every record stays referenced
+    from the genre/author/series/collection groupings for the whole run. A Book
+    keeps only the fields below, in slots. `description` is the one long text
+    still read (as the synopsis fallback), so it is kept only for titles that
+    have no real_synopsis. `get()` mirrors dict.get(), so the helpers work on
+    either a Book or a raw dict.
+    """
+    FIELDS = ("url", "title", "real_title", "real_author", "real_genre", "categories",
+              "real_synopsis", "part_display", "series", "part", "channel", "duration",
+              "view_count", "like_count", "upload_date", "thumbnail", "embed_type",
+              "embed_url", "audio_url", "audio_file", "audio_chapters", "source", "hls_url",
+              "waveform_file", "chapters")
+    __slots__ = FIELDS + ("id", "description")
+
+    def __init__(self, key, record):
+        self.id = key
+        for f in self.FIELDS:
+            if f in record:
+                setattr(self, f, record[f])
+        if not (record.get("real_synopsis") or "").strip() and "description" in record:
+            self.description = record["description"]
+
+    def get(self, name, default=None):
+        return getattr(self, name, default)
+
+
+def load_books():
+    """Load the catalogue view as {id: Book}. Records are streamed from disk
+    (catalog.iter_view), so a full record never outlives its Book."""
+    return {k: Book(k, rec) for k, rec in catalog.iter_view(ROOT)}
+
+
 def video_id(book: dict) -> str:
     m = re.search(r"(?:v=|youtu\.be/|embed/)([\w-]{11})", book.get("url", ""))
     return m.group(1) if m else ""
@@ -112,6 +162,12 @@ def display_title_of(b):
     return f"{title_of(b)} — {pd}" if pd else title_of(b)
 
 
+def waveform_of(b) -> str:
+    """Path of the book's waveform JSON (waveform.py), or "" if it has none here."""
+    path = b.get("waveform_file") or ""
+    return path if path and Path(path).is_file() else ""
+
+
 def book_slug(b) -> str:
     vid = video_id(b)
     return f"{slugify(title_of(b))}-{vid}" if vid else f"{slugify(title_of(b))}-{b.get('id', '')}"
@@ -169,7 +225,7 @@ a.bp-chip:hover { background:rgba(var(--primary-rgb),.2); }
 
 def head(title, description, canonical, image, og_type="website", extra_ld=()):
     ld = "".join('<script type="application/ld+json">\n'
-                 + json.dumps(o, ensure_ascii=False, indent=2) + "\n</script>\n" for o in extra_ld)
+                 + jsoncodec.dumps(o, indent=2) + "\n</script>\n" for o in extra_ld)
     img = (f'<meta property="og:image" content="{e(image)}">\n'
            f'<meta name="twitter:image" content="{e(image)}">') if image else ""
     return f"""<!DOCTYPE html>
@@ -330,6 +386,9 @@ def build_book_page(b: dict, related=(), in_series=False, series_name=None):
     embed_type = b.get("embed_type", "youtube" if vid else "audio")
     embed_url = b.get("embed_url", f"https://www.youtube-nocookie.com/embed/{vid}" if vid else "")
     audio_url = b.get("audio_url", b.get("audio_file", ""))
+    hls_url = b.get("hls_url", "")  # segmented Opus renditions (renditions.py)
+    # peaks + chapter markers, copied next to the page by write_book()
+    waveform_attr = ' data-waveform="waveform.json"' if waveform_of(b) else ""
     audio_chapters = b.get("audio_chapters", [])
     source = b.get("source", "youtube" if vid else "unknown")
     source_url = b.get("url", "")
@@ -422,9 +481,26 @@ def build_book_page(b: dict, related=(), in_series=False, series_name=None):
     series_link_html = f'\n    <p class="bp-series">Parte di <a href="/serie/{series_slug}/">«{e(series_name)}»</a></p>' if series_slug else ''
     player = ""
     if embed_type == "youtube" and vid:
-        player = (f'<iframe class="bp-player" src="{e(embed_url)}" title="Audiolibro: {e(title)}" loading="lazy" '
+        # Chapters parsed from the description at ingest (description_chapters.py):
+        # each one reloads the named iframe at its start, no script needed.
+        chapters = b.get("chapters") or []
+        frame_name = ' name="bp-player-frame"' if chapters else ""
+        player = (f'<iframe class="bp-player"{frame_name} src="{e(embed_url)}" title="Audiolibro: {e(title)}" loading="lazy" '
                   'allow="accelerometer; autoplay; clipboard-write; encrypted-media; gyroscope; picture-in-picture" '
                   'allowfullscreen referrerpolicy="strict-origin-when-cross-origin"></iframe>')
+        if chapters:
+            sep = "&" if "?" in embed_url else "?"
+            chapters_li = "".join(
+                f'<li><a href="{e(embed_url + sep)}start={int(ch.get("start") or 0)}&amp;autoplay=1" target="bp-player-frame" '
+                'style="display:flex; gap:0.8rem; padding:0.5rem 0.8rem; border:1px solid var(--border-color); '
+                'border-radius:var(--radius-md); background:var(--hover-overlay); text-decoration:none; color:inherit;">'
+                f'<span style="font-variant-numeric:tabular-nums; color:var(--secondary-text); font-size:var(--text-sm);">{clock(ch.get("start"))}</span>'
+                f'<span style="font-weight:600; font-size:var(--text-sm);">{e(ch.get("title") or f"Capitolo {idx + 1}")}</span></a></li>'
+                for idx, ch in enumerate(chapters))
+            player += ('<section class="bp-chapters" style="margin-top:1.5rem;">'
+                       '<h2 style="font-family:var(--font-display); font-size:var(--text-xl); margin-bottom:1rem;">Capitoli</h2>'
+                       '<ol class="chapters-list" style="list-style:none; padding:0; margin:0; display:flex; flex-direction:column; gap:0.5rem;">'
+                       f'{chapters_li}</ol></section>')
     elif embed_type == "iframe" and embed_url:
         allow_attr = 'allow="autoplay; clipboard-write; encrypted-media; picture-in-picture; web-share" ' if source == "facebook" else ''
         player = (f'<iframe class="bp-player" src="{e(embed_url)}" title="Audiolibro: {e(title)}" loading="lazy" '
@@ -440,7 +516,7 @@ def build_book_page(b: dict, related=(), in_series=False, series_name=None):
             </a>
         </div>
         """
-    elif embed_type == "audio" and audio_url:
+    elif embed_type == "audio" and (audio_url or hls_url):
         chapters_list_html = ""
         script_html = ""
         if audio_chapters and len(audio_chapters) > 1:
@@ -487,9 +563,13 @@ def build_book_page(b: dict, related=(), in_series=False, series_name=None):
             </script>
             """
             
+        # HLS first: browsers that cannot play it fall through to the mp3
+        sources = "\n            ".join(
+            ([f'<source src="{e(hls_url)}" type="application/vnd.apple.mpegurl">'] if hls_url else [])
+            + ([f'<source src="{e(audio_url)}" type="audio/mpeg">'] if audio_url else []))
         player = f"""
-        <audio id="audio-player-static" class="bp-player" style="height:54px; width:100%; border-radius:var(--radius-md); margin-bottom:1rem;" controls preload="metadata">
-            <source src="{e(audio_url)}" type="audio/mpeg">
+        <audio id="audio-player-static" class="bp-player" style="height:54px; width:100%; border-radius:var(--radius-md); margin-bottom:1rem;" controls preload="metadata"{waveform_attr}>
+            {sources}
             Il tuo browser non supporta l'elemento audio.
         </audio>
         {script_html}
@@ -514,6 +594,34 @@ def build_book_page(b: dict, related=(), in_series=False, series_name=None):
     return rel_dir, shell(head_html, main_html)
 
 
+# Hub, series and collection pages list every title of their group twice: in
+# the ItemList JSON-LD and as the card grid. Their builders render the page
+# around two placeholders and return listing_page(), which streams both lists
+# from `items` (anything with len() that can be iterated twice: a list, or an
+# index query in the streaming build) — so a 30k-title hub is written card by
+# card instead of existing as one string.
+ITEMS_MARK, GRID_MARK = "\x00items\x00", "\x00grid\x00"
+
+
+def listing_page(page, items):
+    ld_mark = json.dumps(ITEMS_MARK)  # how the placeholder comes out of head()
+    before, rest = page.split(ld_mark)
+    middle, after = rest.split(GRID_MARK)
+    yield before
+    # Same bytes as json.dumps(list, indent=2) nested one level deep in the ItemList.
+    sep = "[\n    "
+    for i, b in enumerate(items):
+        entry = {"@type": "ListItem", "position": i + 1, "url": f"{SITE}/audiolibro/{book_slug(b)}/",
+                 "name": display_title_of(b)}
+        yield sep + jsoncodec.dumps(entry, indent=2).replace("\n", "\n    ")
+        sep = ",\n    "
+    yield "[]" if sep.startswith("[") else "\n  ]"
+    yield middle
+    for b in items:
+        yield card_link(b)
+    yield after
+
+
 def build_hub(kind, label, items, slug):
     rel_dir = f"{kind}/{slug}"
     canonical = f"{SITE}/{rel_dir}/"
@@ -527,12 +635,10 @@ def build_hub(kind, label, items, slug):
         page_title = f"Audiolibri di {label} gratis | Audiolibri.org"
 
     itemlist = {"@context": "https://schema.org", "@type": "ItemList", "name": h1, "numberOfItems": len(items),
-                "itemListElement": [{"@type": "ListItem", "position": i + 1, "url": f"{SITE}/audiolibro/{book_slug(b)}/", "name": display_title_of(b)}
-                                    for i, b in enumerate(items)]}
+                "itemListElement": ITEMS_MARK}
     breadcrumb = {"@context": "https://schema.org", "@type": "BreadcrumbList",
                   "itemListElement": [{"@type": "ListItem", "position": 1, "name": "Home", "item": SITE + "/"},
                                       {"@type": "ListItem", "position": 2, "name": h1, "item": canonical}]}
-    grid = "".join(card_link(b) for b in items)
     bio_html = ""
     if kind == "autore":
         bio = author_bio(label)
@@ -543,39 +649,36 @@ def build_hub(kind, label, items, slug):
     <h1 class="bp-title">{e(h1)}</h1>
     <p class="bp-lead">{e(lead)}</p>
     {bio_html}
-    <div class="bp-grid">{grid}</div>
+    <div class="bp-grid">{GRID_MARK}</div>
     <a class="bp-back" href="/">← Tutta la libreria</a>
   </div>"""
     head_html = head(page_title, meta_description(lead), canonical, "", "website", (itemlist, breadcrumb))
-    return rel_dir, shell(head_html, main_html, with_fallback=True)
+    return rel_dir, listing_page(shell(head_html, main_html, with_fallback=True), items)
 
 
 def build_series(name, chapters):
-    """A multi-part audiobook: one page listing its chapters in reading order."""
-    chapters = sorted(chapters, key=lambda b: b.get("part") or 0)
+    """A multi-part audiobook: one page listing its chapters (already in reading order)."""
     slug = slugify(name)
     rel_dir = f"serie/{slug}"
     canonical = f"{SITE}/{rel_dir}/"
     lead = f"Tutti i {len(chapters)} capitoli di «{name}» da ascoltare gratis, in ordine."
     page_title = f"{name} — audiolibro completo gratis, {len(chapters)} capitoli | Audiolibri.org"
     itemlist = {"@context": "https://schema.org", "@type": "ItemList", "name": name, "numberOfItems": len(chapters),
-                "itemListElement": [{"@type": "ListItem", "position": i + 1, "url": f"{SITE}/audiolibro/{book_slug(b)}/", "name": display_title_of(b)}
-                                    for i, b in enumerate(chapters)]}
+                "itemListElement": ITEMS_MARK}
     breadcrumb = {"@context": "https://schema.org", "@type": "BreadcrumbList",
                   "itemListElement": [{"@type": "ListItem", "position": 1, "name": "Home", "item": SITE + "/"},
                                       {"@type": "ListItem", "position": 2, "name": "Serie", "item": f"{SITE}/serie/"},
                                       {"@type": "ListItem", "position": 3, "name": name, "item": canonical}]}
-    grid = "".join(card_link(b) for b in chapters)
     main_html = f"""<div class="bp-wrap">
     <nav class="bp-crumbs" aria-label="Breadcrumb"><a href="/">Home</a> › <a href="/serie/">Serie</a> › <span>{e(name)}</span></nav>
     <p class="bp-eyebrow">Audiolibro a puntate</p>
     <h1 class="bp-title">{e(name)}</h1>
     <p class="bp-lead">{e(lead)}</p>
-    <div class="bp-grid">{grid}</div>
+    <div class="bp-grid">{GRID_MARK}</div>
     <a class="bp-back" href="/serie/">← Tutte le serie</a>
   </div>"""
     head_html = head(page_title, meta_description(lead), canonical, "", "website", (itemlist, breadcrumb))
-    return rel_dir, shell(head_html, main_html, with_fallback=True)
+    return rel_dir, listing_page(shell(head_html, main_html, with_fallback=True), chapters)
 
 
 def build_index(kind, entries):
@@ -694,47 +797,66 @@ def build_collection(c, items):
     h1, intro = c["h1"], c["intro"]
     lead = f"{len(items)} audiolibri da ascoltare gratis, in streaming e senza registrazione."
     itemlist = {"@context": "https://schema.org", "@type": "ItemList", "name": h1, "numberOfItems": len(items),
-                "itemListElement": [{"@type": "ListItem", "position": i + 1, "url": f"{SITE}/audiolibro/{book_slug(b)}/", "name": display_title_of(b)}
-                                    for i, b in enumerate(items)]}
+                "itemListElement": ITEMS_MARK}
     breadcrumb = {"@context": "https://schema.org", "@type": "BreadcrumbList",
                   "itemListElement": [{"@type": "ListItem", "position": 1, "name": "Home", "item": SITE + "/"},
                                       {"@type": "ListItem", "position": 2, "name": "Raccolte", "item": f"{SITE}/raccolte/"},
                                       {"@type": "ListItem", "position": 3, "name": h1, "item": canonical}]}
-    grid = "".join(card_link(b) for b in items)
     main_html = f"""<div class="bp-wrap">
     <nav class="bp-crumbs" aria-label="Breadcrumb"><a href="/">Home</a> › <a href="/raccolte/">Raccolte</a> › <span>{e(h1)}</span></nav>
     <p class="bp-eyebrow">Raccolta</p>
     <h1 class="bp-title">{e(h1)}</h1>
     <p class="bp-lead">{e(lead)}</p>
     <div class="bp-synopsis"><p>{e(intro)}</p></div>
-    <div class="bp-grid">{grid}</div>
+    <div class="bp-grid">{GRID_MARK}</div>
     <a class="bp-back" href="/raccolte/">← Tutte le raccolte</a>
   </div>"""
     head_html = head(c["title"], meta_description(intro), canonical, "", "website", (itemlist, breadcrumb))
-    return rel_dir, shell(head_html, main_html, with_fallback=True)
+    return rel_dir, listing_page(shell(head_html, main_html, with_fallback=True), items)
 
 
 def write(rel_dir, page):
     out = ROOT / rel_dir / "index.html"
     out.parent.mkdir(parents=True, exist_ok=True)
-    out.write_text(page, encoding="utf-8")
+    with open(out, "w", encoding="utf-8") as f:
+        if isinstance(page, str):
+            f.write(page)
+        else:
+            f.writelines(page)
     return f"{rel_dir}/"
 
 
+def write_book(b, rel_dir, page):
+    """write() a book page, with its waveform.json next to it when it has one."""
+    path = write(rel_dir, page)
+    waveform = waveform_of(b)
+    if waveform:
+        shutil.copyfile(waveform, ROOT / rel_dir / "waveform.json")
+    return path
+
+
 def build_sitemap(paths):
-    urls = f"  <url><loc>{SITE}/</loc><lastmod>{TODAY}</lastmod></url>\n"
-    urls += "".join(f"  <url><loc>{SITE}/{p}</loc><lastmod>{TODAY}</lastmod></url>\n" for p in paths)
-    return ('<?xml version="1.0" encoding="UTF-8"?>\n'
-            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n' + urls + "</urlset>\n")
+    """Yield the sitemap line by line (`paths` may be a generator)."""
+    yield ('<?xml version="1.0" encoding="UTF-8"?>\n'
+           '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+    yield f"  <url><loc>{SITE}/</loc><lastmod>{TODAY}</lastmod></url>\n"
+    for p in paths:
+        yield f"  <url><loc>{SITE}/{p}</loc><lastmod>{TODAY}</lastmod></url>\n"
+    yield "</urlset>\n"
+
+
+def views_of(b):
+    return b.get("view_count") or 0
 
 
 def related_for(b, authors, genres, limit=12):
-    """Pick related titles for a book page: same author first, then same genre."""
+    """Pick related titles for a book page: same author first, then same genre.
+    `authors`/`genres` map a key to its titles, most listened first."""
     seen = {b.get("id")}
     out = []
 
     def add_from(pool):
-        for rb in sorted(pool, key=lambda x: x.get("view_count") or 0, reverse=True):
+        for rb in pool:
             rid = rb.get("id")
             if rid and rid not in seen:
                 seen.add(rid)
@@ -752,13 +874,17 @@ def related_for(b, authors, genres, limit=12):
     return out
 
 
-def build_home_explore(valid, genre_entries, coll_entries):
+def home_pick(b):
+    # Viral shorts (< 10 min, > 1M views) are not audiobooks worth featuring.
+    return not ((b.get("duration") or 0) < 600 and views_of(b) > 1_000_000)
+
+
+def build_home_explore(top, genre_entries, coll_entries):
     """Static, crawlable homepage links so the home isn't empty for bots that
-    don't execute JS (AI crawlers) and to spread internal links to hubs."""
+    don't execute JS (AI crawlers) and to spread internal links to hubs.
+    `top`: the most listened titles to feature (see home_pick)."""
     colls = "".join(f'<a href="/raccolta/{slug}/">{e(h1)}</a>' for h1, slug, _ in coll_entries)
     gens = "".join(f'<a href="/genere/{slug}/">{e(label)}</a>' for label, slug, _ in genre_entries)
-    top = [b for b in sorted(valid, key=lambda x: x.get("view_count") or 0, reverse=True)
-           if not ((b.get("duration") or 0) < 600 and (b.get("view_count") or 0) > 1_000_000)][:24]
     titles = "".join(f'<a href="/audiolibro/{book_slug(b)}/">{e(display_title_of(b))}</a>' for b in top)
     parts = []
     if colls:
@@ -783,19 +909,56 @@ def inject_home_explore(block):
     return False
 
 
+def is_listed(b):
+    """Titles that get a page: something to play, embed or link out to."""
+    return bool(video_id(b) or b.get("audio_url") or b.get("audio_file") or b.get("embed_url")
+                or b.get("embed_type") == "link_out")
+
+
+def finish_site(book_paths, paths, genre_entries, author_entries, series_entries, coll_entries, top):
+    """Index pages, sitemap, robots.txt and the home links; shared by both build modes.
+    `book_paths` may be a generator (streamed into the sitemap); returns the sitemap URL count."""
+    paths.append(write(*build_index("generi", genre_entries)))
+    paths.append(write(*build_index("autori", sorted(author_entries, key=lambda x: x[0].lower()))))
+    if series_entries:
+        paths.append(write(*build_index("serie", sorted(series_entries, key=lambda x: x[0].lower()))))
+    if coll_entries:
+        paths.append(write(*build_index("raccolte", coll_entries)))
+
+    n_urls = 0
+    with open(ROOT / "sitemap.xml", "w", encoding="utf-8") as f:
+        for p in build_sitemap(itertools.chain(book_paths, paths)):
+            f.write(p)
+            n_urls += p.startswith("  <url>")
+    (ROOT / "robots.txt").write_text(
+        "User-agent: *\nAllow: /\n\n"
+        "# Build scripts and internal tooling (served by GitHub Pages, but not content)\n"
+        "Disallow: /*.py$\nDisallow: /deploy/\n\n"
+        f"Sitemap: {SITE}/sitemap.xml\n", encoding="utf-8")
+
+    inject_home_explore(build_home_explore(top, genre_entries, coll_entries))
+    return n_urls
+
+
 def main():
-    books = json.loads(DATA.read_text())
-    for k, b in books.items():
-        b["id"] = k
-    valid = [b for b in books.values() if (video_id(b) or b.get("audio_url") or b.get("audio_file") or b.get("embed_url") or b.get("embed_type") == "link_out")]
+    args = [a for a in sys.argv[1:] if a != "--stream"]
+    if "--stream" in sys.argv[1:] and (not args or args[0] == "all"):
+        return main_stream()
+
+    books = load_books()
+    valid = [b for b in books.values() if is_listed(b)]
 
     # Group once: drives both the hub pages and the "related" lists on book pages.
+    # Each group is ranked by views once (stable, so ties keep catalogue order).
     genres, authors = {}, {}
     for b in valid:
         g = genre_of(b)
         if g:
             genres.setdefault(g, []).append(b)
         authors.setdefault(author_of(b), []).append(b)
+    for group in (genres, authors):
+        for items in group.values():
+            items.sort(key=views_of, reverse=True)
 
     # Multi-part series get their own page. Group by SLUG (case/spacing-insensitive)
     # so casing variants of one title ("L'innocenza"/"L'Innocenza") merge into a
@@ -816,25 +979,25 @@ def main():
         sl = slugify((b.get("series") or "").strip()) if (b.get("series") and b.get("part") is not None) else ""
         return (sl in multi_series_slugs), series_name_by_slug.get(sl)
 
-    if len(sys.argv) > 1 and sys.argv[1] != "all":
-        vid = sys.argv[1]
+    if args and args[0] != "all":
+        vid = args[0]
         if vid not in books:
             sys.exit(f"id {vid} not found")
         b = books[vid]
         in_s, sname = series_args(b)
         rel_dir, page = build_book_page(b, related_for(b, authors, genres), in_series=in_s, series_name=sname)
-        print("wrote", write(rel_dir, page))
+        print("wrote", write_book(b, rel_dir, page))
         return
 
-    paths = []
+    book_paths = []
     for b in valid:
         in_s, sname = series_args(b)
         rel_dir, page = build_book_page(b, related_for(b, authors, genres), in_series=in_s, series_name=sname)
-        paths.append(write(rel_dir, page))
+        book_paths.append(write_book(b, rel_dir, page))
 
+    paths = []
     genre_entries = []
     for g, items in sorted(genres.items(), key=lambda kv: len(kv[1]), reverse=True):
-        items.sort(key=lambda b: b.get("view_count") or 0, reverse=True)
         rel_dir, page = build_hub("genere", g.capitalize(), items, slugify(g))
         paths.append(write(rel_dir, page))
         genre_entries.append((g.capitalize(), slugify(g), len(items)))
@@ -843,7 +1006,6 @@ def main():
     for a, items in sorted(authors.items(), key=lambda kv: len(kv[1]), reverse=True):
         if len(items) < 2 or a == "Autore sconosciuto":
             continue
-        items.sort(key=lambda b: b.get("view_count") or 0, reverse=True)
         rel_dir, page = build_hub("autore", a, items, slugify(a))
         paths.append(write(rel_dir, page))
         author_entries.append((a, slugify(a), len(items)))
@@ -851,7 +1013,7 @@ def main():
     series_entries = []
     for sl, g in sorted(series_groups.items(), key=lambda kv: len(kv[1]["chapters"]), reverse=True):
         name = series_name_by_slug[sl]
-        rel_dir, page = build_series(name, g["chapters"])
+        rel_dir, page = build_series(name, sorted(g["chapters"], key=lambda b: b.get("part") or 0))
         paths.append(write(rel_dir, page))
         series_entries.append((name, sl, len(g["chapters"])))
 
@@ -861,29 +1023,179 @@ def main():
         items = [b for b in valid if c["match"](b) and not _blocked(b)]
         if len(items) < 8:
             continue
-        items.sort(key=lambda b: b.get("view_count") or 0, reverse=True)
+        items.sort(key=views_of, reverse=True)
         rel_dir, page = build_collection(c, items)
         paths.append(write(rel_dir, page))
         coll_entries.append((c["h1"], c["slug"], len(items)))
 
-    paths.append(write(*build_index("generi", genre_entries)))
-    paths.append(write(*build_index("autori", sorted(author_entries, key=lambda x: x[0].lower()))))
-    if series_entries:
-        paths.append(write(*build_index("serie", sorted(series_entries, key=lambda x: x[0].lower()))))
-    if coll_entries:
-        paths.append(write(*build_index("raccolte", coll_entries)))
-
-    (ROOT / "sitemap.xml").write_text(build_sitemap(paths), encoding="utf-8")
-    (ROOT / "robots.txt").write_text(
-        "User-agent: *\nAllow: /\n\n"
-        "# Build scripts and internal tooling (served by GitHub Pages, but not content)\n"
-        "Disallow: /*.py$\nDisallow: /deploy/\n\n"
-        f"Sitemap: {SITE}/sitemap.xml\n", encoding="utf-8")
-
-    inject_home_explore(build_home_explore(valid, genre_entries, coll_entries))
+    top = [b for b in sorted(valid, key=views_of, reverse=True) if home_pick(b)][:24]
+    n_urls = finish_site(book_paths, paths, genre_entries, author_entries, series_entries, coll_entries, top)
 
     print(f"books={len(valid)}  genre_hubs={len(genre_entries)}  author_hubs={len(author_entries)}  "
-          f"series={len(series_entries)}  collections={len(coll_entries)}  sitemap_urls={len(paths) + 1}")
+          f"series={len(series_entries)}  collections={len(coll_entries)}  sitemap_urls={n_urls}")
+
+
+# ---- Streaming build ------------------------------------------------------
+# `generate_pages.py all --stream` renders the same site without ever holding
+# the catalogue in memory, for catalogues that no longer fit in RAM:
+#   pass 1  streams the records (catalog.iter_view) and spills one small row per
+#           title to an on-disk SQLite index: group keys (genre, author, series,
+#           collections), sort keys (views, part, catalogue position) and the few
+#           fields a card needs;
+#   pass 2  streams the records again and renders the book pages, with the
+#           "related" lists queried from the index;
+#   then    hubs, series, collections and indexes are rendered from the index.
+# Hub/series/collection pages are streamed to disk (listing_page), so memory
+# stays flat as the number of titles grows.
+# Output is identical to the in-memory build (ties in every ranking are broken
+# by catalogue position, as the stable sorts above do).
+
+CARD_FIELDS = ("url", "title", "real_title", "real_author", "part_display", "part",
+               "thumbnail", "duration", "view_count")
+
+
+class GroupIndex:
+    """On-disk group index for the streaming build (SQLite in a temp dir)."""
+
+    def __init__(self, path):
+        self.db = sqlite3.connect(path)
+        self.db.executescript("""
+            CREATE TABLE books (pos INTEGER PRIMARY KEY, id TEXT, genre TEXT, author TEXT,
+                                series TEXT, series_slug TEXT, part_key, views INTEGER,
+                                home INTEGER, card TEXT);
+            CREATE TABLE coll (slug TEXT, pos INTEGER);
+        """)
+        self.count = 0
+
+    def add(self, b):
+        s = (b.get("series") or "").strip()
+        in_series = bool(s and b.get("part") is not None)
+        card = {f: getattr(b, f) for f in CARD_FIELDS if hasattr(b, f)}
+        self.db.execute("INSERT INTO books VALUES (?,?,?,?,?,?,?,?,?,?)",
+                        (self.count, b.get("id"), genre_of(b), author_of(b),
+                         s if in_series else None, slugify(s) if in_series else None,
+                         b.get("part") or 0, views_of(b), home_pick(b),
+                         jsoncodec.dumps(card)))
+        for c in COLLECTIONS:
+            if c["match"](b) and not _blocked(b):
+                self.db.execute("INSERT INTO coll VALUES (?,?)", (c["slug"], self.count))
+        self.count += 1
+
+    def finish(self):
+        self.db.executescript("""
+            CREATE INDEX by_genre ON books (genre, views DESC, pos);
+            CREATE INDEX by_author ON books (author, views DESC, pos);
+            CREATE INDEX by_series ON books (series_slug, part_key, pos);
+            CREATE INDEX by_coll ON coll (slug, pos);
+        """)
+        self.db.commit()
+
+    def cards(self, where="1", params=(), order="pos", join="", limit=-1):
+        sql = f"SELECT id, card FROM books {join} WHERE {where} ORDER BY {order} LIMIT ?"
+        for key, card in self.db.execute(sql, (*params, limit)):
+            yield Book(key, jsoncodec.loads(card))
+
+    def groups(self, column):
+        """(key, count) per group, largest first (ties: first seen first)."""
+        return self.db.execute(f"SELECT {column}, COUNT(*) FROM books WHERE {column} IS NOT NULL "
+                               f"GROUP BY {column} ORDER BY COUNT(*) DESC, MIN(pos)").fetchall()
+
+    def ranked(self, column):
+        """Pools for related_for(): key -> titles, most listened first (lazy)."""
+        index = self
+
+        class Pools:
+            def get(self, key, default=()):
+                return index.cards(f"books.{column} = ?", (key,), "views DESC, pos")
+        return Pools()
+
+
+class Rows:
+    """One group's titles as an index query: len() is known up front and every
+    iteration runs the query again, so listing_page() can walk it twice."""
+
+    def __init__(self, index, count, *query, **options):
+        self.index, self.count, self.query, self.options = index, count, query, options
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return self.index.cards(*self.query, **self.options)
+
+
+def main_stream():
+    with tempfile.TemporaryDirectory() as tmp:
+        index = GroupIndex(Path(tmp) / "groups.sqlite")
+        for k, rec in catalog.iter_view(ROOT):
+            b = Book(k, rec)
+            if is_listed(b):
+                index.add(b)
+        index.finish()
+
+        # Series: name = most frequent spelling per slug (ties: first seen).
+        series_name_by_slug, series_sizes = {}, {}
+        for sl, name, n in index.db.execute(
+                "SELECT series_slug, series, COUNT(*) FROM books WHERE series_slug IS NOT NULL "
+                "GROUP BY series_slug, series ORDER BY series_slug, COUNT(*) DESC, MIN(pos)"):
+            series_name_by_slug.setdefault(sl, name)
+            series_sizes[sl] = series_sizes.get(sl, 0) + n
+        multi_series_slugs = {sl for sl, n in series_sizes.items() if n >= 2}
+
+        def series_args(b):
+            sl = slugify((b.get("series") or "").strip()) if (b.get("series") and b.get("part") is not None) else ""
+            return (sl in multi_series_slugs), series_name_by_slug.get(sl)
+
+        authors, genres = index.ranked("author"), index.ranked("genre")
+        for k, rec in catalog.iter_view(ROOT):
+            b = Book(k, rec)
+            if is_listed(b):
+                in_s, sname = series_args(b)
+                write_book(b, *build_book_page(b, related_for(b, authors, genres), in_series=in_s, series_name=sname))
+
+        paths = []
+        genre_entries = []
+        for g, n in index.groups("genre"):
+            if not g:
+                continue
+            items = Rows(index, n, "genre = ?", (g,), "views DESC, pos")
+            paths.append(write(*build_hub("genere", g.capitalize(), items, slugify(g))))
+            genre_entries.append((g.capitalize(), slugify(g), n))
+
+        author_entries = []
+        for a, n in index.groups("author"):
+            if n < 2 or a == "Autore sconosciuto":
+                continue
+            items = Rows(index, n, "author = ?", (a,), "views DESC, pos")
+            paths.append(write(*build_hub("autore", a, items, slugify(a))))
+            author_entries.append((a, slugify(a), n))
+
+        series_entries = []
+        for sl, n in index.groups("series_slug"):
+            if sl not in multi_series_slugs:
+                continue
+            name = series_name_by_slug[sl]
+            chapters = Rows(index, n, "series_slug = ?", (sl,), "part_key, pos")
+            paths.append(write(*build_series(name, chapters)))
+            series_entries.append((name, sl, n))
+
+        coll_entries = []
+        for c in COLLECTIONS:
+            n = index.db.execute("SELECT COUNT(*) FROM coll WHERE slug = ?", (c["slug"],)).fetchone()[0]
+            if n < 8:
+                continue
+            items = Rows(index, n, "coll.slug = ?", (c["slug"],), "views DESC, books.pos",
+                         join="JOIN coll ON coll.pos = books.pos")
+            paths.append(write(*build_collection(c, items)))
+            coll_entries.append((c["h1"], c["slug"], len(items)))
+
+        top = list(index.cards("home", (), "views DESC, pos", limit=24))
+        book_paths = (f"audiolibro/{book_slug(b)}/" for b in index.cards())
+        n_urls = finish_site(book_paths, paths, genre_entries, author_entries, series_entries, coll_entries, top)
+
+        print(f"books={index.count}  genre_hubs={len(genre_entries)}  author_hubs={len(author_entries)}  "
+              f"series={len(series_entries)}  collections={len(coll_entries)}  sitemap_urls={n_urls}  (streamed)")
+        index.db.close()
 
 
 if __name__ == "__main__":
@@ -13,8 +13,10 @@ from typing import Dict, List, Set, Tuple
 import argparse
 import re
 
+import catalog
+
 class GenreManager:
-    def __init__(self, audiobooks_file='audiobooks.json', augmented_file='augmented.json'):
+    def __init__(self, audiobooks_file=catalog.SOURCE_FILE, augmented_file=catalog.OVERLAY_FILE):
         self.audiobooks_file = audiobooks_file
         self.augmented_file = augmented_file
         self.data = {}
@@ -23,8 +25,9 @@ class GenreManager:
     def load_data(self):
         """Load audiobooks data from JSON files"""
         try:
-            with open(self.audiobooks_file, 'r', encoding='utf-8') as f:
-                self.data = json.load(f)
+            if not catalog.exists(self.audiobooks_file):
+                raise FileNotFoundError(self.audiobooks_file)
+            self.data = catalog.read_json(self.audiobooks_file)
             print(f"✅ Loaded {len(self.data)} books from {self.audiobooks_file}")
         except FileNotFoundError:
             print(f"❌ File {self.audiobooks_file} not found")
@@ -34,11 +37,17 @@ class GenreManager:
             return False
             
         try:
-            with open(self.augmented_file, 'r', encoding='utf-8') as f:
-                self.augmented_data = json.load(f)
-            print(f"✅ Loaded {len(self.augmented_data)} books from {self.augmented_file}")
-        except FileNotFoundError:
-            print(f"⚠️  File {self.augmented_file} not found, will only use main data")
+            # Merged view = source records + enrichment overlay (see catalog.py);
+            # a legacy augmented.json is diffed into an overlay on first run.
+            if catalog.exists(self.augmented_file):
+                overlay = catalog.read_json(self.augmented_file)
+            else:
+                overlay = catalog.split(catalog.read_json(catalog.VIEW_FILE), self.data)
+            if overlay:
+                self.augmented_data = catalog.merge(self.data, overlay)
+                print(f"✅ Loaded {len(self.augmented_data)} books from {self.augmented_file}")
+            else:
+                print(f"⚠️  File {self.augmented_file} not found, will only use main data")
         except json.JSONDecodeError as e:
             print(f"⚠️  Error reading {self.augmented_file}: {e}")
             
@@ -518,20 +527,17 @@ Examples:
     def _save_data(self):
         """Save data back to files"""
         try:
-            # Backup original files
-            import shutil
-            shutil.copy(self.audiobooks_file, f"{self.audiobooks_file}.backup")
-            if self.augmented_data:
-                shutil.copy(self.augmented_file, f"{self.augmented_file}.backup")
+            # Backup original files (compressed snapshots)
+            catalog.snapshot(self.audiobooks_file, "backup")
+            if self.augmented_data and catalog.exists(self.augmented_file):
+                catalog.snapshot(self.augmented_file, "backup")
             
             # Save main data
-            with open(self.audiobooks_file, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, ensure_ascii=False, indent=2)
+            catalog.write_json(self.audiobooks_file, self.data)
             
-            # Save augmented data if it exists
+            # Save only the overlay (fields that differ from the main data)
             if self.augmented_data:
-                with open(self.augmented_file, 'w', encoding='utf-8') as f:
-                    json.dump(self.augmented_data, f, ensure_ascii=False, indent=2)
+                catalog.write_json(self.augmented_file, catalog.split(self.augmented_data, self.data))
             
             print("✅ Files saved successfully")
             print("📁 Backups created with .backup extension")
@@ -543,8 +549,8 @@ def main():
     parser = argparse.ArgumentParser(description='Manage genres in audiobook collection')
     parser.add_argument('--audiobooks', '-a', default='audiobooks.json', 
                        help='Path to audiobooks.json file')
-    parser.add_argument('--augmented', '-u', default='augmented.json',
-                       help='Path to augmented.json file')
+    parser.add_argument('--augmented', '-u', default=catalog.OVERLAY_FILE,
+                       help=f'Path to the enrichment overlay ({catalog.OVERLAY_FILE}, see catalog.py)')
     parser.add_argument('--analyze', action='store_true',
                        help='Show genre analysis report')
     parser.add_argument('--problems', action='store_true',
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""On-disk HTTP cache with conditional requests, shared by the scrapers.
+
+liberliber_scraper.py downloads the whole `elenco-per-opere` index (and the
+work pages of every title it could not ingest) on every run,
+librivox_scraper.py pages through the entire LibriVox feed and
+rss_podcast_scraper.py fetches whole feeds, although these sources change
+rarely. Every GET through http_cache.get() is stored on disk with its
+ETag / Last-Modified:
+
+  - younger than the TTL: answered from disk, no request at all,
+  - older: revalidated with If-None-Match / If-Modified-Since; an unchanged
+    source answers 304 with no body and the stored copy is served,
+  - offline: always answered from disk (a miss raises OfflineMiss), so the
+    parsers can be re-run and debugged without touching the sites.
+
+Only 200 responses are stored. Network requests take a token from the
+host's budget in ratelimit.py first; answers from disk do not.
+
+    import http_cache
+    r = http_cache.get(url, session=session, timeout=20)   # like requests.get
+    r.raise_for_status(); r.text, r.json(), r.cache          # 'fresh', 'revalidated', 'offline' or None
+    http_cache.print_stats()
+
+Settings: HTTP_CACHE_DIR (default .http_cache), HTTP_CACHE_TTL in seconds
+(default 0: always revalidate), HTTP_CACHE_OFFLINE=1 (or the scrapers'
+--offline), HTTP_CACHE=0 to bypass the cache entirely.
+
+Usage:
+    python3 http_cache.py                 # entries and size per host
+    python3 http_cache.py clear [DAYS]    # drop entries not validated for DAYS (all by default)
+"""
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+
+import ratelimit
+
+CACHE_DIR = os.environ.get('HTTP_CACHE_DIR', '.http_cache')
+TTL = float(os.environ.get('HTTP_CACHE_TTL', '0'))
+OFFLINE = os.environ.get('HTTP_CACHE_OFFLINE', '') == '1'
+ENABLED = os.environ.get('HTTP_CACHE', '1') != '0'
+
+_lock = threading.Lock()
+_stats = {}  # host -> {'fresh': n, 'revalidated': n, 'fetched': n, 'offline': n, 'bytes_saved': n}
+
+
+class OfflineMiss(Exception):
+    """Offline mode and the URL is not in the cache."""
+
+
+class CachedResponse:
+    """The parts of requests.Response the scrapers use."""
+
+    def __init__(self, url, status_code, headers, content, encoding=None, cache=None):
+        self.url = url
+        self.status_code = status_code
+        self.headers = requests.structures.CaseInsensitiveDict(headers)
+        self.content = content
+        self.encoding = encoding
+        self.cache = cache  # how it was answered: 'fresh', 'revalidated', 'offline', or None (network)
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+
+def configure(ttl=None, offline=None, enabled=None, cache_dir=None):
+    """Override the environment settings for this process."""
+    global TTL, OFFLINE, ENABLED, CACHE_DIR
+    if ttl is not None:
+        TTL = ttl
+    if offline is not None:
+        OFFLINE = offline
+    if enabled is not None:
+        ENABLED = enabled
+    if cache_dir is not None:
+        CACHE_DIR = cache_dir
+
+
+def _paths(url):
+    digest = hashlib.sha1(url.encode('utf-8')).hexdigest()
+    base = os.path.join(CACHE_DIR, digest[:2], digest)
+    return base + '.json', base + '.body'
+
+
+def _load(url):
+    meta_path, body_path = _paths(url)
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        with open(body_path, 'rb') as f:
+            return meta, f.read()
+    except (OSError, ValueError):
+        return None, None
+
+
+def _write(path, data, mode):
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp, mode, **({'encoding': 'utf-8'} if 'b' not in mode else {})) as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _store_meta(url, meta):
+    meta_path, _ = _paths(url)
+    os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+    _write(meta_path, json.dumps(meta), 'w')
+
+
+def _count(url, outcome, saved=0):
+    host = ratelimit.host_of(url)
+    with _lock:
+        s = _stats.setdefault(host, dict.fromkeys(('fresh', 'revalidated', 'fetched', 'offline', 'bytes_saved'), 0))
+        s[outcome] += 1
+        s['bytes_saved'] += saved
+
+
+def _from_meta(url, meta, body, cache):
+    return CachedResponse(url, meta['status'], {'Content-Type': meta.get('content_type', '')},
+                          body, meta.get('encoding'), cache)
+
+
+def get(url, session=None, headers=None, timeout=30, ttl=None):
+    """GET `url` through the cache; returns a CachedResponse (see the module docstring)."""
+    client = session or requests
+    if not ENABLED:
+        ratelimit.wait(url)
+        r = client.get(url, headers=headers, timeout=timeout)
+        return CachedResponse(url, r.status_code, r.headers, r.content, r.encoding or r.apparent_encoding)
+
+    meta, body = _load(url)
+    ttl = TTL if ttl is None else ttl
+    if meta is not None and (OFFLINE or time.time() - meta['validated'] < ttl):
+        outcome = 'offline' if OFFLINE else 'fresh'
+        _count(url, outcome, len(body))
+        return _from_meta(url, meta, body, outcome)
+    if OFFLINE:
+        raise OfflineMiss(f"{url} is not in the HTTP cache ({CACHE_DIR})")
+
+    request_headers = dict(headers or {})
+    if meta is not None:
+        if meta.get('etag'):
+            request_headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            request_headers['If-Modified-Since'] = meta['last_modified']
+    ratelimit.wait(url)
+    r = client.get(url, headers=request_headers, timeout=timeout)
+
+    if r.status_code == 304 and meta is not None:
+        meta['validated'] = time.time()
+        # A 304 may carry updated validators
+        meta['etag'] = r.headers.get('ETag', meta.get('etag'))
+        meta['last_modified'] = r.headers.get('Last-Modified', meta.get('last_modified'))
+        _store_meta(url, meta)
+        _count(url, 'revalidated', len(body))
+        return _from_meta(url, meta, body, 'revalidated')
+
+    response = CachedResponse(url, r.status_code, r.headers, r.content, r.encoding or r.apparent_encoding)
+    _count(url, 'fetched')
+    if r.status_code == 200:
+        now = time.time()
+        meta = {'url': url, 'status': 200, 'content_type': r.headers.get('Content-Type', ''),
+                'encoding': response.encoding, 'etag': r.headers.get('ETag'),
+                'last_modified': r.headers.get('Last-Modified'), 'fetched': now, 'validated': now}
+        _, body_path = _paths(url)
+        os.makedirs(os.path.dirname(body_path), exist_ok=True)
+        _write(body_path, r.content, 'wb')  # body first: an entry is complete once its metadata exists
+        _store_meta(url, meta)
+    return response
+
+
+def stats():
+    with _lock:
+        return {host: dict(s) for host, s in _stats.items()}
+
+
+def print_stats(log=print):
+    """One line per host requested through the cache (same shape as ratelimit.print_stats)."""
+    for host, s in sorted(stats().items()):
+        log(f"http cache {host}: {s['fetched']} fetched, {s['revalidated']} unchanged (304), "
+            f"{s['fresh']} fresh, {s['offline']} offline; {s['bytes_saved'] / 1e6:.1f} MB not downloaded")
+
+
+def _entries():
+    for root, _, names in os.walk(CACHE_DIR):
+        for name in names:
+            if name.endswith('.json'):
+                path = os.path.join(root, name)
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        meta = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                yield path, meta
+
+
+def main():
+    args = sys.argv[1:]
+    if args and args[0] == 'clear':
+        max_age = float(args[1]) * 86400 if len(args) > 1 else 0
+        removed = 0
+        for path, meta in list(_entries()):
+            if time.time() - meta.get('validated', 0) >= max_age:
+                for p in (path, path[:-len('.json')] + '.body'):
+                    if os.path.exists(p):
+                        os.remove(p)
+                removed += 1
+        print(f"🗑️  Removed {removed} cached responses from {CACHE_DIR}")
+        return
+
+    hosts = {}
+    for path, meta in _entries():
+        body = path[:-len('.json')] + '.body'
+        h = hosts.setdefault(urlparse(meta['url']).hostname or '?', [0, 0, 0])
+        h[0] += 1
+        h[1] += os.path.getsize(body) if os.path.exists(body) else 0
+        h[2] += bool(meta.get('etag') or meta.get('last_modified'))
+    if not hosts:
+        print(f"📭 {CACHE_DIR} is empty.")
+        return
+    for host, (n, size, validators) in sorted(hosts.items()):
+        print(f"  {host:<24} {n:>6} responses  {size / 1e6:>8.1f} MB  {validators} with ETag/Last-Modified")
+    print(f"TTL {TTL:g}s{', offline' if OFFLINE else ''} ({CACHE_DIR})")
+
+
+if __name__ == '__main__':
+    main()
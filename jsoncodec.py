@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""Optional accelerated JSON codec shared by the catalogue layer and the build.
+
+Every catalogue load, index.min.json and the three JSON-LD blobs of each book
+page go through JSON. When `orjson` is installed it encodes/decodes several
+times faster than the stdlib; when it is not, everything falls back to `json`.
+Nothing else needs to know which one ran: output is byte-identical to
+
+    json.dumps(obj, ensure_ascii=False, separators=(",", ":"))   # indent=None
+    json.dumps(obj, ensure_ascii=False, indent=2)                 # indent=2
+
+and decoded values equal json.loads(). orjson only differs from the stdlib on
+a few inputs, and each is routed back to the stdlib:
+  - floats outside [1e-4, 1e16) ("1e16" vs "1e+16", "0.00001" vs "1e-05") and
+    NaN/Infinity (written as null): any output containing an exponent,
+    "0.0000" or null is re-encoded with the stdlib;
+  - integers beyond 64 bits, non-str keys, lone surrogates: orjson raises;
+  - decoding integers beyond 64 bits (orjson turns them into floats): input
+    with a run of 19+ digits is decoded with the stdlib.
+The checks are substring searches over the output/input, far cheaper than
+encoding.
+
+Set AUDIOLIBRI_JSON=stdlib to force the stdlib path.
+
+Usage:
+    python3 jsoncodec.py [file.json]   # micro-benchmark both paths on the catalogue
+                                       # (default: the catalogue, else index.min.json)
+"""
+import itertools
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if os.environ.get("AUDIOLIBRI_JSON") == "stdlib":
+    orjson = None
+
+BACKEND = "orjson" if orjson else "json"
+
+# Every digit becomes "0", so one substring search finds any digit run.
+_DIGITS = bytes.maketrans(b"123456789", b"000000000")
+_WINDOW = 1 << 22
+
+
+def _zeroed(buf):
+    """Yield (offset, chunk with digits zeroed) over `buf` in overlapping
+    windows, so large documents are never copied in one piece."""
+    for start in range(0, len(buf), _WINDOW):
+        yield start, buf[start:start + _WINDOW + 32].translate(_DIGITS)
+
+
+def _in_value(buf, i, j):
+    """True when buf[i:j] is a whole JSON token (not text inside a string):
+    preceded by a structural character and, for `null`, followed by one."""
+    while i and buf[i - 1] in b"0123456789.-":
+        i -= 1
+    return (i == 0 or buf[i - 1] in b":,[ \n") and (j >= len(buf) or buf[j] in b"0123456789.+-,]} \n")
+
+
+def _unsafe_output(out):
+    """orjson output that may differ from the stdlib's (see module docstring):
+    a number with an exponent or starting "0.0000", or a null. Substring
+    searches first; the token check only runs on the (rare) hits, so text
+    such as "watch?v=1vm7E" or "nel nulla" does not force the slow path."""
+    def hits(buf, needle, lo, hi, base=0):
+        i = buf.find(needle, lo, hi)
+        while i != -1:
+            yield i + base, i + base + len(needle)
+            i = buf.find(needle, i + 1, hi)
+
+    for start, zeroed in _zeroed(out):
+        end = start + len(zeroed)
+        for i, j in itertools.chain(hits(zeroed, b"0e", 0, len(zeroed), start),
+                                    hits(zeroed, b"0E", 0, len(zeroed), start),
+                                    hits(out, b"0.0000", start, end),
+                                    hits(out, b"null", start, end)):
+            if _in_value(out, i, j):
+                return True
+    return False
+
+
+def _unsafe_input(raw):
+    """A run of 19+ digits: possibly an integer wider than 64 bits."""
+    return any(b"0000000000000000000" in zeroed for _, zeroed in _zeroed(raw))
+
+
+def _std_dumps(obj, indent=None):
+    if indent is None:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+    return json.dumps(obj, ensure_ascii=False, indent=indent)
+
+
+def _fast_dumps(obj, indent=None):
+    if indent not in (None, 2):
+        return _std_dumps(obj, indent)
+    try:
+        out = orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    except TypeError:  # orjson.JSONEncodeError: big int, non-str key, surrogate, ...
+        return _std_dumps(obj, indent)
+    if _unsafe_output(out):
+        return _std_dumps(obj, indent)
+    return out.decode("utf-8")
+
+
+def _fast_loads(data):
+    raw = data.encode("utf-8", "surrogatepass") if isinstance(data, str) else data
+    if _unsafe_input(raw):
+        return json.loads(data)
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        # NaN/Infinity, lone surrogates, ... (or plain invalid JSON: the
+        # stdlib then raises its own JSONDecodeError with the position).
+        return json.loads(data)
+
+
+def dumps(obj, indent=None):
+    """Encode `obj` (non-ASCII kept as-is); compact when `indent` is None."""
+    return _fast_dumps(obj, indent) if orjson else _std_dumps(obj, indent)
+
+
+def loads(data):
+    """Decode a JSON document from str or UTF-8 bytes."""
+    return _fast_loads(data) if orjson else json.loads(data)
+
+
+def main():
+    import sys
+    import time
+
+    import catalog
+
+    if orjson is None:
+        print("orjson is not installed (pip install orjson): only the stdlib path is available.")
+    if len(sys.argv) > 1:
+        label, view = sys.argv[1], catalog.read_json(sys.argv[1])
+    elif catalog.view_sources():
+        label, view = " + ".join(str(p) for p in catalog.view_sources()), catalog.load_view()
+    elif catalog.exists("index.min.json"):
+        label, view = "index.min.json", catalog.read_json("index.min.json")
+    else:
+        raise SystemExit("No catalogue found.")
+    blob = json.dumps(view, ensure_ascii=False).encode("utf-8")
+    books = list(view.values())
+
+    def bench(label, std, fast, repeat=3):
+        timings = []
+        for fn in (std, fast):
+            if fn is None:
+                timings.append(None)
+                continue
+            best = float("inf")
+            for _ in range(repeat):
+                t = time.perf_counter()
+                result = fn()
+                best = min(best, time.perf_counter() - t)
+            timings.append((best, result))
+        (t_std, r_std), fast_run = timings
+        if fast_run is None:
+            print(f"{label:<34} json {t_std*1000:8.1f} ms")
+            return
+        t_fast, r_fast = fast_run
+        same = "identical" if r_std == r_fast else "DIFFERENT"
+        print(f"{label:<34} json {t_std*1000:8.1f} ms   orjson {t_fast*1000:8.1f} ms   "
+              f"x{t_std/t_fast:4.1f}   {same}")
+
+    fast = orjson is not None
+    print(f"catalogue: {label}  ({len(view)} records, {len(blob)/1e6:.1f} MB)")
+    bench("load full catalogue", lambda: json.loads(blob), (lambda: _fast_loads(blob)) if fast else None)
+    bench("per-record dumps (compact)", lambda: [_std_dumps(b) for b in books],
+          (lambda: [_fast_dumps(b) for b in books]) if fast else None)
+    bench("per-record dumps (indent=2)", lambda: [_std_dumps(b, 2) for b in books],
+          (lambda: [_fast_dumps(b, 2) for b in books]) if fast else None)
+    bench("whole catalogue dump (compact)", lambda: _std_dumps(view),
+          (lambda: _fast_dumps(view)) if fast else None)
+
+
+if __name__ == "__main__":
+    main()
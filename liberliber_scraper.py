@@ -1,17 +1,22 @@
 #!/usr/bin/env python3
-import os
 import re
 import sys
-import json
-import time
 import html
 import requests
-import subprocess
+import time
 import argparse
+import requests.adapters
+from collections import deque
+from html.parser import HTMLParser
 from urllib.parse import urlparse
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor
 
+import catalog
+import http_cache
+import mp3info
+import ratelimit
+
 # Vetted genre taxonomy logic
 def guess_genre(title, description):
     content = f"{title} {description}".lower()
@@ -52,106 +57,394 @@ def clean_person_name(name):
             return f"{parts[1]} {parts[0]}"
     return name
 
-def get_mp3_duration(url):
-    """Call ffprobe to get exact duration of a remote MP3 file"""
-    cmd = [
-        "ffprobe", "-v", "quiet", 
-        "-show_entries", "format=duration", 
-        "-of", "default=noprint_wrappers=1:nokey=1", 
-        url
-    ]
+INDEX_URL = "https://liberliber.it/opere/audiolibri/elenco-per-opere/"
+HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
+SAVE_EVERY = 25  # --pipeline: write the catalogue every N ingested books (and at the end)
+
+def make_session(pool_size):
+    """One keep-alive session for every page fetch and duration probe, with a
+    connection pool large enough for all the worker threads"""
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def fetch_page(url, session=None):
+    """GET a page through the HTTP cache (http_cache.py), which takes a token
+    from the host's rate limit (ratelimit.py) when it has to go to the network"""
+    r = http_cache.get(url, session=session, headers=HEADERS, timeout=20)
+    r.raise_for_status()
+    return r.text
+
+def get_mp3_duration(url, session=None):
+    """Duration of a remote MP3 from its headers: one Range request for the
+    first few KB (see mp3info.py), no ffprobe process. Not probed (0.0) when
+    replaying from the HTTP cache with --offline"""
+    if http_cache.OFFLINE:
+        return 0.0
     try:
-        res = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=15)
-        if res.returncode == 0 and res.stdout.strip():
-            return float(res.stdout.strip())
+        ratelimit.wait(url)  # the parallel probes share the host's budget
+        info = mp3info.probe_url(url, session=session)
+        if info and info['duration']:
+            return float(info['duration'])
+        print(f"    No MP3 duration found for {url}")
     except Exception as e:
-        print(f"    ffprobe failed for {url}: {e}")
+        print(f"    Duration probe failed for {url}: {e}")
     return 0.0
 
-def scrape_liberliber(limit=20, dry_run=False, verbose=False):
-    print("=" * 60)
-    print("📚 Liber Liber Audiobook Ingestor & Scraper")
-    print("=" * 60)
-    
-    # Paths to database files
-    audiobooks_path = 'audiobooks.json'
-    augmented_path = 'augmented.json'
-    
-    # Load database
-    audiobooks = {}
-    augmented = {}
-    if os.path.exists(audiobooks_path):
-        with open(audiobooks_path, 'r', encoding='utf-8') as f:
-            audiobooks = json.load(f)
-    if os.path.exists(augmented_path):
-        with open(augmented_path, 'r', encoding='utf-8') as f:
-            augmented = json.load(f)
-            
-    print(f"Loaded {len(audiobooks)} existing books from database.")
-    
-    # Fetch index list
-    index_url = "https://liberliber.it/opere/audiolibri/elenco-per-opere/"
-    print(f"Fetching index page: {index_url}...")
-    headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
-    try:
-        r = requests.get(index_url, headers=headers, timeout=20)
-        r.raise_for_status()
-    except Exception as e:
-        print(f"❌ Failed to fetch index page: {e}")
-        return
-        
-    # Extract <li> blocks
-    li_blocks = re.findall(r'<li>(.*?)</li>', r.text, re.DOTALL | re.IGNORECASE)
-    print(f"Found {len(li_blocks)} raw list items on page.")
-    
+# Index and work pages are read with html.parser in one pass each, in
+# CHUNK-sized pieces: entries come out as soon as their element closes, and
+# nothing is ever matched against the whole document (the DOTALL regexes used
+# before, `<div class="post-content">(.*)` above all, could backtrack across
+# a multi-megabyte page for every item).
+CHUNK = 64 * 1024
+SYNOPSIS_STOP = ("Istruzioni", "Formato MP3", "Formato FLAC", "Formato Ogg")  # the download section follows
+NARRATOR_RE = re.compile(r'^\s*(.+?)\s*\(ruolo:\s*Voce\)\s*$', re.IGNORECASE | re.DOTALL)
+PUB_DATE_RE = re.compile(r'(\d{1,2})\s+([a-z]+)\s+(\d{4})', re.IGNORECASE)
+PUB_LABEL = "data pubblicazione:"
+
+def _chunks(text, size=CHUNK):
+    for i in range(0, len(text), size):
+        yield text[i:i + size]
+
+def _text(parts):
+    """Captured text with whitespace collapsed (what clean_html() gives for markup)"""
+    return ' '.join(''.join(parts).split())
+
+class IndexParser(HTMLParser):
+    """Index page entries: a <li> with the work link (the <a> opening an <em>),
+    the author link (the <a> after "di") and an optional subtitle span. Each
+    finished entry is appended to `entries` when its </li> is read."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.entries = []
+        self._li = None     # entry being read
+        self._capture = None  # (field, parts) inside the work/author link or the subtitle
+        self._em = False    # right after <em>: the next <a> is the work link
+        self._before = ''   # text since the last tag, for "di <a>"
+
+    def handle_starttag(self, tag, attrs):
+        before, self._before = self._before, ''
+        em, self._em = self._em, False
+        if tag == 'li':
+            self._finish()  # </li> is optional in HTML: a new item ends the previous one
+            self._li = {'work': None, 'author': None, 'subtitle': None, 'hrefs': []}
+            return
+        li = self._li
+        if li is None:
+            return
+        if self._capture:
+            self._capture[1].append(' ')
+            return
+        attrs = dict(attrs)
+        if tag == 'em':
+            self._em = True
+        elif tag == 'a':
+            href = (attrs.get('href') or '').strip()
+            li['hrefs'].append(href)
+            if em and li['work'] is None:
+                li['work'] = (href, [])
+                self._capture = ('work', li['work'][1])
+            elif li['author'] is None and before.rstrip().endswith('di'):
+                li['author'] = (href, [])
+                self._capture = ('author', li['author'][1])
+        elif tag == 'span' and attrs.get('class') == 'll_libro_sottotitolo' and li['subtitle'] is None:
+            li['subtitle'] = []
+            self._capture = ('subtitle', li['subtitle'])
+
+    def handle_endtag(self, tag):
+        self._before = ''
+        self._em = False
+        li = self._li
+        if li is None:
+            return
+        if self._capture:
+            field, parts = self._capture
+            if tag == ('span' if field == 'subtitle' else 'a'):
+                self._capture = None
+            else:
+                parts.append(' ')
+        if tag in ('li', 'ul', 'ol'):
+            self._finish()
+
+    def _finish(self):
+        li, self._li, self._capture = self._li, None, None
+        if li and li['work'] and li['author'] and any('autori/autori-' in href for href in li['hrefs']):
+            self.entries.append({
+                'work_url': li['work'][0],
+                'work_title': _text(li['work'][1]),
+                'author_url': li['author'][0],
+                'author_name': _text(li['author'][1]),
+                'subtitle': _text(li['subtitle'] or []),
+            })
+
+    def handle_data(self, data):
+        if self._li is None:
+            return
+        if self._capture:
+            self._capture[1].append(data)
+        self._before += data
+        if data.strip():
+            self._em = False
+
+    def close(self):
+        super().close()
+        self._finish()  # an item still open at the end of the document
+
+    def pop(self):
+        entries, self.entries = self.entries, []
+        return entries
+
+class WorkParser(HTMLParser):
+    """Work page fields: og:image, the text of div.post-content up to the
+    download section, narrators (<li>Name (ruolo: Voce)</li>), the date after
+    "data pubblicazione:" and every link to an .mp3 with its text."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.cover_image = ""
+        self.synopsis = None   # text parts once div.post-content is found
+        self.narrators = []
+        self.links = []        # (href, text parts)
+        self.pub_year = "Unknown"
+        self._post_depth = 0   # nesting depth inside div.post-content while reading it
+        self._li = None        # text parts of a <li> without child elements so far
+        self._link = None      # text parts of the .mp3 link being read
+        self._tail = ''        # last characters of text, to spot PUB_LABEL across pieces
+        self._after_label = None  # text read since PUB_LABEL, until a date turns up
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        self._boundary()
+        if tag == 'meta':
+            if not self.cover_image and attrs.get('property') == 'og:image' and attrs.get('content'):
+                self.cover_image = attrs['content'].strip()
+        elif tag == 'div':
+            if self._post_depth:
+                self._post_depth += 1
+            elif self.synopsis is None and attrs.get('class') == 'post-content':
+                self.synopsis = []
+                self._post_depth = 1
+        if self._post_depth and 'll_metadati_etichetta' in (attrs.get('class') or '').split():
+            self._post_depth = 0  # metadata labels: the synopsis is over
+        if tag == 'li':
+            self._li = []
+        elif self._li is not None:
+            self._li = None  # has child elements: not a plain "Name (ruolo: Voce)" item
+        if tag == 'a':
+            href = (attrs.get('href') or '').strip()
+            if href.lower().endswith('.mp3'):
+                self._link = []
+                self.links.append((href, self._link))
+
+    def handle_endtag(self, tag):
+        self._boundary()
+        if tag == 'div' and self._post_depth:
+            self._post_depth -= 1
+        elif tag == 'a':
+            self._link = None
+        elif tag == 'li' and self._li is not None:
+            match = NARRATOR_RE.match(''.join(self._li))
+            if match:
+                name = clean_person_name(' '.join(match.group(1).split()))
+                if name and name not in self.narrators:
+                    self.narrators.append(name)
+            self._li = None
+
+    def _boundary(self):
+        # A tag separates words, as clean_html() replacing markup with spaces did
+        if self._post_depth:
+            self.synopsis.append(' ')
+        if self._link is not None:
+            self._link.append(' ')
+        if self._after_label is not None:
+            self._after_label += ' '
+
+    def handle_data(self, data):
+        if self._post_depth:
+            self._add_synopsis(data)
+        if self._li is not None:
+            self._li.append(data)
+        if self._link is not None:
+            self._link.append(data)
+        if self.pub_year == "Unknown":
+            self._find_date(data)
+
+    def _add_synopsis(self, data):
+        self.synopsis.append(data)
+        # Keyword check on the recent text only: a keyword may straddle two pieces
+        recent = ''.join(self.synopsis[-3:])
+        for kw in SYNOPSIS_STOP:
+            pos = recent.find(kw)
+            if pos >= 0:
+                text = ''.join(self.synopsis)
+                self.synopsis = [text[:text.find(kw)]]
+                self._post_depth = 0
+                return
+
+    def _find_date(self, data):
+        if self._after_label is None:
+            self._tail = (self._tail + data)[-200:]
+            pos = self._tail.lower().find(PUB_LABEL)
+            if pos < 0:
+                return
+            self._after_label = self._tail[pos + len(PUB_LABEL):]
+        else:
+            self._after_label += data
+        match = PUB_DATE_RE.search(self._after_label)
+        if match:
+            self.pub_year = match.group(3)
+            self._after_label = None
+        elif len(self._after_label) > 2000:
+            self._after_label = None  # label without a date
+
+def iter_index(chunks):
+    """Yield index entries (work_url, work_title, author_url, author_name,
+    subtitle) from the page's text pieces, as soon as each one is complete"""
+    parser = IndexParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from parser.pop()
+    parser.close()
+    yield from parser.pop()
+
+def parse_index(index_html, audiobooks):
+    """Candidates listed on the index page that are not in the catalogue yet"""
     candidates = []
-    for li in li_blocks:
-        if "autori/autori-" not in li:
+    for entry in iter_index(_chunks(index_html)):
+        # Parse slug
+        parsed_url = urlparse(entry['work_url'])
+        slug = parsed_url.path.strip('/').split('/')[-1]
+        if not slug:
             continue
             
-        work_match = re.search(r'<em>\s*<a\s+[^>]*href="([^"]+)"[^>]*>(.*?)</a>\s*</em>', li, re.DOTALL | re.IGNORECASE)
-        author_match = re.search(r'di\s*<a\s+[^>]*href="([^"]+)"[^>]*>(.*?)</a>', li, re.DOTALL | re.IGNORECASE)
+        key = f"liberliber_{slug}"
         
-        if work_match and author_match:
-            work_url = work_match.group(1).strip()
-            work_title = clean_html(work_match.group(2))
-            author_url = author_match.group(1).strip()
-            author_name = clean_html(author_match.group(2))
+        # De-duplicate
+        if key in audiobooks:
+            continue
             
-            subtitle = ""
-            sub_match = re.search(r'<span\s+class="ll_libro_sottotitolo"\s*>(.*?)</span>', li, re.DOTALL | re.IGNORECASE)
-            if sub_match:
-                subtitle = clean_html(sub_match.group(1))
-                
-            # Parse slug
-            parsed_url = urlparse(work_url)
-            slug = parsed_url.path.strip('/').split('/')[-1]
-            if not slug:
-                continue
-                
-            key = f"liberliber_{slug}"
+        candidates.append({'key': key, 'slug': slug, **entry})
+    return candidates
+
+def parse_work(work_html):
+    """Cover, synopsis, narrators, publication year and MP3 chapters (durations
+    still 0.0) of a work page; None if it has no MP3 tracks"""
+    parser = WorkParser()
+    for chunk in _chunks(work_html):
+        parser.feed(chunk)
+    parser.close()
+    
+    raw_chapters = []
+    seen = set()
+    for m_url, m_title in parser.links:
+        ch_url = m_url
+        # If relative URL, make it absolute (though Liber Liber usually has absolute links)
+        if ch_url.startswith('/'):
+            ch_url = "https://www.liberliber.it" + ch_url
+        elif not ch_url.startswith('http'):
+            ch_url = "https://www.liberliber.it/" + ch_url
             
-            # De-duplicate
-            if key in audiobooks:
-                continue
-                
-            candidates.append({
-                'key': key,
-                'slug': slug,
-                'work_url': work_url,
-                'work_title': work_title,
-                'author_url': author_url,
-                'author_name': author_name,
-                'subtitle': subtitle
+        # Avoid duplicate URLs
+        if ch_url not in seen:
+            seen.add(ch_url)
+            raw_chapters.append({
+                'title': _text(m_title),
+                'audio_url': ch_url
             })
             
-    print(f"Found {len(candidates)} new candidates to ingest (already skipped duplicates).")
+    if not raw_chapters:
+        return None
+        
+    # Clean chapter titles
+    cleaned_chapters = []
+    for ch in raw_chapters:
+        t = ch['title']
+        # Clean label
+        t = re.sub(r'(?i)Copertina|Incipit', 'Copertina', t)
+        t = re.sub(r'\s*\[.*?\]|\(.*?\)', '', t)
+        t = re.sub(r'\s+', ' ', t).strip()
+        if not t:
+            # Fallback to filename
+            filename = ch['audio_url'].split('/')[-1].replace('.mp3', '').replace('_', ' ')
+            t = filename.title()
+        cleaned_chapters.append({
+            'title': t,
+            'audio_url': ch['audio_url'],
+            'duration': 0.0
+        })
+        
+    return {
+        'cover_image': parser.cover_image,
+        'synopsis': _text(parser.synopsis or []),
+        'narrator': ", ".join(parser.narrators) if parser.narrators else "Liber Liber lettori",
+        'pub_year': parser.pub_year,
+        'chapters': cleaned_chapters
+    }
+
+def build_entries(c, work):
+    """(source record, enrichment) of a candidate whose chapter durations are known"""
+    cleaned_chapters = work['chapters']
+    synopsis = work['synopsis']
+    total_duration = sum(ch['duration'] for ch in cleaned_chapters)
     
-    if not candidates:
-        print("No new candidates. Done.")
-        return
+    # Genre guessing
+    genre = guess_genre(c['work_title'] + " " + c['subtitle'], synopsis)
+    
+    # Cleanup real title
+    real_title = re.sub(r'\s*\[audiolibro\]', '', c['work_title'], flags=re.IGNORECASE).strip()
+    if c['subtitle']:
+        real_title = f"{real_title} - {c['subtitle']}"
         
-    # Process candidates up to limit
+    # Standardize author name
+    real_author = c['author_name']
+    if ',' in real_author:
+        real_author = clean_person_name(real_author)
+        
+    # Create database entries
+    main_entry = {
+        'title': c['work_title'],
+        'channel': 'Liber Liber',
+        'channel_url': c['author_url'],
+        'duration': total_duration,
+        'upload_date': work['pub_year'],
+        'description': synopsis,
+        'transcript': '',
+        'view_count': 0,
+        'like_count': 0,
+        'download_date': datetime.now().isoformat(),
+        'url': c['work_url'],
+        'audio_file': cleaned_chapters[0]['audio_url'] if len(cleaned_chapters) == 1 else '',
+        'processed': True,
+        'summary': synopsis[:200] + '...' if len(synopsis) > 200 else synopsis,
+        'thumbnail': work['cover_image'],
+        'tags': ['Liber Liber', 'Pubblico Dominio', 'Italiano'],
+        'categories': [genre]
+    }
+    
+    enrichment = {
+        'source': 'liberliber',
+        'source_url': c['work_url'],
+        'embed_type': 'audio',
+        'embed_url': c['work_url'],
+        'audio_url': cleaned_chapters[0]['audio_url'],
+        'audio_chapters': cleaned_chapters,
+        'license': 'public_domain',
+        'real_title': real_title,
+        'real_author': real_author,
+        'real_genre': genre,
+        'real_synopsis': synopsis,
+        'content_type': 'audiobook',
+        'real_language': 'it',
+        'real_narrator': work['narrator']
+    }
+    return main_entry, enrichment
+
+def scrape_sequential(candidates, audiobooks, overlay, limit, dry_run, verbose):
+    """One work page at a time, then its chapter durations (4 probes in parallel)"""
     ingested_count = 0
     
     for idx, c in enumerate(candidates):
@@ -164,92 +457,20 @@ def scrape_liberliber(limit=20, dry_run=False, verbose=False):
         
         # Fetch work page
         try:
-            time.sleep(1.0) # Be nice to Liber Liber
-            work_resp = requests.get(c['work_url'], headers=headers, timeout=20)
-            work_resp.raise_for_status()
-            work_html = work_resp.text
+            work_html = fetch_page(c['work_url'])
         except Exception as e:
             print(f"  ❌ Failed to fetch page for {c['work_title']}: {e}")
             continue
             
-        # Extract cover image
-        cover_image = ""
-        cover_match = re.search(r'<meta\s+property="og:image"\s+content="([^"]+)"', work_html, re.IGNORECASE)
-        if cover_match:
-            cover_image = cover_match.group(1).strip()
-            
-        # Extract synopsis
-        synopsis = ""
-        post_match = re.search(r'<div class="post-content">(.*?)</div>\s*<div', work_html, re.DOTALL | re.IGNORECASE)
-        if not post_match:
-            post_match = re.search(r'<div class="post-content">(.*)', work_html, re.DOTALL | re.IGNORECASE)
-            
-        if post_match:
-            post_content = post_match.group(1)
-            # Split off list and tags
-            synopsis_html = post_content
-            for kw in ["Istruzioni", "Formato MP3", "Formato FLAC", "Formato Ogg", "class=\"ll_metadati_etichetta\""]:
-                if kw in synopsis_html:
-                    synopsis_html = synopsis_html.split(kw)[0]
-            synopsis = clean_html(synopsis_html)
-            
-        # Extract narrator(s)
-        narrators = []
-        for match in re.finditer(r'<li>\s*([^<]+?)\s*\(ruolo:\s*Voce\)\s*</li>', work_html, re.IGNORECASE):
-            name = clean_person_name(match.group(1))
-            if name and name not in narrators:
-                narrators.append(name)
-                
-        narrator_str = ", ".join(narrators) if narrators else "Liber Liber lettori"
-        
-        # Extract MP3 download links
-        # Find all <a href="...mp3">TEXT</a>
-        pattern = r'<a\s+[^>]*href="([^"]+?\.mp3)"[^>]*>(.*?)</a>'
-        mp3_matches = re.findall(pattern, work_html, re.DOTALL | re.IGNORECASE)
-        
-        raw_chapters = []
-        for m_url, m_title in mp3_matches:
-            ch_url = m_url.strip()
-            # If relative URL, make it absolute (though Liber Liber usually has absolute links)
-            if ch_url.startswith('/'):
-                ch_url = "https://www.liberliber.it" + ch_url
-            elif not ch_url.startswith('http'):
-                ch_url = "https://www.liberliber.it/" + ch_url
-                
-            ch_title = clean_html(m_title)
-            # Avoid duplicate URLs
-            if not any(ch['audio_url'] == ch_url for ch in raw_chapters):
-                raw_chapters.append({
-                    'title': ch_title,
-                    'audio_url': ch_url
-                })
-                
-        if not raw_chapters:
+        work = parse_work(work_html)
+        if not work:
             print(f"  ⚠️  No MP3 tracks found on this page. Skipping.")
             continue
-            
-        # Clean chapter titles
-        cleaned_chapters = []
-        for ch in raw_chapters:
-            t = ch['title']
-            # Clean label
-            t = re.sub(r'(?i)Copertina|Incipit', 'Copertina', t)
-            t = re.sub(r'\s*\[.*?\]|\(.*?\)', '', t)
-            t = re.sub(r'\s+', ' ', t).strip()
-            if not t:
-                # Fallback to filename
-                filename = ch['audio_url'].split('/')[-1].replace('.mp3', '').replace('_', ' ')
-                t = filename.title()
-            cleaned_chapters.append({
-                'title': t,
-                'audio_url': ch['audio_url'],
-                'duration': 0.0
-            })
-            
+        cleaned_chapters = work['chapters']
         print(f"  Found {len(cleaned_chapters)} MP3 chapters.")
         
-        # Parallel query of durations via ffprobe
-        print("  Querying chapter durations using ffprobe...")
+        # Parallel query of durations from the MP3 headers
+        print("  Querying chapter durations from the MP3 headers...")
         with ThreadPoolExecutor(max_workers=4) as executor:
             futures = {executor.submit(get_mp3_duration, ch['audio_url']): idx for idx, ch in enumerate(cleaned_chapters)}
             for fut in futures:
@@ -259,85 +480,136 @@ def scrape_liberliber(limit=20, dry_run=False, verbose=False):
                 if verbose:
                     print(f"    - Chapter {idx+1}: {cleaned_chapters[idx]['title']} ({dur:.1f}s)")
                     
-        total_duration = sum(ch['duration'] for ch in cleaned_chapters)
+        main_entry, enrichment = build_entries(c, work)
+        total_duration = main_entry['duration']
         print(f"  Total Duration: {total_duration/3600:.2f} hours ({total_duration:.1f} seconds)")
         
-        # Genre guessing
-        genre = guess_genre(c['work_title'] + " " + c['subtitle'], synopsis)
-        
-        # Cleanup real title
-        real_title = re.sub(r'\s*\[audiolibro\]', '', c['work_title'], flags=re.IGNORECASE).strip()
-        if c['subtitle']:
-            real_title = f"{real_title} - {c['subtitle']}"
-            
-        # Standardize author name
-        real_author = c['author_name']
-        if ',' in real_author:
-            real_author = clean_person_name(real_author)
-            
-        # Standardize dates
-        upload_date_match = re.search(r'data pubblicazione:.*?(\d{1,2})\s+([a-z]+)\s+(\d{4})', work_html, re.IGNORECASE | re.DOTALL)
-        pub_year = "Unknown"
-        if upload_date_match:
-            pub_year = upload_date_match.group(3)
-            
-        # Create database entries
-        main_entry = {
-            'title': c['work_title'],
-            'channel': 'Liber Liber',
-            'channel_url': c['author_url'],
-            'duration': total_duration,
-            'upload_date': pub_year,
-            'description': synopsis,
-            'transcript': '',
-            'view_count': 0,
-            'like_count': 0,
-            'download_date': datetime.now().isoformat(),
-            'url': c['work_url'],
-            'audio_file': cleaned_chapters[0]['audio_url'] if len(cleaned_chapters) == 1 else '',
-            'processed': True,
-            'summary': synopsis[:200] + '...' if len(synopsis) > 200 else synopsis,
-            'thumbnail': cover_image,
-            'tags': ['Liber Liber', 'Pubblico Dominio', 'Italiano'],
-            'categories': [genre]
-        }
-        
-        augmented_entry = {
-            **main_entry,
-            'source': 'liberliber',
-            'source_url': c['work_url'],
-            'embed_type': 'audio',
-            'embed_url': c['work_url'],
-            'audio_url': cleaned_chapters[0]['audio_url'],
-            'audio_chapters': cleaned_chapters,
-            'license': 'public_domain',
-            'real_title': real_title,
-            'real_author': real_author,
-            'real_genre': genre,
-            'real_synopsis': synopsis,
-            'content_type': 'audiobook',
-            'real_language': 'it',
-            'real_narrator': narrator_str
-        }
-        
         if not dry_run:
-            audiobooks[c['key']] = main_entry
-            augmented[c['key']] = augmented_entry
+            catalog.upsert(audiobooks, overlay, c['key'], main_entry, enrichment)
             
             # Save progress periodically
-            with open(audiobooks_path, 'w', encoding='utf-8') as f:
-                json.dump(audiobooks, f, ensure_ascii=False, indent=2)
-            with open(augmented_path, 'w', encoding='utf-8') as f:
-                json.dump(augmented, f, ensure_ascii=False, indent=2)
+            catalog.save_layers(audiobooks, overlay)
                 
         ingested_count += 1
-        print(f"  ✅ Ingested successfully: {real_title} by {real_author}")
+        print(f"  ✅ Ingested successfully: {enrichment['real_title']} by {enrichment['real_author']}")
+    return ingested_count
+
+def scrape_pipelined(candidates, audiobooks, overlay, limit, dry_run, verbose, fetchers=4, probers=8):
+    """Work pages and chapter probes as overlapping stages.
+
+    `fetchers` threads fetch and parse work pages; each one hands its chapter
+    URLs to a shared pool of `probers` threads and moves straight on to the
+    next page, so the durations of one book are probed while the following
+    pages download. All requests go through one keep-alive session (no TCP
+    and TLS handshake per request) and the host's token bucket in
+    ratelimit.py, which caps the request rate whatever the thread counts.
+    The main thread collects the books in index order, at most 2 * fetchers
+    pages ahead, and writes the catalogue every SAVE_EVERY books.
+    """
+    session = make_session(fetchers + probers)
+    ingested_count = failed_count = 0
+    unsaved = 0
+    started = time.monotonic()
+    
+    def fetch(c):
+        # Runs in a fetcher thread: page, parse, queue the probes, return
+        work = parse_work(fetch_page(c['work_url'], session))
+        if work:
+            work['probes'] = [probe_pool.submit(get_mp3_duration, ch['audio_url'], session) for ch in work['chapters']]
+        return work
+    
+    with ThreadPoolExecutor(max_workers=probers) as probe_pool, ThreadPoolExecutor(max_workers=fetchers) as page_pool:
+        pending = iter(candidates)
+        window = deque()
+        while True:
+            # Keep the fetchers busy, without running far past the limit
+            while len(window) < 2 * fetchers and ingested_count + len(window) < limit:
+                c = next(pending, None)
+                if c is None:
+                    break
+                window.append((c, page_pool.submit(fetch, c)))
+            if not window:
+                break
+            c, future = window.popleft()
+            try:
+                work = future.result()
+            except Exception as e:
+                failed_count += 1
+                print(f"  ❌ Failed to fetch page for {c['work_title']}: {e}")
+                continue
+            if not work:
+                print(f"  ⚠️  No MP3 tracks on {c['work_url']}. Skipping.")
+                continue
+            for idx, (ch, probe) in enumerate(zip(work['chapters'], work.pop('probes'))):
+                ch['duration'] = probe.result()
+                if verbose:
+                    print(f"    - {c['slug']} chapter {idx+1}: {ch['title']} ({ch['duration']:.1f}s)")
+                    
+            main_entry, enrichment = build_entries(c, work)
+            if not dry_run:
+                catalog.upsert(audiobooks, overlay, c['key'], main_entry, enrichment)
+                unsaved += 1
+                if unsaved >= SAVE_EVERY:
+                    catalog.save_layers(audiobooks, overlay)
+                    unsaved = 0
+            ingested_count += 1
+            elapsed = time.monotonic() - started
+            print(f"  ✅ [{ingested_count}/{min(limit, len(candidates))}] {enrichment['real_title']} by {enrichment['real_author']}: "
+                  f"{len(work['chapters'])} chapters, {main_entry['duration']/3600:.2f} h "
+                  f"({ingested_count / elapsed:.2f} books/s)")
+            
+    if unsaved:
+        catalog.save_layers(audiobooks, overlay)
+    if ingested_count >= limit:
+        print(f"Reached ingestion limit of {limit} books.")
+    if failed_count:
+        print(f"  {failed_count} work pages could not be fetched.")
+    return ingested_count
+
+def scrape_liberliber(limit=20, dry_run=False, verbose=False, pipeline=False, fetchers=4, probers=8):
+    print("=" * 60)
+    print("📚 Liber Liber Audiobook Ingestor & Scraper")
+    print("=" * 60)
+    
+    # Load database: source records + enrichment overlay (see catalog.py)
+    audiobooks, overlay = catalog.load_layers()
+            
+    print(f"Loaded {len(audiobooks)} existing books from database.")
+    if http_cache.OFFLINE and not dry_run:
+        # Offline the chapters are not probed: saving would store durations of 0
+        # under keys that parse_index then skips for good
+        print("ℹ️  Offline replay: nothing is saved (same as --dry-run).")
+        dry_run = True
+    
+    # Fetch index list
+    print(f"Fetching index page: {INDEX_URL}...")
+    try:
+        index_html = fetch_page(INDEX_URL)
+    except Exception as e:
+        print(f"❌ Failed to fetch index page: {e}")
+        return
+        
+    candidates = parse_index(index_html, audiobooks)
+    print(f"Found {len(candidates)} new candidates to ingest (already skipped duplicates).")
+    
+    if not candidates:
+        print("No new candidates. Done.")
+        return
+        
+    # Process candidates up to limit
+    if pipeline:
+        print(f"Pipelined: {fetchers} page fetchers, {probers} duration probes, one keep-alive session.")
+        ingested_count = scrape_pipelined(candidates, audiobooks, overlay, limit, dry_run, verbose, fetchers, probers)
+    else:
+        ingested_count = scrape_sequential(candidates, audiobooks, overlay, limit, dry_run, verbose)
         
     print("\n" + "=" * 60)
     if dry_run:
         print(f"DRY-RUN COMPLETE. Evaluated and parsed {ingested_count} new books.")
     else:
         print(f"INGESTION COMPLETE. Added {ingested_count} new books to JSON databases.")
+    ratelimit.print_stats()
+    http_cache.print_stats()
     print("=" * 60)
 
 if __name__ == '__main__':
@@ -345,10 +617,32 @@ if __name__ == '__main__':
     parser.add_argument('--limit', type=int, default=20, help='Maximum new books to ingest')
     parser.add_argument('--dry-run', action='store_true', help='Parse and print details without saving to DB')
     parser.add_argument('--verbose', action='store_true', help='Print detailed chapter information')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='Fetch work pages and probe chapter durations as overlapping stages over one keep-alive session')
+    parser.add_argument('--fetchers', type=int, default=4, help='--pipeline: concurrent work page fetches (default 4)')
+    parser.add_argument('--probers', type=int, default=8, help='--pipeline: concurrent MP3 duration probes (default 8)')
+    parser.add_argument('--rate-limit', type=float, default=None,
+                        help='Seconds between requests to liberliber.it (default: the budget in ratelimit.py)')
+    parser.add_argument('--burst', type=int, default=None, help='Requests allowed back to back after an idle spell')
+    parser.add_argument('--offline', action='store_true',
+                        help='Replay the index and work pages from the HTTP cache (http_cache.py): no requests, no chapter durations, nothing saved (implies --dry-run)')
     args = parser.parse_args()
     
+    if args.offline:
+        http_cache.configure(offline=True)
+    
+    if args.rate_limit is not None or args.burst is not None:
+        current = ratelimit.limiter.bucket('liberliber.it')
+        interval, burst = (current.interval, current.burst) if current else (1.0, 2)
+        ratelimit.configure('liberliber.it',
+                            interval=args.rate_limit if args.rate_limit is not None else interval,
+                            burst=args.burst if args.burst is not None else burst)
+    
     scrape_liberliber(
         limit=args.limit,
         dry_run=args.dry_run,
-        verbose=args.verbose
+        verbose=args.verbose,
+        pipeline=args.pipeline,
+        fetchers=max(1, args.fetchers),
+        probers=max(1, args.probers)
     )
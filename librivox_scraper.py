@@ -1,12 +1,18 @@
 #!/usr/bin/env python3
-import json
 import re
-import os
 import time
 import requests
+import requests.adapters
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse
 from datetime import datetime
 
+import catalog
+import channel_cursor
+import http_cache
+import ratelimit
+
 def clean_html(text):
     if not text:
         return ""
@@ -44,70 +50,193 @@ def guess_genre(title, description):
         return 'fiaba'
     return 'romanzo' # Default fallback
 
-def scrape_librivox(max_new_books=100):
-    print("🚀 Starting LibriVox Italian Audiobooks Ingestion...")
-    
-    # Paths to the active database files
-    audiobooks_path = 'audiobooks.json'
-    augmented_path = 'augmented.json'
-    
-    if os.path.exists(audiobooks_path):
-        with open(audiobooks_path, 'r', encoding='utf-8') as f:
-            audiobooks = json.load(f)
-    else:
-        audiobooks = {}
-        
-    if os.path.exists(augmented_path):
-        with open(augmented_path, 'r', encoding='utf-8') as f:
-            augmented = json.load(f)
-    else:
-        augmented = {}
-        
-    # 1. Fetch all Italian books from LibriVox using pagination
-    print("Step 1: Fetching all Italian audiobooks from LibriVox catalog API...")
+FEED_URL = "https://librivox.org/api/feed/audiobooks/"
+PAGE_SIZE = 1000
+# --incremental asks only for books catalogued since the last complete sync,
+# minus this overlap (cataloguing dates are not exact; the catalogue dedupes)
+SINCE_OVERLAP = 2 * 86400
+
+def fetch_italian_books(since=None, session=None):
+    """Page through the LibriVox feed (only books catalogued after the UNIX
+    time `since`, if given) and keep the Italian ones.
+
+    Returns (books, complete): `complete` is False when paging stopped on an
+    error, in which case the sync cursor must not move."""
     offset = 0
-    limit = 1000
     italian_books = []
     
     while True:
-        url = f"https://librivox.org/api/feed/audiobooks/?format=json&limit={limit}&offset={offset}"
+        url = f"{FEED_URL}?format=json&limit={PAGE_SIZE}&offset={offset}" + (f"&since={int(since)}" if since else "")
         print(f"  Fetching batch at offset {offset}...")
         try:
-            r = requests.get(url, timeout=30)
+            r = http_cache.get(url, session=session, timeout=30)  # 304 for unchanged pages; rate limited (ratelimit.py)
             if r.status_code == 404:
+                # The API answers 404 past the last page (and when nothing is newer than `since`)
                 print("  Reached catalog end (404).")
                 break
             r.raise_for_status()
             data = r.json()
         except Exception as e:
             print(f"  ❌ Error fetching offset {offset}: {e}")
-            break
+            return italian_books, False
             
-        books = data.get('books', [])
+        books = data.get('books', []) if isinstance(data, dict) else []
         if not books:
-            if isinstance(data, dict) and 'books' in data:
-                books = data['books']
-            else:
-                print("  No books in response. Ending pagination.")
-                break
-                
-        if len(books) == 0:
-            print("  Empty batch. Ending pagination.")
+            print("  No books in response. Ending pagination.")
             break
             
         page_italian = [b for b in books if b.get('language') == 'Italian']
         print(f"    Found {len(page_italian)} Italian books in this batch.")
         italian_books.extend(page_italian)
         
-        offset += limit
-        time.sleep(1) # Be nice to the LibriVox API
+        if len(books) < PAGE_SIZE:
+            break  # a short page is the last one
+        offset += PAGE_SIZE
         
-    print(f"Total Italian audiobooks found in LibriVox catalog: {len(italian_books)}")
+    return italian_books, True
+
+def fetch_archive_metadata(archive_id, session=None):
+    """archive.org item metadata (the file list with lengths), under the archive.org budget"""
+    meta_resp = http_cache.get(f"https://archive.org/metadata/{archive_id}", session=session, timeout=20)
+    meta_resp.raise_for_status()
+    return meta_resp.json()
+
+def build_entries(book, archive_id, meta_data):
+    """(source record, enrichment) of a LibriVox book from its archive.org
+    metadata, or None if the item has no MP3 files"""
+    title = book.get('title')
+    files = meta_data.get('files', [])
+    chapters = []
     
-    # 2. Ingest books
-    new_added = 0
-    skipped_existing = 0
+    for f in files:
+        name = f.get('name', '')
+        if name.endswith('.mp3'):
+            length_str = f.get('length', f.get('duration', '0'))
+            try:
+                if ':' in str(length_str):
+                    parts = list(map(float, str(length_str).split(':')))
+                    dur = 0.0
+                    for part in parts:
+                        dur = dur * 60 + part
+                else:
+                    dur = float(length_str)
+            except ValueError:
+                dur = 0.0
+                
+            chapter_title = f.get('title', name.replace('.mp3', '').replace('_', ' '))
+            audio_url = f"https://archive.org/download/{archive_id}/{name}"
+            
+            chapters.append({
+                'title': clean_html(chapter_title),
+                'audio_url': audio_url,
+                'duration': dur
+            })
+            
+    if not chapters:
+        return None
+        
+    # Filter duplicates (e.g. 64kb vs 128kb versions)
+    unique_chapters = {}
+    for ch in chapters:
+        url_path = ch['audio_url'].split('/')[-1]
+        # Standardize base name
+        base = re.sub(r'_(64kb|128kb|vbr)\.mp3$', '', url_path.lower())
+        base = base.replace('.mp3', '')
+        
+        # Prefer 64kb version for smaller transfer size and faster loading
+        if base not in unique_chapters:
+            unique_chapters[base] = ch
+        else:
+            if '64kb' in ch['audio_url']:
+                unique_chapters[base] = ch
+                
+    # Sort chapters by filename/URL so they play in reading order
+    sorted_chapters = sorted(unique_chapters.values(), key=lambda x: x['audio_url'])
+    total_duration = sum(ch['duration'] for ch in sorted_chapters)
+    
+    # Parse author name
+    authors_list = book.get('authors', [])
+    author_name = "Autore Sconosciuto"
+    if authors_list:
+        if isinstance(authors_list, list):
+            author_name = ", ".join([f"{a.get('first_name', '')} {a.get('last_name', '')}".strip() for a in authors_list])
+        elif isinstance(authors_list, dict):
+            author_name = f"{authors_list.get('first_name', '')} {authors_list.get('last_name', '')}".strip()
+            
+    raw_description = clean_html(book.get('description', ''))
+    genre = guess_genre(title, raw_description)
+    
+    # Build entries
+    record = {
+        'title': title,
+        'channel': 'LibriVox',
+        'channel_url': 'https://librivox.org',
+        'duration': total_duration,
+        'upload_date': book.get('release_date', '').replace('-', '') or 'Unknown',
+        'description': raw_description,
+        'transcript': '',
+        'view_count': 0,
+        'like_count': 0,
+        'download_date': datetime.now().isoformat(),
+        'url': book.get('url_librivox', ''),
+        'audio_file': sorted_chapters[0]['audio_url'] if len(sorted_chapters) == 1 else '',
+        'processed': True,
+        'summary': raw_description[:200] + '...' if len(raw_description) > 200 else raw_description,
+        'thumbnail': '',
+        'tags': ['LibriVox', 'Pubblico Dominio', 'Italiano'],
+        'categories': [genre]
+    }
+    
+    enrichment = {
+        'source': 'librivox',
+        'source_url': book.get('url_librivox', ''),
+        'embed_type': 'audio',
+        'embed_url': f"https://archive.org/embed/{archive_id}",
+        'audio_url': sorted_chapters[0]['audio_url'],
+        'audio_chapters': sorted_chapters,
+        'license': 'public_domain',
+        'real_title': title,
+        'real_author': author_name,
+        'real_genre': genre,
+        'real_synopsis': raw_description,
+        'content_type': 'audiobook',
+        'real_language': 'it',
+        'real_narrator': 'LibriVox lettori'
+    }
+    return record, enrichment
+
+def scrape_librivox(max_new_books=100, incremental=False, workers=4):
+    """Ingest new Italian LibriVox books.
+
+    With `incremental` only the feed pages of books catalogued since the
+    previous complete sync are requested (the cursor is kept under FEED_URL in
+    channel_state.json, see channel_cursor.py); without a cursor that is a
+    full sync. The archive.org metadata of the new books is fetched by
+    `workers` threads over one keep-alive session; the archive.org token
+    bucket in ratelimit.py still paces the requests.
+    """
+    print("🚀 Starting LibriVox Italian Audiobooks Ingestion...")
     
+    # Source records + enrichment overlay (see catalog.py)
+    audiobooks, overlay = catalog.load_layers()
+    state = channel_cursor.load_state()
+    cursor = state.get(FEED_URL) or {}
+    since = cursor.get('since') if incremental else None
+    sync_started = time.time()
+    session = requests.Session()
+    session.mount('https://', requests.adapters.HTTPAdapter(pool_maxsize=workers + 1))
+    
+    # 1. Fetch the Italian books from the LibriVox catalog API
+    if since:
+        print(f"Step 1: Fetching LibriVox books catalogued since {datetime.fromtimestamp(since).isoformat(timespec='minutes')} (incremental)...")
+    else:
+        print("Step 1: Fetching all Italian audiobooks from LibriVox catalog API...")
+    italian_books, complete = fetch_italian_books(since, session)
+    print(f"Italian audiobooks found in LibriVox catalog: {len(italian_books)}")
+    
+    # 2. Keep the books not in the database yet that point to an archive.org item
+    todo = []
+    skipped_existing = 0
     for book in italian_books:
         librivox_id = book.get('id')
         title = book.get('title')
@@ -127,146 +256,80 @@ def scrape_librivox(max_new_books=100):
             else:
                 print(f"⚠️  Could not extract Archive identifier for: {title}")
                 continue
-                
-        print(f"🔍 [{new_added+1}/{max_new_books}] Querying Archive.org metadata for: {title} (ID: {archive_id})...")
+        todo.append((key, book, archive_id))
         
-        archive_meta_url = f"https://archive.org/metadata/{archive_id}"
-        try:
-            meta_resp = requests.get(archive_meta_url, timeout=20)
-            meta_resp.raise_for_status()
-            meta_data = meta_resp.json()
-        except Exception as e:
-            print(f"  ❌ Failed to fetch Archive metadata for {archive_id}: {e}")
-            continue
-            
-        files = meta_data.get('files', [])
-        chapters = []
-        
-        for f in files:
-            name = f.get('name', '')
-            if name.endswith('.mp3'):
-                length_str = f.get('length', f.get('duration', '0'))
-                try:
-                    if ':' in str(length_str):
-                        parts = list(map(float, str(length_str).split(':')))
-                        dur = 0.0
-                        for part in parts:
-                            dur = dur * 60 + part
-                    else:
-                        dur = float(length_str)
-                except ValueError:
-                    dur = 0.0
-                    
-                chapter_title = f.get('title', name.replace('.mp3', '').replace('_', ' '))
-                audio_url = f"https://archive.org/download/{archive_id}/{name}"
-                
-                chapters.append({
-                    'title': clean_html(chapter_title),
-                    'audio_url': audio_url,
-                    'duration': dur
-                })
-                
-        if not chapters:
-            print(f"  ⚠️  No MP3 files found for Archive item {archive_id}")
-            continue
-            
-        # Filter duplicates (e.g. 64kb vs 128kb versions)
-        unique_chapters = {}
-        for ch in chapters:
-            url_path = ch['audio_url'].split('/')[-1]
-            # Standardize base name
-            base = re.sub(r'_(64kb|128kb|vbr)\.mp3$', '', url_path.lower())
-            base = base.replace('.mp3', '')
+    # 3. Archive.org metadata, `workers` lookups at a time, collected in order
+    new_added = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = iter(todo)
+        window = deque()
+        while True:
+            while len(window) < 2 * workers and new_added + len(window) < max_new_books:
+                item = next(pending, None)
+                if item is None:
+                    break
+                window.append((item, executor.submit(fetch_archive_metadata, item[2], session)))
+            if not window:
+                break
+            (key, book, archive_id), future = window.popleft()
+            try:
+                meta_data = future.result()
+            except Exception as e:
+                print(f"  ❌ Failed to fetch Archive metadata for {archive_id}: {e}")
+                complete = False  # retried by the next sync
+                continue
+            entries = build_entries(book, archive_id, meta_data)
+            if not entries:
+                print(f"  ⚠️  No MP3 files found for Archive item {archive_id}")
+                continue
+            record, enrichment = entries
+            catalog.upsert(audiobooks, overlay, key, record, enrichment)
             
-            # Prefer 64kb version for smaller transfer size and faster loading
-            if base not in unique_chapters:
-                unique_chapters[base] = ch
-            else:
-                if '64kb' in ch['audio_url']:
-                    unique_chapters[base] = ch
-                    
-        # Sort chapters by filename/URL so they play in reading order
-        sorted_chapters = sorted(unique_chapters.values(), key=lambda x: x['audio_url'])
-        total_duration = sum(ch['duration'] for ch in sorted_chapters)
-        
-        # Parse author name
-        authors_list = book.get('authors', [])
-        author_name = "Autore Sconosciuto"
-        if authors_list:
-            if isinstance(authors_list, list):
-                author_name = ", ".join([f"{a.get('first_name', '')} {a.get('last_name', '')}".strip() for a in authors_list])
-            elif isinstance(authors_list, dict):
-                author_name = f"{authors_list.get('first_name', '')} {authors_list.get('last_name', '')}".strip()
-                
-        raw_description = clean_html(book.get('description', ''))
-        genre = guess_genre(title, raw_description)
-        
-        # Build entries
-        audiobooks[key] = {
-            'title': title,
-            'channel': 'LibriVox',
-            'channel_url': 'https://librivox.org',
-            'duration': total_duration,
-            'upload_date': book.get('release_date', '').replace('-', '') or 'Unknown',
-            'description': raw_description,
-            'transcript': '',
-            'view_count': 0,
-            'like_count': 0,
-            'download_date': datetime.now().isoformat(),
-            'url': book.get('url_librivox', ''),
-            'audio_file': sorted_chapters[0]['audio_url'] if len(sorted_chapters) == 1 else '',
-            'processed': True,
-            'summary': raw_description[:200] + '...' if len(raw_description) > 200 else raw_description,
-            'thumbnail': '',
-            'tags': ['LibriVox', 'Pubblico Dominio', 'Italiano'],
-            'categories': [genre]
-        }
-        
-        augmented[key] = {
-            **audiobooks[key],
-            'source': 'librivox',
-            'source_url': book.get('url_librivox', ''),
-            'embed_type': 'audio',
-            'embed_url': f"https://archive.org/embed/{archive_id}",
-            'audio_url': sorted_chapters[0]['audio_url'],
-            'audio_chapters': sorted_chapters,
-            'license': 'public_domain',
-            'real_title': title,
-            'real_author': author_name,
-            'real_genre': genre,
-            'real_synopsis': raw_description,
-            'content_type': 'audiobook',
-            'real_language': 'it',
-            'real_narrator': 'LibriVox lettori'
-        }
-        
-        new_added += 1
-        print(f"  ✅ Added: {title} by {author_name} ({len(sorted_chapters)} chapters, {total_duration/3600:.1f}h)")
-        
-        if new_added >= max_new_books:
-            print(f"Reached ingestion limit of {max_new_books} new books.")
-            break
+            new_added += 1
+            print(f"  ✅ [{new_added}/{max_new_books}] Added: {record['title']} by {enrichment['real_author']} "
+                  f"({len(enrichment['audio_chapters'])} chapters, {record['duration']/3600:.1f}h)")
             
-        time.sleep(0.5) # Be nice to Archive.org API
+    if new_added >= max_new_books and len(todo) > new_added:
+        print(f"Reached ingestion limit of {max_new_books} new books.")
+        complete = False  # the books past the limit are picked up next time
         
     print(f"\nIngestion summary:")
     print(f"  Already in database: {skipped_existing}")
     print(f"  New books added: {new_added}")
+    ratelimit.print_stats(lambda line: print(f"  {line}"))
+    http_cache.print_stats(lambda line: print(f"  {line}"))
     
     # Save files if changes were made
     if new_added > 0:
-        with open(audiobooks_path, 'w', encoding='utf-8') as f:
-            json.dump(audiobooks, f, indent=2, ensure_ascii=False)
-        with open(augmented_path, 'w', encoding='utf-8') as f:
-            json.dump(augmented, f, indent=2, ensure_ascii=False)
+        catalog.save_layers(audiobooks, overlay)
         print("🎉 Database files updated successfully!")
     else:
         print("ℹ️  No database updates needed.")
-
+        
+    # Move the cursor only after a live sync that ingested every book it asked
+    # for (an --offline replay of cached pages says nothing about "now")
+    if complete and not http_cache.OFFLINE:
+        ids = [int(b['id']) for b in italian_books if str(b.get('id', '')).isdigit()]
+        state[FEED_URL] = {
+            'since': int(sync_started - SINCE_OVERLAP),
+            'last_id': max(ids + [cursor.get('last_id') or 0]),
+            'checked': datetime.now().isoformat(timespec='seconds'),
+            'read': len(italian_books),
+        }
+        channel_cursor.save_state(state)
+        
 if __name__ == '__main__':
     import argparse
     parser = argparse.ArgumentParser()
     parser.add_argument('--limit', type=int, default=100, help='Maximum new books to ingest')
+    parser.add_argument('--incremental', action='store_true',
+                        help=f'Only request books catalogued since the last complete sync (cursor in {channel_cursor.STATE_FILE})')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Concurrent archive.org metadata lookups (paced by the archive.org budget in ratelimit.py)')
+    parser.add_argument('--offline', action='store_true',
+                        help='Replay the LibriVox feed and Archive.org metadata from the HTTP cache (http_cache.py), no requests')
     args = parser.parse_args()
     
-    scrape_librivox(args.limit)
+    if args.offline:
+        http_cache.configure(offline=True)
+    scrape_librivox(args.limit, incremental=args.incremental, workers=max(1, args.workers))
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""MP3 duration and stream info from the file headers, without ffprobe.
+
+liberliber_scraper.py spawned one `ffprobe` per chapter URL (up to 15 s each,
+and ffprobe reads far into a remote file to estimate a duration) and
+audiobook_scraper.py one per downloaded file. The duration of an MP3 is in
+its first few kilobytes:
+
+  - an ID3v2 tag (skipped: its size is in its 10-byte header),
+  - the first MPEG audio frame header: version, layer, bitrate, sample rate,
+    channel mode,
+  - in that first frame, a Xing/Info header (LAME and most encoders; "Info"
+    on CBR files) or a VBRI header (Fraunhofer) with the exact frame count,
+  - otherwise duration = audio bytes * 8 / bitrate: exact for CBR; for VBR
+    without a header the bitrate is the mean over the frames read, so the
+    duration is an estimate (method 'estimate', the same guess ffprobe makes).
+
+For a remote file that is one HTTP Range request for the first HEAD_BYTES
+(the total size comes from Content-Range); a second one only when an ID3 tag
+with embedded cover art is larger than that.
+
+    import mp3info
+    info = mp3info.probe_url(url)      # {'duration': 1234.5, 'bitrate': 64000, ...} or None
+    info = mp3info.probe_file(path)
+
+Usage:
+    python3 mp3info.py FILE_OR_URL ...
+"""
+import os
+import struct
+import sys
+import urllib.request
+
+HEAD_BYTES = 16 * 1024
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
+
+# Bitrates in kbps by [MPEG1 / MPEG2+2.5][layer I, II, III][index]
+BITRATES = {
+    (1, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (1, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (1, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (2, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+SAMPLE_RATES = {1: (44100, 48000, 32000), 2: (22050, 24000, 16000), 2.5: (11025, 12000, 8000)}
+VERSIONS = {0b00: 2.5, 0b10: 2, 0b11: 1}
+LAYERS = {0b01: 3, 0b10: 2, 0b11: 1}
+
+
+def id3_size(head):
+    """Bytes taken by a leading ID3v2 tag (0 if there is none)."""
+    if len(head) < 10 or head[:3] != b'ID3':
+        return 0
+    size = (head[6] & 0x7f) << 21 | (head[7] & 0x7f) << 14 | (head[8] & 0x7f) << 7 | (head[9] & 0x7f)
+    footer = 10 if head[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def frame_header(data, pos):
+    """Decode the frame header at `pos`, or None if it is not a valid one."""
+    if pos + 4 > len(data) or data[pos] != 0xff or data[pos + 1] & 0xe0 != 0xe0:
+        return None
+    b1, b2, b3 = data[pos + 1], data[pos + 2], data[pos + 3]
+    version = VERSIONS.get((b1 >> 3) & 0b11)
+    layer = LAYERS.get((b1 >> 1) & 0b11)
+    bitrate_index = b2 >> 4
+    rate_index = (b2 >> 2) & 0b11
+    if version is None or layer is None or bitrate_index in (0, 15) or rate_index == 3:
+        return None  # reserved values, or "free format" which has no fixed frame size
+    bitrate = BITRATES[(1 if version == 1 else 2, layer)][bitrate_index] * 1000
+    sample_rate = SAMPLE_RATES[version][rate_index]
+    padding = (b2 >> 1) & 1
+    if layer == 1:
+        samples = 384
+        length = (12 * bitrate // sample_rate + padding) * 4
+    else:
+        samples = 1152 if layer == 2 or version == 1 else 576
+        length = samples // 8 * bitrate // sample_rate + padding
+    return {'version': version, 'layer': layer, 'bitrate': bitrate, 'sample_rate': sample_rate,
+            'channels': 1 if b3 >> 6 == 0b11 else 2, 'samples': samples, 'length': length}
+
+
+def first_frame(data, start=0):
+    """(offset, header) of the first frame whose successor is also a valid frame
+    header (a lone 0xFFE sync pattern inside tag data is common)."""
+    pos = data.find(b'\xff', start)
+    while 0 <= pos < len(data) - 4:
+        header = frame_header(data, pos)
+        if header:
+            following = pos + header['length']
+            if following + 4 > len(data):
+                return pos, header  # cannot check the next one: trust this one
+            nxt = frame_header(data, following)
+            if nxt and nxt['version'] == header['version'] and nxt['layer'] == header['layer']:
+                return pos, header
+        pos = data.find(b'\xff', pos + 1)
+    return None, None
+
+
+def parse(head, total_size=None, audio_start=0):
+    """Stream info from `head`, the file's bytes starting at `audio_start`
+    (the end of the ID3 tag). `total_size` is the whole file's size, needed
+    only for the CBR estimate. Returns None if no MPEG audio frame is found."""
+    pos, header = first_frame(head)
+    if header is None:
+        return None
+    info = {'codec': 'mp3', 'channels': header['channels'], 'sample_rate': header['sample_rate'],
+            'bitrate': header['bitrate'], 'duration': None, 'method': None}
+    frame = head[pos:pos + header['length']]
+    frames = audio_bytes = None
+
+    # Xing/Info header: after the side information of the first frame
+    if header['version'] == 1:
+        side = 17 if header['channels'] == 1 else 32
+    else:
+        side = 9 if header['channels'] == 1 else 17
+    tag = frame[4 + side:4 + side + 16]
+    if tag[:4] in (b'Xing', b'Info'):
+        flags = struct.unpack('>I', tag[4:8])[0]
+        offset = 8
+        if flags & 0x1:
+            frames = struct.unpack('>I', tag[offset:offset + 4])[0]
+            offset += 4
+        if flags & 0x2:
+            audio_bytes = struct.unpack('>I', tag[offset:offset + 4])[0]
+        info['method'] = 'xing' if tag[:4] == b'Xing' else 'info'
+    # VBRI header: fixed position, 32 bytes after the frame header
+    elif frame[36:40] == b'VBRI':
+        audio_bytes, frames = struct.unpack('>II', frame[46:54])
+        info['method'] = 'vbri'
+
+    if frames:
+        info['duration'] = frames * header['samples'] / header['sample_rate']
+        if audio_bytes and info['duration']:
+            info['bitrate'] = int(audio_bytes * 8 / info['duration'])
+    elif total_size:
+        # No frame count: average the bitrate of the frames at hand. All equal
+        # means CBR and an exact duration (an ID3v1 tag at the end adds 128
+        # bytes at most); otherwise VBR without a header, an estimate.
+        bitrate, constant = average_bitrate(head, pos)
+        info['bitrate'] = bitrate
+        info['duration'] = (total_size - audio_start - pos) * 8 / bitrate
+        info['method'] = 'cbr' if constant else 'estimate'
+    return info
+
+
+def average_bitrate(data, pos):
+    """(mean bitrate of the consecutive frames from `pos`, whether they all match)."""
+    nbytes = seconds = 0
+    rates = set()
+    while True:
+        header = frame_header(data, pos)
+        if not header or pos + header['length'] > len(data):
+            break
+        rates.add(header['bitrate'])
+        nbytes += header['length']
+        seconds += header['samples'] / header['sample_rate']
+        pos += header['length']
+    if not seconds:
+        return frame_header(data, pos)['bitrate'], True
+    if len(rates) == 1:
+        return rates.pop(), True
+    return int(nbytes * 8 / seconds), False
+
+
+def probe_file(path):
+    """parse() for a local file."""
+    with open(path, 'rb') as f:
+        head = f.read(HEAD_BYTES)
+        start = id3_size(head)
+        if start:
+            f.seek(start)
+            head = f.read(HEAD_BYTES)
+        size = os.fstat(f.fileno()).st_size
+        if size >= 128:
+            f.seek(size - 128)
+            if f.read(3) == b'TAG':
+                size -= 128
+    return parse(head, size, start)
+
+
+def _get_range(url, start, length, session=None, timeout=15):
+    """(bytes, total size or None) of url[start:start + length] with one Range request.
+    `session` is an optional requests.Session to reuse its connections."""
+    headers = {'Range': f'bytes={start}-{start + length - 1}', 'User-Agent': USER_AGENT}
+    if session is not None:
+        with session.get(url, headers=headers, timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+            status, content_range = response.status_code, response.headers.get('Content-Range', '')
+            content_length = response.headers.get('Content-Length')
+            body = response.raw.read(length, decode_content=True)
+    else:
+        request = urllib.request.Request(url, headers=headers)
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            status, content_range = response.status, response.headers.get('Content-Range', '')
+            content_length = response.headers.get('Content-Length')
+            # A server ignoring Range sends the whole file: read only what is needed
+            body = response.read(length)
+    if status == 206:
+        total = content_range.rpartition('/')[2]
+        return body, int(total) if total.isdigit() else None
+    if start:
+        raise IOError(f"{url}: server does not support Range requests")
+    return body, int(content_length) if content_length and content_length.isdigit() else None
+
+
+def probe_url(url, session=None, timeout=15):
+    """parse() for a remote file, from one Range request (two with a large ID3 tag)."""
+    head, total = _get_range(url, 0, HEAD_BYTES, session, timeout)
+    start = id3_size(head)
+    if start:
+        if start + 1024 > len(head):
+            head, _ = _get_range(url, start, HEAD_BYTES, session, timeout)
+        else:
+            head = head[start:]
+    return parse(head, total, start)
+
+
+if __name__ == '__main__':
+    for target in sys.argv[1:]:
+        try:
+            info = probe_url(target) if '://' in target else probe_file(target)
+        except Exception as e:
+            print(f"❌ {target}: {e}")
+            continue
+        if not info or info['duration'] is None:
+            print(f"⚠️  {target}: no duration found ({info})")
+            continue
+        print(f"✅ {target}: {info['duration']:.2f}s, {info['bitrate'] // 1000} kb/s, "
+              f"{info['sample_rate']} Hz, {info['channels']} ch ({info['method']})")
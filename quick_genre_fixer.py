@@ -4,43 +4,34 @@ Quick Genre Fixer for Obvious Issues
 """
 
 import json
-import os
-import shutil
 from datetime import datetime
 
+import catalog
+
 def main():
     print("🔧 Quick Genre Fixer")
     print("=" * 50)
     
-    required_files = ['audiobooks.json', 'augmented.json']
-    missing_files = [f for f in required_files if not os.path.exists(f)]
-    
-    if missing_files:
-        print(f"❌ Error: Required files missing: {', '.join(missing_files)}")
-        print("Please ensure 'audiobooks.json' and 'augmented.json' exist in the current directory.")
+    if not catalog.exists(catalog.SOURCE_FILE) or not catalog.view_sources():
+        print("❌ Error: Catalogue files missing")
+        print(f"Please ensure '{catalog.SOURCE_FILE}' and '{catalog.OVERLAY_FILE}' (or a legacy '{catalog.VIEW_FILE}') exist in the current directory.")
         return
     
     # Create backups first
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
     try:
-        shutil.copy('audiobooks.json', f'audiobooks.json.backup_{timestamp}')
-        shutil.copy('augmented.json', f'augmented.json.backup_{timestamp}')
-        print(f"✅ Created backups with timestamp {timestamp}")
+        backup_file = catalog.backup(f'backup_{timestamp}')
+        print(f"✅ Created backup: {backup_file}")
     except Exception as e:
         print(f"❌ Failed to create backups: {e}")
         return
     
     # Load data
     try:
-        with open('audiobooks.json', 'r', encoding='utf-8') as f:
-            audiobooks = json.load(f)
-        
-        with open('augmented.json', 'r', encoding='utf-8') as f:
-            augmented = json.load(f)
+        augmented = catalog.load_view()
             
-        print(f"✅ Loaded {len(audiobooks)} books from audiobooks.json")
-        print(f"✅ Loaded {len(augmented)} books from augmented.json")
+        print(f"✅ Loaded {len(augmented)} books from the catalogue")
     except json.JSONDecodeError as e:
         print(f"❌ Failed to parse JSON data: {e}")
         return
@@ -95,11 +86,10 @@ def main():
     if total_changes > 0:
         # Save the changes
         try:
-            with open('augmented.json', 'w', encoding='utf-8') as f:
-                json.dump(augmented, f, ensure_ascii=False, indent=2)
+            catalog.save_view(augmented)
             
-            print(f"✅ Saved changes to augmented.json")
-            print(f"📁 Backup available as: augmented.json.backup_{timestamp}")
+            print(f"✅ Saved changes to {catalog.OVERLAY_FILE}")
+            print(f"📁 Backup available as: {backup_file}")
             
             # Show new genre distribution
             print(f"\n📊 Updated genre distribution:")
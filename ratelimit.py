@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Shared, thread-safe rate limiting with per-host budgets.
+
+Each scraper used to pace itself with its own `time.sleep()` or a bare
+`last_request` timestamp. Shared across ThreadPoolExecutor workers, the
+timestamp has no lock: several threads read the same value and fire together
+(a burst the host never agreed to), and others sleep for a slot that already
+passed. Here every host gets one token bucket, refilled at one token per
+`interval` seconds and holding at most `burst` tokens, behind a lock, so
+every worker, module and call site talking to the same host shares one
+budget.
+
+    import ratelimit
+    ratelimit.wait(url)                         # blocks until `url`'s host has a token
+    ratelimit.configure(CONFIG['api_url'], interval=1.0, burst=1)
+    ratelimit.print_stats()                     # requests, total and max wait per host
+
+Hosts match by domain suffix (www.youtube.com uses the youtube.com budget);
+hosts without a budget are not limited. Budgets can be overridden without
+code changes: RATE_LIMITS="youtube.com=0.5:5,archive.org=0.25" (interval in
+seconds, optional burst).
+"""
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+# host: (seconds per request, burst)
+DEFAULT_BUDGETS = {
+    'youtube.com': (1.0, 3),
+    'archive.org': (0.5, 4),
+    'librivox.org': (1.0, 2),
+    'liberliber.it': (1.0, 2),
+}
+# The LLM endpoint (augment.py, synopsis_reprocessor.py) is configured by its
+# caller from CONFIG['api_url'] and --rate-limit.
+
+ALIASES = {'youtu.be': 'youtube.com'}
+
+
+class TokenBucket:
+    """`burst` tokens, one more every `interval` seconds (interval <= 0: unlimited)."""
+
+    def __init__(self, interval, burst=1):
+        self._lock = threading.Lock()
+        self.interval = interval
+        self.burst = max(1, int(burst))
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.requests = 0
+        self.waited = 0.0
+        self.max_wait = 0.0
+
+    def acquire(self):
+        """Take a token, sleeping until one is available; returns the seconds waited."""
+        with self._lock:
+            self.requests += 1
+            if self.interval <= 0:
+                return 0.0
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) / self.interval)
+            self.updated = now
+            # Reserve the token now (possibly going negative) and sleep outside
+            # the lock, so waiting threads queue up at one `interval` apart.
+            self.tokens -= 1
+            delay = -self.tokens * self.interval if self.tokens < 0 else 0.0
+            self.waited += delay
+            self.max_wait = max(self.max_wait, delay)
+        if delay:
+            time.sleep(delay)
+        return delay
+
+    def stats(self):
+        with self._lock:
+            return {'interval': self.interval, 'burst': self.burst, 'requests': self.requests,
+                    'waited': self.waited, 'max_wait': self.max_wait,
+                    'mean_wait': self.waited / self.requests if self.requests else 0.0}
+
+
+def host_of(url_or_host):
+    """'https://www.YouTube.com:443/watch?v=x' -> 'www.youtube.com'."""
+    if '://' in url_or_host:
+        return (urlparse(url_or_host).hostname or '').lower()
+    return url_or_host.split('/')[0].split(':')[0].lower()
+
+
+class HostRateLimiter:
+    """One TokenBucket per configured host, looked up by domain suffix."""
+
+    def __init__(self, budgets=None):
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._resolved = {}
+        for host, (interval, burst) in (budgets or {}).items():
+            self.configure(host, interval, burst)
+
+    def configure(self, url_or_host, interval, burst=1):
+        """Set (or replace) the budget of a host; returns its bucket."""
+        host = host_of(url_or_host)
+        with self._lock:
+            bucket = self._buckets[host] = TokenBucket(interval, burst)
+            self._resolved.clear()
+            return bucket
+
+    def bucket(self, url_or_host):
+        """The bucket governing `url_or_host`, or None if the host has no budget."""
+        host = host_of(url_or_host)
+        with self._lock:
+            if host not in self._resolved:
+                parts = ALIASES.get(host, host).split('.')
+                candidates = ('.'.join(parts[i:]) for i in range(len(parts)))
+                self._resolved[host] = next((self._buckets[c] for c in candidates if c in self._buckets), None)
+            return self._resolved[host]
+
+    def wait(self, url_or_host):
+        """Block until a request to this host is allowed; returns the seconds waited."""
+        bucket = self.bucket(url_or_host)
+        return bucket.acquire() if bucket else 0.0
+
+    def stats(self):
+        with self._lock:
+            buckets = dict(self._buckets)
+        return {host: b.stats() for host, b in buckets.items()}
+
+    def print_stats(self, log=print):
+        """One line per host that was actually used."""
+        for host, s in sorted(self.stats().items()):
+            if s['requests']:
+                log(f"rate limit {host}: {s['requests']} requests, waited {s['waited']:.1f}s total "
+                    f"(mean {s['mean_wait']:.2f}s, max {s['max_wait']:.2f}s; "
+                    f"1 per {s['interval']:g}s, burst {s['burst']})")
+
+
+def _budgets_from_env(spec):
+    budgets = dict(DEFAULT_BUDGETS)
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        host, _, value = item.partition('=')
+        interval, _, burst = value.partition(':')
+        budgets[host.strip()] = (float(interval), int(burst or 1))
+    return budgets
+
+
+limiter = HostRateLimiter(_budgets_from_env(os.environ.get('RATE_LIMITS', '')))
+configure = limiter.configure
+wait = limiter.wait
+stats = limiter.stats
+print_stats = limiter.print_stats
+
+
+if __name__ == '__main__':
+    # Show the effective budgets and check the pacing: 8 threads x 5 requests
+    # against one host with a 0.1 s interval and a burst of 3.
+    for host, (interval, burst) in sorted(_budgets_from_env(os.environ.get('RATE_LIMITS', '')).items()):
+        print(f"{host:<16} 1 request per {interval:g}s, burst {burst}")
+    demo = HostRateLimiter({'example.org': (0.1, 3)})
+    start = time.monotonic()
+    threads = [threading.Thread(target=lambda: [demo.wait('https://www.example.org/x') for _ in range(5)])
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - start
+    print(f"\n40 requests in {elapsed:.2f}s (expected ~{(40 - 3) * 0.1:.1f}s)")
+    demo.print_stats()
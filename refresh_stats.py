@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""Refresh view/like counts of existing YouTube records in bulk.
+
+view_count and like_count drive every ranking in generate_pages.py (hub order,
+related titles, "Titoli popolari") but were frozen at ingest time; refreshing
+them meant re-extracting full metadata one video at a time. A flat listing of
+a channel's uploads already carries the view count of every video on it, so
+this job lists each channel that has records in the catalogue once (a few
+paged requests per channel instead of one full extraction per video), falls
+back to full extraction only for the records no listing covered (deleted from
+the channel's uploads, moved, no channel_url), and writes every change to the
+source layer in one batch at the end.
+
+Flat listings do not carry like counts: like_count is refreshed only by the
+full-extraction fallback, or for every record with --full.
+
+Usage:
+    python3 refresh_stats.py                     # refresh, write audiobooks.json
+    python3 refresh_stats.py --dry-run           # report what would change
+    python3 refresh_stats.py --max-full 0        # listings only, no full extractions
+    python3 refresh_stats.py --playlist URL ...  # also read these playlists' listings
+"""
+import argparse
+import concurrent.futures
+import sys
+
+from rich.console import Console
+from rich.panel import Panel
+from rich.table import Table
+
+import catalog
+import ratelimit
+import ydl_pool
+
+console = Console()
+
+FLAT_OPTS = {'quiet': True, 'no_warnings': True, 'skip_download': True, 'extract_flat': True}
+FULL_OPTS = {'quiet': True, 'no_warnings': True, 'skip_download': True, 'socket_timeout': 30}
+STATS = ('view_count', 'like_count')
+
+
+def youtube_id(record):
+    url = record.get('url') or ''
+    if 'youtube.com/watch' in url and 'v=' in url:
+        return url.split('v=')[-1].split('&')[0]
+    if 'youtu.be/' in url:
+        return url.rsplit('/', 1)[-1].split('?')[0]
+    return None
+
+
+def list_stats(listing_url):
+    """{video_id: {'view_count': n}} from one flat listing (all of its pages)."""
+    ratelimit.wait(listing_url)
+    info = ydl_pool.get(FLAT_OPTS).extract_info(listing_url, download=False)
+    stats = {}
+    for entry in info.get('entries') or []:
+        if entry and entry.get('id') and entry.get('view_count') is not None:
+            stats[entry['id']] = {'view_count': entry['view_count']}
+    return stats
+
+
+def full_stats(video_id):
+    url = f"https://www.youtube.com/watch?v={video_id}"
+    ratelimit.wait(url)
+    info = ydl_pool.get(FULL_OPTS).extract_info(url, download=False)
+    return {f: info[f] for f in STATS if info.get(f) is not None}
+
+
+def same_type(old, new):
+    """Keep the stored representation (some records hold counts as strings)."""
+    return str(new) if isinstance(old, str) else new
+
+
+def refresh(source, overlay, playlists=(), workers=4, max_full=200, full=False):
+    """Return ({key: {field: new value}}, counters)."""
+    by_video = {}
+    channels = {}  # listing URL -> None (an ordered set)
+    for key, record in source.items():
+        video_id = youtube_id(record)
+        if not video_id:
+            continue
+        by_video[video_id] = key
+        channel_url = (record.get('channel_url') or '').rstrip('/')
+        if channel_url and not full:
+            channels[f"{channel_url}/videos"] = None
+
+    listings = list(channels) + list(playlists)
+    fetched = {}
+    failed_listings = 0
+    if listings:
+        console.log(f"Reading {len(listings)} flat listings for {len(by_video)} YouTube records...")
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(list_stats, url): url for url in listings}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    for video_id, stats in future.result().items():
+                        if video_id in by_video:
+                            fetched[video_id] = stats
+                except Exception as e:
+                    failed_listings += 1
+                    console.log(f"[yellow]Listing failed[/yellow] {futures[future]}: {e}")
+
+    missing = [video_id for video_id in by_video if video_id not in fetched]
+    todo = missing if max_full is None else missing[:max_full]
+    if todo:
+        console.log(f"Full extraction for {len(todo)} records not covered by any listing"
+                    + (f" ({len(missing) - len(todo)} left for a later run)" if len(todo) < len(missing) else ""))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(full_stats, video_id): video_id for video_id in todo}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    fetched[futures[future]] = future.result()
+                except Exception as e:
+                    console.log(f"[yellow]Extraction failed[/yellow] {futures[future]}: {e}")
+
+    updates = {}
+    for video_id, stats in fetched.items():
+        key = by_video[video_id]
+        record = source[key]
+        current = {**record, **overlay.get(key, {})}
+        changed = {f: same_type(record.get(f), v) for f, v in stats.items()
+                   if str(current.get(f)) != str(v)}
+        if changed:
+            updates[key] = changed
+    counters = {
+        'records': len(by_video), 'listings': len(listings), 'failed_listings': failed_listings,
+        'from_listings': len(by_video) - len(missing), 'full_extractions': len(todo),
+        'refreshed': len(fetched), 'changed': len(updates),
+    }
+    return updates, counters
+
+
+def apply_updates(source, overlay, updates):
+    """Batch upsert into the source layer. A stat the overlay also carries
+    (a manual fix) would hide the fresh value, so it is dropped from there."""
+    for key, changed in updates.items():
+        source[key].update(changed)
+        delta = overlay.get(key)
+        if delta:
+            for field in changed:
+                delta.pop(field, None)
+            if not delta:
+                del overlay[key]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Refresh view/like counts of YouTube records from flat listings')
+    parser.add_argument('--playlist', action='append', default=[], help='Extra playlist URL to read (repeatable)')
+    parser.add_argument('--workers', type=int, default=4, help='Concurrent listings/extractions (default 4)')
+    parser.add_argument('--max-full', type=int, default=200,
+                        help='Max full extractions for records no listing covers (default 200, -1 = no limit)')
+    parser.add_argument('--full', action='store_true', help='Skip listings: full extraction for every record (also refreshes likes)')
+    parser.add_argument('--dry-run', action='store_true', help='Report changes without saving')
+    args = parser.parse_args()
+
+    source, overlay = catalog.load_layers()
+    if not source:
+        console.print("[bold red]Error:[/bold red] No catalogue found.")
+        sys.exit(1)
+
+    max_full = None if args.max_full < 0 or args.full else args.max_full
+    updates, counters = refresh(source, overlay, args.playlist, args.workers, max_full, args.full)
+
+    table = Table(title="Stats refresh")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", style="magenta")
+    for label, key in (("YouTube records", 'records'), ("Flat listings read", 'listings'),
+                       ("Listings failed", 'failed_listings'), ("Covered by listings", 'from_listings'),
+                       ("Full extractions", 'full_extractions'), ("Records refreshed", 'refreshed'),
+                       ("Records changed", 'changed')):
+        table.add_row(label, str(counters[key]))
+    console.print(Panel(table))
+    ratelimit.print_stats(console.log)
+
+    if not updates:
+        console.print("[yellow]Nothing to update.[/yellow]")
+        return
+    if args.dry_run:
+        for key, changed in list(updates.items())[:20]:
+            console.log(f"{key}: " + ", ".join(f"{f} {source[key].get(f)} -> {v}" for f, v in changed.items()))
+        console.print(f"[yellow]Dry run: {len(updates)} records would be updated.[/yellow]")
+        return
+    if catalog.exists(catalog.SOURCE_FILE):
+        catalog.snapshot(catalog.SOURCE_FILE, 'bak')
+    apply_updates(source, overlay, updates)
+    catalog.save_layers(source, overlay)
+    console.print(f"[bold green]Updated stats of {len(updates)} records.[/bold green]")
+
+
+if __name__ == '__main__':
+    main()
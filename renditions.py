@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""Segmented low-bitrate streaming renditions (HLS) of downloaded audio.
+
+audiobook_scraper.py --download leaves one 64 kbps mp3 per title: a 10-hour
+reading is ~290 MB in a single file, the browser has to range-request its
+way through it to seek, and a slow link gets the same bitrate as a fast one.
+This stage turns every downloaded file into HLS renditions:
+
+    hls/<key>/master.m3u8            # variant list (bandwidth, codec)
+    hls/<key>/24k/index.m3u8 ...     # 6 s fMP4 segments, Opus mono 24 kb/s
+    hls/<key>/48k/index.m3u8 ...     # same at 48 kb/s
+
+All variants come from one ffmpeg run per file (one decode, one Opus encode
+per bitrate), and the files are spread over a process pool with one worker
+per core. The output is written to `<key>.tmp` and swapped in when complete.
+
+Each rendered record gets `hls_url` (RENDITIONS_BASE + /<key>/master.m3u8)
+in audiobooks.json; build_book_page puts it first in the audio player, so
+browsers with native HLS stream the segments (fast start, cheap seeking,
+bitrate by bandwidth) and the others fall back to the mp3. The renditions
+are large binaries: serve RENDITIONS_DIR from the audio host and point
+RENDITIONS_BASE at it, they do not belong in the site repository.
+
+Usage:
+    python3 renditions.py                   # render every downloaded file without one
+    python3 renditions.py --bitrates 32     # a single 32 kb/s variant
+    python3 renditions.py --force --workers 2
+"""
+import argparse
+import concurrent.futures
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+
+from rich.console import Console
+from rich.panel import Panel
+from rich.table import Table
+
+import catalog
+
+console = Console()
+
+RENDITIONS_DIR = os.environ.get('RENDITIONS_DIR', 'hls')
+RENDITIONS_BASE = os.environ.get('RENDITIONS_BASE', '/hls').rstrip('/')
+DEFAULT_BITRATES = (24, 48)  # kb/s
+SEGMENT_SECONDS = 6
+
+
+def render(audio_file, out_dir, bitrates=DEFAULT_BITRATES, segment_seconds=SEGMENT_SECONDS):
+    """Encode `audio_file` into one Opus HLS variant per bitrate under `out_dir`.
+
+    Runs in a pool worker; returns (out_dir, bytes written, seconds taken)."""
+    started = time.monotonic()
+    tmp_dir = f"{out_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    cmd = ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-nostdin', '-y', '-i', audio_file, '-vn']
+    for _ in bitrates:
+        cmd += ['-map', '0:a:0']
+    cmd += ['-c:a', 'libopus', '-ac', '1']
+    for i, kbps in enumerate(bitrates):
+        cmd += [f'-b:a:{i}', f'{kbps}k']
+    cmd += [
+        '-var_stream_map', ' '.join(f'a:{i},name:{kbps}k' for i, kbps in enumerate(bitrates)),
+        '-master_pl_name', 'master.m3u8',
+        '-f', 'hls', '-hls_time', str(segment_seconds), '-hls_playlist_type', 'vod',
+        '-hls_segment_type', 'fmp4', '-hls_fmp4_init_filename', 'init.mp4',
+        '-hls_segment_filename', os.path.join(tmp_dir, '%v', 'seg_%05d.m4s'),
+        os.path.join(tmp_dir, '%v', 'index.m3u8'),
+    ]
+    result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise RuntimeError(f"ffmpeg exited with {result.returncode}: {result.stderr.strip()[-300:]}")
+
+    # ffmpeg's master playlist has no CODECS attribute; players use it to pick
+    # a variant they can decode without fetching one first
+    master = os.path.join(tmp_dir, 'master.m3u8')
+    with open(master, 'r', encoding='utf-8') as f:
+        text = f.read()
+    with open(master, 'w', encoding='utf-8') as f:
+        f.write(re.sub(r'^(#EXT-X-STREAM-INF:BANDWIDTH=\d+)$', r'\1,CODECS="opus"', text, flags=re.M))
+
+    size = sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(tmp_dir) for name in names)
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+    return out_dir, size, time.monotonic() - started
+
+
+def pending(source, force=False):
+    """[(key, audio_file)] of downloaded records that need a rendition."""
+    todo = []
+    for key, record in source.items():
+        audio_file = record.get('audio_file') or ''
+        if '://' in audio_file or not os.path.isfile(audio_file):
+            continue  # not downloaded here (remote URL or missing)
+        master = os.path.join(RENDITIONS_DIR, key, 'master.m3u8')
+        if not force and record.get('hls_url') and os.path.exists(master):
+            continue
+        todo.append((key, audio_file))
+    return todo
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render downloaded audio into segmented HLS (Opus) renditions')
+    parser.add_argument('--bitrates', type=int, nargs='+', default=list(DEFAULT_BITRATES),
+                        help=f'Variant bitrates in kb/s (default: {" ".join(map(str, DEFAULT_BITRATES))})')
+    parser.add_argument('--segment', type=int, default=SEGMENT_SECONDS, help=f'Segment length in seconds (default {SEGMENT_SECONDS})')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help='Parallel ffmpeg processes (default: one per core)')
+    parser.add_argument('--force', action='store_true', help='Re-render records that already have a rendition')
+    parser.add_argument('--dry-run', action='store_true', help='List what would be rendered')
+    args = parser.parse_args()
+
+    source, overlay = catalog.load_layers()
+    if not source:
+        console.print("[bold red]Error:[/bold red] No catalogue found.")
+        sys.exit(1)
+    todo = pending(source, args.force)
+    if not todo:
+        console.print("[yellow]No downloaded audio without a rendition.[/yellow]")
+        return
+    if args.dry_run:
+        for key, audio_file in todo:
+            console.log(f"{key}: {audio_file}")
+        console.print(f"[yellow]Dry run: {len(todo)} files would be rendered.[/yellow]")
+        return
+
+    console.log(f"Rendering {len(todo)} files at {'/'.join(map(str, args.bitrates))} kb/s with {args.workers} workers...")
+    rendered, failed, total_bytes, cpu_seconds = 0, 0, 0, 0.0
+    started = time.monotonic()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = {executor.submit(render, audio_file, os.path.join(RENDITIONS_DIR, key), tuple(args.bitrates), args.segment): key
+                   for key, audio_file in todo}
+        for future in concurrent.futures.as_completed(futures):
+            key = futures[future]
+            try:
+                _, size, seconds = future.result()
+            except Exception as e:
+                failed += 1
+                console.log(f"[yellow]Rendition failed[/yellow] {key}: {e}")
+                continue
+            rendered += 1
+            total_bytes += size
+            cpu_seconds += seconds
+            source[key]['hls_url'] = f"{RENDITIONS_BASE}/{key}/master.m3u8"
+            source[key]['hls_bitrates'] = list(args.bitrates)
+            console.log(f"✅ {key}: {size / 1e6:.1f} MB in {seconds:.1f}s")
+    elapsed = time.monotonic() - started
+
+    table = Table(title="Renditions")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", style="magenta")
+    table.add_row("Rendered", str(rendered))
+    table.add_row("Failed", str(failed))
+    table.add_row("Output", f"{total_bytes / 1e6:.1f} MB")
+    table.add_row("Wall time", f"{elapsed:.1f}s ({cpu_seconds / elapsed if elapsed else 0:.1f}x parallel)")
+    console.print(Panel(table))
+    if rendered:
+        if catalog.exists(catalog.SOURCE_FILE):
+            catalog.snapshot(catalog.SOURCE_FILE, 'bak')
+        catalog.save_layers(source, overlay)
+        console.print(f"[bold green]Saved hls_url for {rendered} records.[/bold green]")
+
+
+if __name__ == '__main__':
+    main()
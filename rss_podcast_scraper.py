@@ -1,15 +1,15 @@
 #!/usr/bin/env python3
-import json
-import os
 import re
 import sys
 import hashlib
-import requests
 import xml.etree.ElementTree as ET
 from urllib.parse import urlparse
 from datetime import datetime
 import email.utils
 
+import catalog
+import http_cache
+
 def clean_html(text):
     if not text:
         return ""
@@ -61,7 +61,7 @@ def slugify(text: str) -> str:
 def scrape_rss(feed_url, mode='single', title_override=None, author=None, genre=None, channel_name=None):
     print(f"📡 Fetching RSS Podcast Feed: {feed_url}...")
     try:
-        r = requests.get(feed_url, timeout=30)
+        r = http_cache.get(feed_url, timeout=30)  # 304 when the feed has not changed
         r.raise_for_status()
         xml_content = r.content
     except Exception as e:
@@ -105,21 +105,8 @@ def scrape_rss(feed_url, mode='single', title_override=None, author=None, genre=
     items = channel.findall('item')
     print(f"Found {len(items)} episodes/items in feed.")
     
-    # Paths to the active database files
-    audiobooks_path = 'audiobooks.json'
-    augmented_path = 'augmented.json'
-    
-    if os.path.exists(audiobooks_path):
-        with open(audiobooks_path, 'r', encoding='utf-8') as f:
-            audiobooks = json.load(f)
-    else:
-        audiobooks = {}
-        
-    if os.path.exists(augmented_path):
-        with open(augmented_path, 'r', encoding='utf-8') as f:
-            augmented = json.load(f)
-    else:
-        augmented = {}
+    # Source records + enrichment overlay (see catalog.py)
+    audiobooks, overlay = catalog.load_layers()
         
     new_added = 0
     
@@ -176,7 +163,7 @@ def scrape_rss(feed_url, mode='single', title_override=None, author=None, genre=
         if key in audiobooks:
             print(f"ℹ️ Audiobook '{feed_title}' already exists. Overwriting with latest chapters...")
             
-        audiobooks[key] = {
+        record = {
             'title': feed_title,
             'channel': feed_channel,
             'channel_url': feed_channel_url,
@@ -196,8 +183,7 @@ def scrape_rss(feed_url, mode='single', title_override=None, author=None, genre=
             'categories': [feed_genre]
         }
         
-        augmented[key] = {
-            **audiobooks[key],
+        catalog.upsert(audiobooks, overlay, key, record, {
             'source': 'podcast',
             'source_url': feed_url,
             'embed_type': 'audio',
@@ -212,7 +198,7 @@ def scrape_rss(feed_url, mode='single', title_override=None, author=None, genre=
             'content_type': 'audiobook',
             'real_language': 'it',
             'real_narrator': feed_author
-        }
+        })
         new_added = 1
         print(f"✅ Ingested single audiobook '{feed_title}' with {len(audio_chapters)} chapters.")
         
@@ -245,7 +231,7 @@ def scrape_rss(feed_url, mode='single', title_override=None, author=None, genre=
             if itunes_ep_image is not None:
                 ep_image = itunes_ep_image.attrib.get('href', ep_image)
                 
-            audiobooks[key] = {
+            record = {
                 'title': title,
                 'channel': feed_channel,
                 'channel_url': feed_channel_url,
@@ -265,8 +251,7 @@ def scrape_rss(feed_url, mode='single', title_override=None, author=None, genre=
                 'categories': [feed_genre]
             }
             
-            augmented[key] = {
-                **audiobooks[key],
+            catalog.upsert(audiobooks, overlay, key, record, {
                 'source': 'podcast',
                 'source_url': feed_url,
                 'embed_type': 'audio',
@@ -281,15 +266,12 @@ def scrape_rss(feed_url, mode='single', title_override=None, author=None, genre=
                 'content_type': 'audiobook',
                 'real_language': 'it',
                 'real_narrator': feed_author
-            }
+            })
             new_added += 1
             print(f"  ✅ Added episode: {title}")
 
     if new_added > 0:
-        with open(audiobooks_path, 'w', encoding='utf-8') as f:
-            json.dump(audiobooks, f, indent=2, ensure_ascii=False)
-        with open(augmented_path, 'w', encoding='utf-8') as f:
-            json.dump(augmented, f, indent=2, ensure_ascii=False)
+        catalog.save_layers(audiobooks, overlay)
         print("🎉 Database files updated successfully with podcast feed!")
     else:
         print("ℹ️ No new podcast episodes added.")
@@ -303,6 +285,9 @@ if __name__ == '__main__':
     parser.add_argument('--author', help='Override author name')
     parser.add_argument('--genre', help='Override genre/category')
     parser.add_argument('--channel', help='Override publisher channel name')
+    parser.add_argument('--offline', action='store_true', help='Replay the feed from the HTTP cache (http_cache.py), no request')
     
     args = parser.parse_args()
+    if args.offline:
+        http_cache.configure(offline=True)
     scrape_rss(args.url, args.mode, args.title, args.author, args.genre, args.channel)
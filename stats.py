@@ -14,9 +14,11 @@ import matplotlib.pyplot as plt
 import numpy as np
 from dateutil import parser as date_parser
 
+import catalog
+
 console = Console()
 
-DEFAULT_METADATA_FILE = "audiobooks.json"
+DEFAULT_METADATA_FILE = catalog.SOURCE_FILE
 
 def format_duration(seconds):
     """Format seconds into hours and minutes"""
@@ -32,8 +34,9 @@ def format_duration(seconds):
 def load_metadata(file_path):
     """Load the audiobooks metadata file"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        if not catalog.exists(file_path):
+            raise FileNotFoundError(f"No such file: '{file_path}'")
+        return catalog.read_json(file_path)
     except (FileNotFoundError, json.JSONDecodeError) as e:
         console.print(f"[bold red]Error:[/bold red] {str(e)}")
         console.print(f"Could not load metadata file: {file_path}")
@@ -7,15 +7,16 @@ It preserves the original title and author information and only updates the syno
 """
 
 import json
-import shutil
 import requests
-import time
 from datetime import datetime
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
 from rich.panel import Panel
 from rich.table import Table
 
+import catalog
+import ratelimit
+
 console = Console()
 
 # Configuration
@@ -26,17 +27,9 @@ CONFIG = {
     'batch_size': 5,  # Number of books to process before saving checkpoint
 }
 
-class RateLimiter:
-    def __init__(self, delay):
-        self.delay = delay
-        self.last_request = 0
-    
-    def wait(self):
-        now = time.time()
-        elapsed = now - self.last_request
-        if elapsed < self.delay:
-            time.sleep(self.delay - elapsed)
-        self.last_request = time.time()
+# The LLM endpoint gets its own token bucket in the shared limiter (see ratelimit.py),
+# configured as in augment.py
+ratelimit.configure(CONFIG['api_url'], interval=CONFIG['rate_limit'])
 
 def is_italian_text(text):
     """Simple heuristic to check if text appears to be in Italian"""
@@ -53,7 +46,7 @@ def is_italian_text(text):
     # Should have at least 20% Italian indicators
     return italian_word_count / len(words) >= 0.2
 
-def get_improved_synopsis(book_id, book_data, rate_limiter):
+def get_improved_synopsis(book_id, book_data):
     """Query the local LLM to get an improved synopsis for the book."""
     
     # Extract current information
@@ -100,7 +93,7 @@ Rispondi ESCLUSIVAMENTE con la nuova sinossi in italiano, senza altre spiegazion
     }
     
     # Apply rate limiting
-    rate_limiter.wait()
+    ratelimit.wait(CONFIG['api_url'])
     
     try:
         response = requests.post(CONFIG['api_url'], headers=headers, json=data)
@@ -188,10 +181,8 @@ def main():
     
     # Create backup
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_file = f'augmented.json.backup_synopsis_{timestamp}'
-    
     try:
-        shutil.copy('augmented.json', backup_file)
+        backup_file = catalog.backup(f'backup_synopsis_{timestamp}')
         console.print(f"[green]✅ Created backup:[/green] {backup_file}")
     except Exception as e:
         console.print(f"[red]❌ Failed to create backup:[/red] {e}")
@@ -203,9 +194,8 @@ def main():
     if data is None:
         # Load fresh data
         try:
-            with open('augmented.json', 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            console.print(f"[green]✅ Loaded {len(data)} books from augmented.json[/green]")
+            data = catalog.load_view()
+            console.print(f"[green]✅ Loaded {len(data)} books from the catalogue[/green]")
             processed_count = 0
         except Exception as e:
             console.print(f"[red]❌ Failed to load data:[/red] {e}")
@@ -235,9 +225,6 @@ def main():
     
     console.print(f"[cyan]📊 Found {len(books_to_process)} books to process[/cyan]")
     
-    # Initialize rate limiter
-    rate_limiter = RateLimiter(CONFIG['rate_limit'])
-    
     # Statistics
     improved_count = 0
     error_count = 0
@@ -262,7 +249,7 @@ def main():
             
             try:
                 # Get improved synopsis
-                new_synopsis = get_improved_synopsis(book_id, book, rate_limiter)
+                new_synopsis = get_improved_synopsis(book_id, book)
                 
                 # Update the book data
                 if new_synopsis and new_synopsis != current_synopsis:
@@ -292,8 +279,7 @@ def main():
     console.print("\n[cyan]💾 Saving final results...[/cyan]")
     
     try:
-        with open('augmented.json', 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        catalog.save_view(data)
         
         console.print(f"[green]✅ Successfully saved updated data[/green]")
         
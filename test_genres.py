@@ -3,20 +3,19 @@
 Simple Genre Analysis Test
 """
 
-import json
+
+import catalog
 
 def main():
     print("🔍 Testing genre analysis...")
     
     try:
         # Load data
-        with open('audiobooks.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        print(f"✅ Loaded {len(data)} books from audiobooks.json")
+        data = catalog.read_json(catalog.SOURCE_FILE)
+        print(f"✅ Loaded {len(data)} books from {catalog.SOURCE_FILE}")
         
-        with open('augmented.json', 'r', encoding='utf-8') as f:
-            augmented = json.load(f)
-        print(f"✅ Loaded {len(augmented)} books from augmented.json")
+        augmented = catalog.load_view()
+        print(f"✅ Loaded {len(augmented)} books from the merged catalogue view")
         
         # Analyze real_genre field
         genre_counts = {}
@@ -5,11 +5,11 @@ Enhanced Title Cleaner - Second Pass
 This script handles remaining title issues after the first pass.
 """
 
-import json
-import shutil
 import re
 from datetime import datetime
 
+import catalog
+
 def main():
     print("📚 Enhanced Title Cleaner - Second Pass")
     print("=" * 60)
@@ -18,17 +18,16 @@ def main():
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
     try:
-        shutil.copy('augmented.json', f'augmented.json.backup_titles2_{timestamp}')
-        print(f"✅ Created backup: augmented.json.backup_titles2_{timestamp}")
+        backup_file = catalog.backup(f'backup_titles2_{timestamp}')
+        print(f"✅ Created backup: {backup_file}")
     except Exception as e:
         print(f"❌ Failed to create backup: {e}")
         return
     
     # Load data
     try:
-        with open('augmented.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        print(f"✅ Loaded {len(data)} books from augmented.json")
+        data = catalog.load_view()
+        print(f"✅ Loaded {len(data)} books from the catalogue")
     except Exception as e:
         print(f"❌ Failed to load data: {e}")
         return
@@ -86,11 +85,10 @@ def main():
     if total_changes > 0:
         # Save changes
         try:
-            with open('augmented.json', 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            catalog.save_view(data)
             
-            print(f"✅ Saved changes to augmented.json")
-            print(f"📁 Backup available as: augmented.json.backup_titles2_{timestamp}")
+            print(f"✅ Saved changes to {catalog.OVERLAY_FILE}")
+            print(f"📁 Backup available as: {backup_file}")
             
         except Exception as e:
             print(f"❌ Failed to save changes: {e}")
@@ -6,9 +6,10 @@ This script verifies the results of the author name standardization
 and shows before/after comparisons.
 """
 
-import json
 from collections import Counter
 
+import catalog
+
 def compare_authors():
     """Compare author names before and after standardization"""
     
@@ -20,13 +21,11 @@ def compare_authors():
     
     old_data = None
     for backup_file in backup_files:
-        try:
-            with open(backup_file, 'r', encoding='utf-8') as f:
-                old_data = json.load(f)
-            print(f"📁 Loaded backup file: {backup_file}")
+        # resolve() also finds the compressed snapshots (<name>.gz)
+        if catalog.exists(backup_file):
+            old_data = catalog.read_json(backup_file)
+            print(f"📁 Loaded backup file: {catalog.resolve(backup_file)}")
             break
-        except FileNotFoundError:
-            continue
     
     if old_data is None:
         print("❌ No backup file found")
@@ -34,9 +33,10 @@ def compare_authors():
     
     # Load current file (after standardization)
     try:
-        with open('augmented.json', 'r', encoding='utf-8') as f:
-            new_data = json.load(f)
-        print("📁 Loaded current file (after standardization)")
+        new_data = catalog.load_view()
+        if not new_data:
+            raise FileNotFoundError
+        print("📁 Loaded current catalogue (after standardization)")
     except FileNotFoundError:
         print("❌ Current file not found!")
         return
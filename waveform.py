@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""Waveform peaks and candidate chapter markers of downloaded audio.
+
+A player can draw the shape of a 10-hour reading and offer "next chapter"
+jumps only if someone decodes the whole file first, and doing that in the
+browser means downloading it. This stage does it once per file, in a single
+ffmpeg decode pass that feeds two filters side by side:
+
+  - astats over fixed windows of the (8 kHz) decoded audio: the peak level of
+    each window, printed to stdout, then folded in Python into at most
+    `points` peaks scaled to 0-255 (DB_FLOOR dB and below is 0),
+  - silencedetect: every pause longer than `silence_seconds` below
+    `silence_db`, logged to stderr. Readings have a long pause between
+    chapters, so the middle of each one is a candidate chapter boundary.
+
+The result is a small JSON file per title (a few KB), WAVEFORM_DIR/<key>.json:
+
+    {"duration": 36012.4, "peaks": [0, 87, 143, ...],
+     "markers": [{"start": 1834.2, "silence": 3.1}, ...]}
+
+audiobook_scraper.py --download runs it on each file right after the
+transcode and records the path as `waveform_file`; generate_pages.py copies
+the file next to the book page (audiolibro/<slug>/waveform.json) and points
+the audio player at it with a data-waveform attribute.
+
+Usage:
+    python3 waveform.py                     # every downloaded file without one
+    python3 waveform.py --force --workers 2
+    python3 waveform.py FILE.mp3            # print the analysis of one file
+"""
+import argparse
+import concurrent.futures
+import json
+import math
+import os
+import re
+import subprocess
+import sys
+import time
+
+import mp3info
+
+WAVEFORM_DIR = os.environ.get('WAVEFORM_DIR', 'waveforms')
+POINTS = 1000          # peaks per title, whatever its length
+SILENCE_DB = -35       # below this level counts as silence...
+SILENCE_SECONDS = 2.5  # ...for at least this long
+DB_FLOOR = -60.0       # peak level drawn as 0
+SAMPLE_RATE = 8000     # decode rate: plenty for peaks and pauses, cheap to filter
+
+SILENCE_START_RE = re.compile(r'silence_start: (-?[\d.]+)')
+SILENCE_END_RE = re.compile(r'silence_end: (-?[\d.]+) \| silence_duration: ([\d.]+)')
+PEAK_RE = re.compile(r'Peak_level=(-?[\d.]+|-?inf|nan)')
+PTS_RE = re.compile(r'pts_time:([\d.]+)')
+
+
+def _window(duration, points):
+    """Samples per astats window: about four windows per output point."""
+    seconds = duration / (points * 4) if duration else 1.0
+    return max(int(SAMPLE_RATE * max(seconds, 0.05)), 1)
+
+
+def _scale(db):
+    if math.isnan(db) or db <= DB_FLOOR:
+        return 0
+    return min(255, round((db - DB_FLOOR) / -DB_FLOOR * 255))
+
+
+def analyse(audio_file, points=POINTS, silence_db=SILENCE_DB, silence_seconds=SILENCE_SECONDS):
+    """Peaks and silence markers of `audio_file` from one ffmpeg decode pass."""
+    duration = None
+    if audio_file.lower().endswith('.mp3'):
+        info = mp3info.probe_file(audio_file)
+        duration = info and info['duration']
+    window = _window(duration, points)
+    filters = ','.join([
+        f'aresample={SAMPLE_RATE}',
+        f'silencedetect=n={silence_db}dB:d={silence_seconds}',
+        f'asetnsamples=n={window}:p=0',
+        'astats=metadata=1:reset=1:measure_perchannel=none:measure_overall=Peak_level',
+        'ametadata=mode=print:key=lavfi.astats.Overall.Peak_level:file=-',
+    ])
+    cmd = ['ffmpeg', '-hide_banner', '-nostdin', '-i', audio_file, '-vn', '-ac', '1',
+           '-af', filters, '-f', 'null', '-']
+    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg exited with {result.returncode}: {result.stderr.strip()[-300:]}")
+
+    levels = [_scale(float(m)) for m in PEAK_RE.findall(result.stdout)]
+    last_pts = PTS_RE.findall(result.stdout)
+    if not duration:
+        duration = float(last_pts[-1]) + window / SAMPLE_RATE if last_pts else 0.0
+    # Fold the windows into at most `points` peaks (max of each group)
+    step = max(1, math.ceil(len(levels) / points))
+    peaks = [max(levels[i:i + step]) for i in range(0, len(levels), step)]
+
+    markers = []
+    start = None
+    for line in result.stderr.splitlines():
+        if 'silencedetect' not in line:
+            continue
+        m = SILENCE_START_RE.search(line)
+        if m:
+            start = max(0.0, float(m.group(1)))
+            continue
+        m = SILENCE_END_RE.search(line)
+        if m and start is not None:
+            end, length = float(m.group(1)), float(m.group(2))
+            # Silence at the very start or end of the file is not a boundary
+            if start > 0 and end < duration - 0.5:
+                markers.append({'start': round((start + end) / 2, 1), 'silence': round(length, 1)})
+            start = None
+    return {'duration': round(duration, 1), 'peaks': peaks, 'markers': markers}
+
+
+def path_for(key):
+    return os.path.join(WAVEFORM_DIR, f"{key}.json")
+
+
+def save(key, data):
+    """Write the analysis to WAVEFORM_DIR/<key>.json; returns the path."""
+    os.makedirs(WAVEFORM_DIR, exist_ok=True)
+    path = path_for(key)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.replace(tmp, path)
+    return path
+
+
+def process(key, audio_file, points=POINTS):
+    """analyse() + save(), in a pool worker: (path, markers found, seconds taken)."""
+    started = time.monotonic()
+    data = analyse(audio_file, points)
+    return save(key, data), len(data['markers']), time.monotonic() - started
+
+
+def pending(source, force=False):
+    """[(key, audio_file)] of downloaded records without a waveform."""
+    todo = []
+    for key, record in source.items():
+        audio_file = record.get('audio_file') or ''
+        if '://' in audio_file or not os.path.isfile(audio_file):
+            continue  # not downloaded here (remote URL or missing)
+        if not force and record.get('waveform_file') and os.path.exists(record['waveform_file']):
+            continue
+        todo.append((key, audio_file))
+    return todo
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Waveform peaks and silence-based chapter markers of downloaded audio')
+    parser.add_argument('files', nargs='*', help='Analyse these files and print the result instead')
+    parser.add_argument('--points', type=int, default=POINTS, help=f'Peaks per title (default {POINTS})')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help='Parallel ffmpeg processes (default: one per core)')
+    parser.add_argument('--force', action='store_true', help='Recompute records that already have a waveform')
+    args = parser.parse_args()
+
+    if args.files:
+        for audio_file in args.files:
+            started = time.monotonic()
+            data = analyse(audio_file, args.points)
+            print(f"✅ {audio_file}: {data['duration']:.1f}s, {len(data['peaks'])} peaks, "
+                  f"{len(data['markers'])} markers in {time.monotonic() - started:.2f}s")
+            for marker in data['markers']:
+                print(f"   {marker['start']:>9.1f}s  (silence {marker['silence']}s)")
+        return
+
+    import catalog
+    source, overlay = catalog.load_layers()
+    if not source:
+        print("❌ No catalogue found.")
+        sys.exit(1)
+    todo = pending(source, args.force)
+    if not todo:
+        print("✅ No downloaded audio without a waveform.")
+        return
+
+    print(f"🔊 Analysing {len(todo)} files with {args.workers} workers...")
+    done = failed = 0
+    started = time.monotonic()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = {executor.submit(process, key, audio_file, args.points): key for key, audio_file in todo}
+        for future in concurrent.futures.as_completed(futures):
+            key = futures[future]
+            try:
+                path, markers, seconds = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"⚠️  {key}: {e}")
+                continue
+            done += 1
+            source[key]['waveform_file'] = path
+            print(f"✅ {key}: {markers} markers in {seconds:.1f}s")
+    print(f"📊 {done} analysed, {failed} failed in {time.monotonic() - started:.1f}s")
+    if done:
+        if catalog.exists(catalog.SOURCE_FILE):
+            catalog.snapshot(catalog.SOURCE_FILE, 'bak')
+        catalog.save_layers(source, overlay)
+        print(f"💾 Saved waveform_file for {done} records.")
+
+
+if __name__ == '__main__':
+    main()
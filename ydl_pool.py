@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Long-lived yt_dlp.YoutubeDL instances, one per worker thread and option profile.
+
+`with yt_dlp.YoutubeDL(opts) as ydl:` for every URL repeats the extractor
+setup, cookie jar and HTTP opener construction each time, and throws away the
+connections. A YoutubeDL object can run any number of extract_info() calls
+but is not thread-safe, so this keeps one per (thread, options) pair and
+reuses it:
+
+    import ydl_pool
+    info = ydl_pool.get(ydl_opts).extract_info(url, download=False)
+
+Options are the profile: the scraper's flat listings (extract_flat) and full
+extractions get separate instances, and so does any call site passing
+different options. Everything is closed at exit.
+
+Usage:
+    python3 ydl_pool.py [N]   # benchmark fresh vs pooled instances on N
+                              # extractions from a local HTTP server
+"""
+import atexit
+import json
+import threading
+
+import yt_dlp
+
+_local = threading.local()
+_lock = threading.Lock()
+_instances = []
+
+
+def _profile(opts):
+    return json.dumps(opts, sort_keys=True, default=repr)
+
+
+def get(opts):
+    """This thread's YoutubeDL for `opts`, created on first use."""
+    pool = getattr(_local, 'pool', None)
+    if pool is None:
+        pool = _local.pool = {}
+    key = _profile(opts)
+    ydl = pool.get(key)
+    if ydl is None:
+        ydl = pool[key] = yt_dlp.YoutubeDL(dict(opts))
+        with _lock:
+            _instances.append(ydl)
+    return ydl
+
+
+@atexit.register
+def close_all():
+    with _lock:
+        instances, _instances[:] = list(_instances), []
+    for ydl in instances:
+        try:
+            ydl.close()
+        except Exception:
+            pass
+
+
+def _benchmark(n):
+    import http.server
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive, like YouTube's servers
+        body = b'\xff\xfb\x90\x00' + bytes(413)  # one silent MP3 frame
+
+        def do_GET(self):
+            # yt-dlp's generic extractor resolves a direct media link with
+            # one request: the extraction path minus YouTube's page parsing
+            self.send_response(200)
+            self.send_header('Content-Type', 'audio/mpeg')
+            self.send_header('Content-Length', str(len(self.body)))
+            self.end_headers()
+            self.wfile.write(self.body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_port}/audio'
+    opts = {'quiet': True, 'no_warnings': True, 'skip_download': True,
+            'extract_flat': 'in_playlist', 'ignoreerrors': True}
+
+    def fresh(url):
+        with yt_dlp.YoutubeDL(opts) as ydl:
+            return ydl.extract_info(url, download=False)
+
+    def pooled(url):
+        return get(opts).extract_info(url, download=False)
+
+    for label, fn in (('fresh YoutubeDL per URL', fresh), ('pooled per thread', pooled)):
+        for workers in (1, 4):
+            urls = [f'{base}/{i}.mp3' for i in range(n)]
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(fn, urls))
+            elapsed = time.perf_counter() - start
+            ok = sum(1 for r in results if r)
+            print(f"{label:<26} workers={workers}  {n} URLs in {elapsed:6.2f}s  "
+                  f"({elapsed / n * 1000:6.1f} ms/URL, {ok} extracted)")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    import sys
+    _benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -1,9 +1,7 @@
 #!/usr/bin/env python3
-import os
 import sys
 import json
 import re
-import time
 import argparse
 from datetime import datetime
 import yt_dlp
@@ -12,40 +10,12 @@ from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskPr
 from rich.panel import Panel
 from rich.table import Table
 
-# Try importing validation logic from existing scraper to ensure consistency
-try:
-    from audiobook_scraper import is_valid_audiobook, BLACKLIST_CHANNELS, BLACKLIST_IDS
-except ImportError:
-    # Fallback to copy of rules if import fails
-    BLACKLIST_CHANNELS = {
-        'iaraculonna', 'LaraBellyDance', 'giuliomania', 'I film di Mondo TV',
-        'Jason Stephenson - Sleep Meditation Music', 'Nigel John Stanford', 'Jason Headley',
-        'TheVideoCellar', 'Warner Bros. Italia', 'Veronicartoon', 'Film&Clips', 'Audio Books',
-        'Incredible Librivox Audiobooks', 'Bardic Knowledge', 'Fab Audio Books', 'English Audio Books',
-        'AudioLibros: MaginBooks', 'AMA Audiolibros', 'EducaBabyTV', 'Enrico Brignano Ufficiale',
-        'Greatest AudioBooks', 'Art and Design', 'giuseppe pugliese'
-    }
-    BLACKLIST_IDS = {
-        'IsvALeok750', 'CrEtgLpoWgE', 'GE8Dj701Q0M', 'xyx-RMoPyZo', 'FTkXdSKljOI', 'pKSVywHXd8Y',
-        'f199fI0jG6Q', 'Mv8EFsjKMow', 'nWRYL_XuJtE', 'xFUkkzAQyXU', 'JCLzc7S5xSY', 'fUbl5wiRtR8',
-        'es36GaQeAKk'
-    }
-    
-    def is_valid_audiobook(video_id, title, channel):
-        if video_id in BLACKLIST_IDS:
-            return False, "Blacklisted video ID"
-        if channel.strip().lower() in [c.lower() for c in BLACKLIST_CHANNELS]:
-            return False, f"Blacklisted channel: {channel}"
-        title_lower = title.lower()
-        if ('fiorello' in title_lower and 'baldini' in title_lower) or \
-           ('fiorello' in title_lower and 'bongiorno' in title_lower) or \
-           ('fiorello imita' in title_lower) or \
-           ('viva radio' in title_lower):
-            return False, "Fiorello comedy parody pattern"
-        if any(w in title_lower for w in ['audiobook', 'full audiobook', 'unabridged', 'translated by', 'read by']) and \
-           not any(w in title_lower for w in ['italiano', 'ita', 'tradotto']):
-            return False, "English audiobook title pattern"
-        return True, ""
+import catalog
+import channel_cursor
+from content_filter import is_valid_audiobook
+import description_chapters
+import ratelimit
+import ydl_pool
 
 console = Console()
 
@@ -74,39 +44,23 @@ ITALIAN_KEYWORDS = [
 ]
 
 def load_databases():
-    """Load both audiobooks.json and augmented.json"""
-    audiobooks = {}
-    augmented = {}
-    
-    if os.path.exists("audiobooks.json"):
-        try:
-            with open("audiobooks.json", "r", encoding="utf-8") as f:
-                audiobooks = json.load(f)
-        except Exception as e:
-            console.log(f"[bold red]Error loading audiobooks.json:[/bold red] {e}")
-            
-    if os.path.exists("augmented.json"):
-        try:
-            with open("augmented.json", "r", encoding="utf-8") as f:
-                augmented = json.load(f)
-        except Exception as e:
-            console.log(f"[bold red]Error loading augmented.json:[/bold red] {e}")
-            
-    return audiobooks, augmented
+    """Load the source records (audiobooks.json) and the enrichment overlay (see catalog.py)"""
+    try:
+        return catalog.load_layers()
+    except Exception as e:
+        console.log(f"[bold red]Error loading database:[/bold red] {e}")
+        return {}, {}
 
-def save_databases(audiobooks, augmented):
-    """Save both audiobooks.json and augmented.json with backups"""
-    for filepath, data in [("audiobooks.json", audiobooks), ("augmented.json", augmented)]:
-        if os.path.exists(filepath):
-            backup_path = f"{filepath}.bak"
+def save_databases(audiobooks, overlay):
+    """Save the source records and the enrichment overlay with backups"""
+    for filepath, data in [(catalog.SOURCE_FILE, audiobooks), (catalog.OVERLAY_FILE, overlay)]:
+        if catalog.exists(filepath):
             try:
-                import shutil
-                shutil.copy2(filepath, backup_path)
+                catalog.snapshot(filepath, 'bak')
             except Exception as e:
                 console.log(f"[bold yellow]Warning:[/bold yellow] Failed to create backup for {filepath}: {e}")
         try:
-            with open(filepath, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            catalog.write_json(filepath, data)
             console.log(f"✅ Saved database: [green]{filepath}[/green] ({len(data)} total books)")
         except Exception as e:
             console.log(f"[bold red]Error saving {filepath}:[/bold red] {e}")
@@ -118,10 +72,10 @@ def clean_html(text):
     clean_text = re.sub(clean, '', text)
     return re.sub(r'\s+', ' ', clean_text).strip()
 
-def load_known_authors(augmented_data):
+def load_known_authors(overlay):
     """Extract all unique author names from existing database to use as lookup clues"""
     authors = set()
-    for book in augmented_data.values():
+    for book in overlay.values():
         author = book.get("real_author")
         if author and author != "Autore Sconosciuto" and "Lettore" not in author:
             author_clean = author.strip()
@@ -346,6 +300,7 @@ def search_youtube_candidates(queries, limit=100, min_duration=1200):
             query_str = f"ytsearch{limit}:{q}"
             console.log(f"🔍 Executing search query: [cyan]'{q}'[/cyan]...")
             try:
+                ratelimit.wait('youtube.com')
                 results = ydl.extract_info(query_str, download=False)
                 entries = results.get("entries", [])
                 console.log(f"   Found {len(entries)} raw search entries.")
@@ -387,9 +342,20 @@ def search_youtube_candidates(queries, limit=100, min_duration=1200):
                 
     return candidates
 
-def crawl_channel_candidates(channel_urls, limit=100, min_duration=1200):
-    """Use yt-dlp in flat mode to fetch candidates from specific channel pages/handles"""
+def crawl_channel_candidates(channel_urls, limit=100, min_duration=1200, known=None, stop_after=channel_cursor.DEFAULT_STOP_AFTER):
+    """Use yt-dlp in flat mode to fetch candidates from specific channel pages/handles.
+
+    With `known` (ids already in the library) the crawl is incremental: each
+    channel is walked newest-first only down to its saved cursor or to
+    `stop_after` consecutive known ids (see channel_cursor.py).
+
+    Returns (candidates, cursors): `cursors` maps each incrementally walked
+    channel URL to (proposed cursor, new entries), for run_discovery to store
+    once the candidates are ingested.
+    """
     candidates = {}
+    cursors = {}
+    state = channel_cursor.load_state() if known is not None else None
     
     ydl_opts = {
         'extract_flat': True,
@@ -403,17 +369,24 @@ def crawl_channel_candidates(channel_urls, limit=100, min_duration=1200):
         for name, url in channel_urls.items():
             console.log(f"📡 Indexing channel: [cyan]{name}[/cyan] ({url})...")
             try:
-                # Resolve uploads playlist to make it extremely fast
-                results = ydl.extract_info(url, download=False)
-                
-                # Check for playlist entries
-                entries = []
-                if results.get('_type') == 'playlist' or 'entries' in results:
-                    entries = results.get('entries', [])
+                ratelimit.wait(url)
+                if state is not None:
+                    entries, cursor = channel_cursor.crawl(ydl, url, lambda vid: vid in known, state, stop_after, limit)
+                    cursors[url] = (cursor, entries)
+                    read = cursor['read'] if cursor else len(entries)
+                    console.log(f"   Read {read} uploads down to the last known one, {len(entries)} new.")
                 else:
-                    entries = [results]
+                    # Resolve uploads playlist to make it extremely fast
+                    results = ydl.extract_info(url, download=False)
                     
-                console.log(f"   Fetched {len(entries)} recent uploads.")
+                    # Check for playlist entries
+                    entries = []
+                    if results.get('_type') == 'playlist' or 'entries' in results:
+                        entries = results.get('entries', [])
+                    else:
+                        entries = [results]
+                        
+                    console.log(f"   Fetched {len(entries)} recent uploads.")
                 
                 for entry in entries:
                     if not entry:
@@ -442,8 +415,8 @@ def crawl_channel_candidates(channel_urls, limit=100, min_duration=1200):
                     }
             except Exception as e:
                 console.log(f"[bold red]Error crawling channel '{name}':[/bold red] {e}")
-                
-    return candidates
+    
+    return candidates, cursors
 
 def extract_candidate_metadata(video_id):
     """Fetch rich metadata for a single video ID"""
@@ -455,29 +428,43 @@ def extract_candidate_metadata(video_id):
         'socket_timeout': 15,
     }
     
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        info = ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=False)
-        return info
+    # Paced by the shared youtube.com budget (see ratelimit.py)
+    url = f"https://www.youtube.com/watch?v={video_id}"
+    ratelimit.wait(url)
+    return ydl_pool.get(ydl_opts).extract_info(url, download=False)
+
+def store_cursors(cursors, is_settled):
+    """Move the cursors of the channels whose new uploads are all settled"""
+    if not cursors:
+        return
+    state = channel_cursor.load_state()
+    for url, (cursor, entries) in cursors.items():
+        if channel_cursor.advance(state, url, cursor, entries, is_settled):
+            console.log(f"Cursor of {url} moved to {cursor['last_id']}.")
 
-def run_discovery(queries=None, channels=None, limit=100, min_duration=1200, ingest=False):
+def run_discovery(queries=None, channels=None, limit=100, min_duration=1200, ingest=False, incremental=False, stop_after=channel_cursor.DEFAULT_STOP_AFTER):
     console.print(Panel("[bold green]YouTube Audiobook Discovery Tool[/bold green]"))
     
     # Load databases to de-duplicate
-    audiobooks, augmented = load_databases()
+    audiobooks, overlay = load_databases()
     console.log(f"Loaded database with {len(audiobooks)} existing audiobooks.")
     
     # Extract known authors from database for title-author splitting
-    known_authors = load_known_authors(augmented)
+    known_authors = load_known_authors(overlay)
     
     # 1. Discover candidates
     raw_candidates = {}
+    cursors = {}
     
     if channels:
         # Index specific vetted channels
         channel_map = {name: url for name, url in VETTED_CHANNELS.items() if name in channels or not channels}
         if channels == ['all']:
             channel_map = VETTED_CHANNELS
-        raw_candidates.update(crawl_channel_candidates(channel_map, limit, min_duration))
+        channel_candidates, cursors = crawl_channel_candidates(channel_map, limit, min_duration,
+                                                               known=audiobooks if incremental else None,
+                                                               stop_after=stop_after)
+        raw_candidates.update(channel_candidates)
         
     if queries:
         # Index search queries
@@ -485,6 +472,8 @@ def run_discovery(queries=None, channels=None, limit=100, min_duration=1200, ing
         
     if not raw_candidates:
         console.log("[yellow]No candidates found. Exiting.[/yellow]")
+        if ingest:
+            store_cursors(cursors, lambda vid: True)
         return
         
     # Filter out duplicates already in DB
@@ -496,6 +485,8 @@ def run_discovery(queries=None, channels=None, limit=100, min_duration=1200, ing
                         
     if not new_candidates:
         console.log("[yellow]No new candidates to ingest. Done.[/yellow]")
+        if ingest:
+            store_cursors(cursors, lambda vid: True)
         return
         
     # Limit number of rich extractions to process to avoid rate limits
@@ -503,6 +494,7 @@ def run_discovery(queries=None, channels=None, limit=100, min_duration=1200, ing
     
     # Let's perform Pass 2: Extract rich details and save
     ingested_count = 0
+    failed = set()  # candidates to retry: their channel's cursor must not move past them
     
     table = Table(title="New Ingestion Candidates", show_header=True, header_style="bold magenta")
     table.add_column("Video ID", style="dim")
@@ -544,6 +536,7 @@ def run_discovery(queries=None, channels=None, limit=100, min_duration=1200, ing
             try:
                 info = extract_candidate_metadata(video_id)
                 if not info:
+                    failed.add(video_id)
                     continue
                     
                 title = info.get('title', candidate['title'])
@@ -565,7 +558,7 @@ def run_discovery(queries=None, channels=None, limit=100, min_duration=1200, ing
                 narrator = guess_narrator(channel, description)
                 
                 # Create main database entry
-                audiobooks[video_id] = {
+                record = {
                     'title': title,
                     'channel': channel,
                     'channel_url': channel_url,
@@ -573,6 +566,7 @@ def run_discovery(queries=None, channels=None, limit=100, min_duration=1200, ing
                     'upload_date': info.get('upload_date', 'Unknown'),
                     'description': info.get('description', ''),
                     'transcript': "",
+                    'chapters': description_chapters.from_info(info),
                     'view_count': info.get('view_count', 0),
                     'like_count': info.get('like_count', 0),
                     'download_date': datetime.now().isoformat(),
@@ -585,9 +579,8 @@ def run_discovery(queries=None, channels=None, limit=100, min_duration=1200, ing
                     'categories': info.get('categories', ['People & Blogs'])
                 }
                 
-                # Create augmented database entry
-                augmented[video_id] = {
-                    **audiobooks[video_id],
+                # Create the enrichment overlay for it
+                catalog.upsert(audiobooks, overlay, video_id, record, {
                     'source': 'youtube',
                     'source_url': f"https://www.youtube.com/watch?v={video_id}",
                     'embed_type': 'youtube',
@@ -602,23 +595,23 @@ def run_discovery(queries=None, channels=None, limit=100, min_duration=1200, ing
                     'content_type': 'audiobook',
                     'real_language': 'it',
                     'real_narrator': narrator
-                }
+                })
                 
                 ingested_count += 1
                 progress.update(task, advance=1)
                 
-                # Be polite to YouTube servers
-                time.sleep(0.5)
-                
             except Exception as e:
+                failed.add(video_id)
                 console.log(f"[bold red]Failed to extract rich metadata for {video_id}:[/bold red] {e}")
                 progress.update(task, advance=1)
                 
     if ingested_count > 0:
-        save_databases(audiobooks, augmented)
+        save_databases(audiobooks, overlay)
         console.print(Panel(f"🎉 Successfully ingested [bold green]{ingested_count}[/bold green] new YouTube audiobooks!"))
     else:
         console.print("[yellow]No new audiobooks were successfully ingested.[/yellow]")
+    # Ingested or rejected for good: only the failed ones hold their channel's cursor back
+    store_cursors(cursors, lambda vid: vid not in failed)
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='YouTube Audiobook Discovery and Ingestion Tool')
@@ -627,6 +620,8 @@ if __name__ == '__main__':
     parser.add_argument('--limit', type=int, default=100, help='Max results to crawl per query/channel (default 100)')
     parser.add_argument('--min-duration', type=int, default=1200, help='Min video duration in seconds (default 1200 = 20 mins)')
     parser.add_argument('--ingest', action='store_true', help='Ingest discovered candidates into databases')
+    parser.add_argument('--incremental', action='store_true', help=f'Walk channels newest-first only down to the last crawl or known videos (cursors in {channel_cursor.STATE_FILE})')
+    parser.add_argument('--stop-after', type=int, default=channel_cursor.DEFAULT_STOP_AFTER, help=f'Incremental mode: stop after this many consecutive known videos (default {channel_cursor.DEFAULT_STOP_AFTER})')
     
     args = parser.parse_args()
     
@@ -644,5 +639,7 @@ if __name__ == '__main__':
         channels=channel_list,
         limit=args.limit,
         min_duration=args.min_duration,
-        ingest=args.ingest
+        ingest=args.ingest,
+        incremental=args.incremental,
+        stop_after=args.stop_after
     )